@@ -0,0 +1,18 @@
+from django.apps import AppConfig
+from django.conf import settings
+
+
+class CoreConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'apps.core'
+
+    def ready(self):
+        from .logs import configure_structlog
+        from .metrics import install_query_counting, install_serializer_timing, prometheus_client
+        from .tracing import install_query_tracing
+
+        configure_structlog(settings.LOG_SAMPLE_RATES)
+        install_query_tracing()
+        if prometheus_client is not None:
+            install_query_counting()
+            install_serializer_timing()
@@ -0,0 +1,260 @@
+"""
+API latency benchmark.
+
+Replays a realistic request mix against the local database, in process,
+through the full middleware and DRF stack (no network, no web server):
+
+- youth browsing /api/v1/jobs/ (a random page of their municipality's listing)
+- youth submitting an application to a job they have not applied to
+- youth polling /api/v1/applications/
+- municipality admins listing /api/v1/lottery-runs/
+- municipality admins previewing a job group's lottery
+
+Seed the database first (``manage.py generate_load_data``). Actors are
+drawn from the generated youth; one municipality admin per generated
+municipality is created on first use. Applications submitted during the
+run are deleted again afterwards.
+
+For every scenario the report holds request count, errors, p50/p95/p99
+and mean latency, throughput and mean DB queries per request. A report
+can be saved as a baseline and later runs compared against it: a
+scenario regresses when its p95 grows by more than the tolerance, or it
+makes more queries per request.
+"""
+import json
+import math
+import random
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connection, connections
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from rest_framework_simplejwt.tokens import AccessToken
+
+from apps.jobs.demand import refresh_job_demand
+from apps.jobs.models import Application, Job
+from apps.lottery.models import JobGroup
+from apps.organizations.models import Municipality
+from .synthetic import LOAD_TEST_EMAIL_DOMAIN, LOAD_TEST_SLUG_PREFIX, load_test_admin
+
+User = get_user_model()
+
+# Scenario name -> weight in the mix
+DEFAULT_MIX = {
+    'jobs.list': 40,
+    'applications.create': 15,
+    'applications.list': 30,
+    'lottery_runs.list': 10,
+    'groups.preview': 5,
+}
+
+
+@dataclass
+class Sample:
+    scenario: str
+    seconds: float
+    queries: int
+    status: int
+
+
+class Actors:
+    """Youth and admins to send requests as, with what each request needs."""
+
+    def __init__(self, youth_count: int, rng: random.Random):
+        youth = list(
+            User.objects.filter(role=User.Roles.YOUTH, email__endswith=f'@{LOAD_TEST_EMAIL_DOMAIN}')
+            .select_related('youth_profile').order_by('id')[:youth_count * 20]
+        )
+        if not youth:
+            raise ValueError("No generated youth found; run generate_load_data first.")
+        self.youth = rng.sample(youth, min(youth_count, len(youth)))
+
+        municipalities = list(Municipality.objects.filter(slug__startswith=LOAD_TEST_SLUG_PREFIX))
+        self.admins = [load_test_admin(municipality) for municipality in municipalities]
+
+        municipality_ids = {user.municipality_id for user in self.youth}
+        jobs = Job.objects.filter(municipality_id__in=municipality_ids, status=Job.Status.PUBLISHED)
+        self.jobs_by_municipality = defaultdict(list)
+        for job_id, municipality_id in jobs.values_list('id', 'municipality_id'):
+            self.jobs_by_municipality[municipality_id].append(job_id)
+        self.job_pages = {
+            municipality_id: max(1, math.ceil(len(job_ids) / settings.REST_FRAMEWORK['PAGE_SIZE']))
+            for municipality_id, job_ids in self.jobs_by_municipality.items()
+        }
+
+        self.applied = defaultdict(set)
+        for youth_id, job_id in Application.objects.filter(
+            youth__user__in=self.youth
+        ).values_list('youth__user_id', 'job_id'):
+            self.applied[youth_id].add(job_id)
+
+        self.groups_by_municipality = defaultdict(list)
+        for group_id, municipality_id in JobGroup.objects.filter(
+            municipality__in=municipalities
+        ).values_list('id', 'municipality_id'):
+            self.groups_by_municipality[municipality_id].append(group_id)
+
+        self.tokens = {user.id: str(AccessToken.for_user(user)) for user in [*self.youth, *self.admins]}
+        self.lock = threading.Lock()
+
+    def unapplied_job(self, user, rng):
+        """A job in the youth's municipality they have not applied to (reserved for them)."""
+        candidates = self.jobs_by_municipality.get(user.municipality_id, [])
+        for _ in range(20):
+            job_id = rng.choice(candidates) if candidates else None
+            with self.lock:
+                if job_id is not None and job_id not in self.applied[user.id]:
+                    self.applied[user.id].add(job_id)
+                    return job_id
+        return None
+
+
+def _request_for(scenario: str, actors: Actors, rng: random.Random):
+    """(user, method, path, data) for one request of a scenario, or None if it cannot be built."""
+    if scenario in ('lottery_runs.list', 'groups.preview'):
+        if not actors.admins:
+            return None
+        admin = rng.choice(actors.admins)
+        if scenario == 'lottery_runs.list':
+            return admin, 'get', '/api/v1/lottery-runs/', None
+        groups = actors.groups_by_municipality.get(admin.municipality_id)
+        if not groups:
+            return None
+        return admin, 'get', f'/api/v1/groups/{rng.choice(groups)}/preview/', None
+
+    youth = rng.choice(actors.youth)
+    if scenario == 'jobs.list':
+        page = rng.randint(1, actors.job_pages.get(youth.municipality_id, 1))
+        return youth, 'get', f'/api/v1/jobs/?page={page}', None
+    if scenario == 'applications.list':
+        return youth, 'get', '/api/v1/applications/', None
+    if scenario == 'applications.create':
+        job_id = actors.unapplied_job(youth, rng)
+        if job_id is None:
+            return None
+        return youth, 'post', '/api/v1/applications/', {'job': str(job_id)}
+    raise ValueError(f"Unknown scenario {scenario!r}")
+
+
+def _host() -> str:
+    return next((host for host in settings.ALLOWED_HOSTS if host not in ('*', '') and not host.startswith('.')), 'localhost')
+
+
+def _worker(actors: Actors, mix: dict, seed: int, deadline: float, max_requests: int, warmup: int,
+            samples: list, created: list):
+    rng = random.Random(seed)
+    client = Client(HTTP_HOST=_host())
+    scenarios, weights = list(mix), list(mix.values())
+    sent = 0
+    try:
+        while time.perf_counter() < deadline and sent < max_requests + warmup:
+            scenario = rng.choices(scenarios, weights)[0]
+            request = _request_for(scenario, actors, rng)
+            if request is None:
+                continue
+            user, method, path, data = request
+            kwargs = {'HTTP_AUTHORIZATION': f'Bearer {actors.tokens[user.id]}'}
+            if data is not None:
+                kwargs.update(data=json.dumps(data), content_type='application/json')
+            with CaptureQueriesContext(connection) as queries:
+                started = time.perf_counter()
+                response = getattr(client, method)(path, **kwargs)
+                seconds = time.perf_counter() - started
+            sent += 1
+            if scenario == 'applications.create' and response.status_code == 201:
+                created.append(response.json()['id'])
+            if sent > warmup:
+                samples.append(Sample(scenario, seconds, len(queries), response.status_code))
+    finally:
+        connections.close_all()
+
+
+def percentile(values: list[float], pct: float) -> float:
+    """Nearest-rank percentile of sorted values."""
+    if not values:
+        return 0.0
+    return values[max(0, math.ceil(pct / 100 * len(values)) - 1)]
+
+
+def summarize(samples: list[Sample], wall_seconds: float) -> dict:
+    by_scenario = defaultdict(list)
+    for sample in samples:
+        by_scenario[sample.scenario].append(sample)
+    by_scenario['all'] = samples
+
+    report = {}
+    for scenario, items in by_scenario.items():
+        latencies = sorted(sample.seconds * 1000 for sample in items)
+        report[scenario] = {
+            'requests': len(items),
+            'errors': sum(1 for sample in items if sample.status >= 400),
+            'p50_ms': round(percentile(latencies, 50), 2),
+            'p95_ms': round(percentile(latencies, 95), 2),
+            'p99_ms': round(percentile(latencies, 99), 2),
+            'mean_ms': round(sum(latencies) / len(latencies), 2) if latencies else 0.0,
+            'throughput_rps': round(len(items) / wall_seconds, 1) if wall_seconds else 0.0,
+            'queries_per_request': round(sum(sample.queries for sample in items) / len(items), 2) if items else 0.0,
+        }
+    return report
+
+
+def compare(report: dict, baseline: dict, tolerance: float) -> list[dict]:
+    """Per-scenario changes against a baseline report; regressions are flagged."""
+    changes = []
+    for scenario, current in report.items():
+        previous = baseline.get(scenario)
+        if not previous:
+            continue
+        p95_change = (current['p95_ms'] - previous['p95_ms']) / previous['p95_ms'] if previous['p95_ms'] else 0.0
+        changes.append({
+            'scenario': scenario,
+            'p95_ms': current['p95_ms'],
+            'baseline_p95_ms': previous['p95_ms'],
+            'p95_change': round(p95_change, 3),
+            'queries_per_request': current['queries_per_request'],
+            'baseline_queries_per_request': previous['queries_per_request'],
+            'regressed': p95_change > tolerance or current['queries_per_request'] > previous['queries_per_request'],
+        })
+    return changes
+
+
+def run_benchmark(duration: float = 30, concurrency: int = 4, max_requests: int = 10_000, warmup: int = 20,
+                  youth: int = 200, mix: dict | None = None, seed: int = 1) -> dict:
+    """
+    Run the request mix and return the report (see summarize()).
+
+    Each of the ``concurrency`` threads sends at most ``max_requests``
+    requests (after ``warmup`` unmeasured ones) or stops at ``duration``
+    seconds.
+    """
+    rng = random.Random(seed)
+    actors = Actors(youth, rng)
+    samples: list[Sample] = []
+    created: list[str] = []
+
+    started = time.perf_counter()
+    deadline = started + duration
+    try:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            futures = [
+                pool.submit(_worker, actors, mix or DEFAULT_MIX, seed + index, deadline,
+                            max_requests, warmup, samples, created)
+                for index in range(concurrency)
+            ]
+            for future in futures:
+                future.result()
+        wall_seconds = time.perf_counter() - started
+    finally:
+        # Leave the seeded data as it was
+        if created:
+            job_ids = set(Application.objects.filter(id__in=created).values_list('job_id', flat=True))
+            Application.objects.filter(id__in=created)._raw_delete(connection.alias)
+            refresh_job_demand(job_ids)
+
+    return summarize(samples, wall_seconds)
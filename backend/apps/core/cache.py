@@ -0,0 +1,43 @@
+"""
+Versioned cache namespaces.
+
+Cached entries embed the current version of their namespace in the key.
+Invalidating a namespace bumps the version, which orphans every entry in
+it at once (they simply expire via their TTL) without having to know or
+scan the individual keys.
+"""
+import time
+
+from django.core.cache import cache
+
+
+def _version_key(namespace: str) -> str:
+    return f'cache-version:{namespace}'
+
+
+def get_cache_version(namespace: str) -> int:
+    """Return the current version of a cache namespace."""
+    key = _version_key(namespace)
+    version = cache.get(key)
+    if version is None:
+        # Start from a timestamp rather than 1, so that an evicted version
+        # key can never resurrect entries cached under an older version.
+        cache.add(key, time.time_ns(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def bump_cache_version(namespace: str) -> None:
+    """Invalidate every entry cached under a namespace."""
+    key = _version_key(namespace)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Version key missing (never set or evicted)
+        cache.set(key, time.time_ns(), timeout=None)
+
+
+def versioned_key(namespace: str, *parts) -> str:
+    """Build a cache key bound to the current version of a namespace."""
+    suffix = ':'.join(str(part) for part in parts)
+    return f'{namespace}:v{get_cache_version(namespace)}:{suffix}'
@@ -0,0 +1,31 @@
+"""
+School grade ordering shared by jobs, youth profiles and the lottery.
+
+Grades are stored as codes (YEAR_1 ... GYM_4); comparisons use their
+position in GRADE_ORDER, which models persist as generated "rank" columns
+so eligibility can be filtered and indexed in SQL.
+"""
+from django.db import models
+
+GRADE_ORDER = [
+    'YEAR_1', 'YEAR_2', 'YEAR_3', 'YEAR_4', 'YEAR_5',
+    'YEAR_6', 'YEAR_7', 'YEAR_8', 'YEAR_9',
+    'GYM_1', 'GYM_2', 'GYM_3', 'GYM_4'
+]
+
+
+def grade_rank(grade: str | None) -> int | None:
+    """Position of a grade code in GRADE_ORDER, or None if unset/unknown."""
+    try:
+        return GRADE_ORDER.index(grade)
+    except ValueError:
+        return None
+
+
+def grade_rank_expression(field_name: str) -> models.Case:
+    """SQL equivalent of grade_rank() for a grade column (NULL if unset/unknown)."""
+    return models.Case(
+        *[models.When(**{field_name: grade}, then=models.Value(rank)) for rank, grade in enumerate(GRADE_ORDER)],
+        default=None,
+        output_field=models.PositiveSmallIntegerField(),
+    )
@@ -0,0 +1,110 @@
+"""
+Resized image derivatives with content-hashed, immutable names.
+
+Uploaded images (logos, hero and promo images) are stored as uploaded
+under fixed paths, so they cannot be cached long-term and every client
+downloads the original. After an upload, a background task renders
+WebP (and AVIF when Pillow supports it) variants at a few widths and
+stores them as
+
+    derivatives/<hash[:2]>/<hash>-<width>w.<format>
+
+where <hash> is the SHA-256 of the original's bytes. A name therefore
+always refers to the same content and can be served with
+"Cache-Control: public, max-age=31536000, immutable". Re-rendering the
+same original is a no-op.
+
+The result is kept per image field in the model's ``image_variants``
+JSON field and exposed by serializers through srcset().
+"""
+import hashlib
+import io
+
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps, features
+
+DERIVATIVES_PREFIX = 'derivatives'
+
+# Formats to render, best compression first
+VARIANT_FORMATS = [fmt for fmt in ('avif', 'webp') if features.check(fmt)]
+
+ENCODER_OPTIONS = {
+    'webp': {'format': 'WEBP', 'quality': 80, 'method': 6},
+    'avif': {'format': 'AVIF', 'quality': 60},
+}
+
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def derivative_name(digest: str, width: int, fmt: str) -> str:
+    return f'{DERIVATIVES_PREFIX}/{digest[:2]}/{digest}-{width}w.{fmt}'
+
+
+def target_widths(original_width: int, widths) -> list[int]:
+    """Requested widths below the original, plus the original if within range. Never upscales."""
+    targets = [width for width in sorted(set(widths)) if width < original_width]
+    if original_width <= max(widths) or not targets:
+        targets.append(min(original_width, max(widths)))
+    return targets
+
+
+def render_variants(file_field, widths) -> dict:
+    """
+    Render and store the derivatives of an image field's file.
+
+    Returns:
+        The image_variants entry for the field: source name, hash,
+        original size and the list of variants.
+    """
+    storage = file_field.storage
+    with storage.open(file_field.name, 'rb') as f:
+        data = f.read()
+    digest = content_hash(data)
+
+    image = ImageOps.exif_transpose(Image.open(io.BytesIO(data)))
+    if image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA' if 'A' in image.getbands() or image.mode == 'P' else 'RGB')
+
+    variants = []
+    for width in target_widths(image.width, widths):
+        height = max(1, round(image.height * width / image.width))
+        resized = None
+        for fmt in VARIANT_FORMATS:
+            name = derivative_name(digest, width, fmt)
+            # Content-addressed: an existing file already has the right bytes
+            if not storage.exists(name):
+                if resized is None:
+                    resized = image.resize((width, height), Image.Resampling.LANCZOS)
+                buffer = io.BytesIO()
+                resized.save(buffer, **ENCODER_OPTIONS[fmt])
+                saved = storage.save(name, ContentFile(buffer.getvalue()))
+                if saved != name:
+                    # A concurrent render stored the same bytes under `name` first
+                    # and the storage picked another name for ours: drop the copy
+                    storage.delete(saved)
+            variants.append({'format': fmt, 'width': width, 'height': height, 'name': name})
+
+    return {
+        'source': file_field.name,
+        'hash': digest,
+        'width': image.width,
+        'height': image.height,
+        'variants': variants,
+    }
+
+
+def srcset(entry: dict | None, storage, build_url) -> dict | None:
+    """
+    srcset strings per format for an image_variants entry, e.g.
+    {"webp": "https://.../x-200w.webp 200w, https://.../x-400w.webp 400w"}.
+
+    Returns None while the variants have not been rendered yet.
+    """
+    if not entry or not entry.get('variants'):
+        return None
+    sets: dict[str, list[str]] = {}
+    for variant in entry['variants']:
+        sets.setdefault(variant['format'], []).append(f"{build_url(storage.url(variant['name']))} {variant['width']}w")
+    return {fmt: ', '.join(candidates) for fmt, candidates in sets.items()}
@@ -0,0 +1,269 @@
+"""
+Structured JSON logging through structlog, written off the request path.
+
+Events are logged with ``structlog.get_logger(__name__)`` and flow through
+the standard logging module, so Django's own records and structlog events
+end up in the same JSON stream:
+
+    {"event": "request.finished", "request_id": "...", "user_role": "YOUTH",
+     "municipality_id": "...", "status": 200, "duration_ms": 12.4, ...}
+
+Request context: RequestLogMiddleware binds a request id (from
+X-Request-ID, or a new one) to the request's contextvars, and
+authentication adds the user's id, role and municipality. Every event
+logged while handling the request carries them.
+
+Non-blocking output: the ``queue`` handler only puts records on an
+in-memory queue; a listener thread formats them as JSON and writes them
+to stderr. Request threads never wait for rendering or I/O. Request
+context is captured when the record is queued, since the listener
+thread has none of its own. The listener is started by the first record
+a process logs, so forked workers (Celery prefork, gunicorn --preload)
+start their own instead of queueing for a thread that only exists in
+the parent.
+
+Sampling: LOG_SAMPLE_RATES maps high-volume event names to the fraction
+of them to keep. Warnings and errors are always kept, and so are
+``request.finished`` events for errors and slow requests.
+"""
+import atexit
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+import threading
+import time
+import uuid
+
+import structlog
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+
+# Record attribute holding the request context captured when queued
+CONTEXT_ATTR = 'structlog_context'
+
+_timestamper = structlog.processors.TimeStamper(fmt='iso', utc=True)
+
+
+def bind_request_context(**values) -> None:
+    """Add values to every event logged for the rest of the current request."""
+    structlog.contextvars.bind_contextvars(**values)
+
+
+def bind_user_context(user) -> None:
+    """Bind the authenticated user's id, role and municipality."""
+    bind_request_context(
+        user_id=str(user.id),
+        user_role=getattr(user, 'role', None),
+        municipality_id=str(user.municipality_id) if getattr(user, 'municipality_id', None) else None,
+    )
+
+
+class EventSampler:
+    """structlog processor dropping a share of high-volume events."""
+
+    def __init__(self, rates: dict[str, float]):
+        self.rates = rates
+
+    def __call__(self, logger, method_name, event_dict):
+        keep = event_dict.pop('keep', False)
+        rate = self.rates.get(event_dict.get('event'))
+        if rate is None or rate >= 1 or method_name in ('warning', 'error', 'critical', 'exception'):
+            return event_dict
+        if keep or random.random() < rate:
+            if rate > 0:
+                event_dict['sample_rate'] = rate
+            return event_dict
+        raise structlog.DropEvent
+
+
+def _merge_queued_context(logger, method_name, event_dict):
+    """Add the request context captured by QueueHandler.prepare() (after ExtraAdder)."""
+    context = event_dict.pop(CONTEXT_ATTR, None)
+    if context:
+        for key, value in context.items():
+            event_dict.setdefault(key, value)
+    return event_dict
+
+
+def configure_structlog(sample_rates: dict[str, float] | None = None) -> None:
+    structlog.configure(
+        processors=[
+            structlog.contextvars.merge_contextvars,
+            structlog.stdlib.filter_by_level,
+            EventSampler(sample_rates or {}),
+            structlog.stdlib.add_logger_name,
+            structlog.stdlib.add_log_level,
+            _timestamper,
+            structlog.processors.StackInfoRenderer(),
+            structlog.stdlib.ProcessorFormatter.wrap_for_formatter,
+        ],
+        logger_factory=structlog.stdlib.LoggerFactory(),
+        wrapper_class=structlog.stdlib.BoundLogger,
+        cache_logger_on_first_use=True,
+    )
+
+
+def json_formatter(renderer: str = 'json') -> structlog.stdlib.ProcessorFormatter:
+    """Formatter for both structlog events and plain logging records (LOGGING 'formatters')."""
+    if renderer == 'console':
+        final = structlog.dev.ConsoleRenderer()
+    else:
+        final = structlog.processors.JSONRenderer()
+    return structlog.stdlib.ProcessorFormatter(
+        # Records from plain logging calls: add what the structlog chain would have
+        foreign_pre_chain=[
+            structlog.stdlib.add_logger_name,
+            structlog.stdlib.add_log_level,
+            structlog.stdlib.ExtraAdder(),
+            _merge_queued_context,
+            _timestamper,
+        ],
+        processors=[
+            structlog.stdlib.ProcessorFormatter.remove_processors_meta,
+            structlog.processors.format_exc_info,
+            final,
+        ],
+    )
+
+
+class QueueHandler(logging.handlers.QueueHandler):
+    """
+    Queue records for a listener thread that formats and writes them.
+
+    Unlike the stdlib QueueHandler, prepare() does not format the record in
+    the calling thread; it only resolves the message and captures the
+    request context.
+    """
+
+    dropped = 0
+
+    def __init__(self, stream=None, maxsize: int = 10000):
+        super().__init__(queue.Queue(maxsize))
+        self.maxsize = maxsize
+        self.target = logging.StreamHandler(stream or sys.stderr)
+        self.listener = None
+        self.listener_pid = None
+        self._start_lock = threading.Lock()
+        os.register_at_fork(after_in_child=self._after_fork)
+        atexit.register(self._stop_listener)
+
+    def _after_fork(self):
+        # The parent's listener thread does not exist here, and its queue may hold records it never wrote
+        self._start_lock = threading.Lock()
+        self.queue = queue.Queue(self.maxsize)
+        self.listener = None
+        self.listener_pid = None
+
+    def _ensure_listener(self):
+        if self.listener_pid == os.getpid():
+            return
+        with self._start_lock:
+            if self.listener_pid != os.getpid():
+                self.listener = logging.handlers.QueueListener(self.queue, self.target, respect_handler_level=True)
+                self.listener.start()
+                self.listener_pid = os.getpid()
+
+    def _stop_listener(self):
+        # Flushes queued records; safe to call more than once
+        if self.listener is not None and self.listener_pid == os.getpid() and self.listener._thread is not None:
+            self.listener.stop()
+
+    def setFormatter(self, fmt):
+        # Formatting happens in the listener thread
+        self.target.setFormatter(fmt)
+
+    def prepare(self, record):
+        record = logging.makeLogRecord(record.__dict__)
+        if not isinstance(record.msg, dict):  # structlog events carry a dict
+            record.msg = record.getMessage()
+            record.args = None
+            setattr(record, CONTEXT_ATTR, structlog.contextvars.get_contextvars())
+        return record
+
+    def enqueue(self, record):
+        self._ensure_listener()
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            # Never block a request on logging: drop the record, but count it
+            self.dropped += 1
+
+    def close(self):
+        self._stop_listener()
+        super().close()
+
+
+class RequestLogMiddleware:
+    """Bind a request id to the request's log context and log each finished request."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        from django.conf import settings
+
+        self.get_response = get_response
+        self.slow_ms = settings.LOG_SLOW_REQUEST_MS
+        self.logger = structlog.get_logger('apps.requests')
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+
+        request_id = self._start(request)
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            duration_ms = round((time.perf_counter() - started) * 1000, 1)
+
+        # Session-authenticated users are only known now (JWT binds in authentication)
+        self._bind_user(getattr(request, 'user', None))
+        return self._finish(request, response, request_id, duration_ms)
+
+    async def __acall__(self, request):
+        request_id = self._start(request)
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            duration_ms = round((time.perf_counter() - started) * 1000, 1)
+
+        # The lazy request.user would query the session synchronously
+        if 'user_id' not in structlog.contextvars.get_contextvars() and hasattr(request, 'auser'):
+            self._bind_user(await request.auser())
+        return self._finish(request, response, request_id, duration_ms)
+
+    @staticmethod
+    def _start(request) -> str:
+        structlog.contextvars.clear_contextvars()
+        request_id = (request.headers.get('X-Request-ID') or uuid.uuid4().hex)[:64]
+        bind_request_context(request_id=request_id)
+        return request_id
+
+    @staticmethod
+    def _bind_user(user) -> None:
+        if user is not None and user.is_authenticated and 'user_id' not in structlog.contextvars.get_contextvars():
+            bind_user_context(user)
+
+    def _finish(self, request, response, request_id: str, duration_ms: float):
+        from .metrics import view_label
+
+        self.logger.info(
+            'request.finished',
+            method=request.method,
+            path=request.path,
+            view=view_label(request),
+            status=response.status_code,
+            duration_ms=duration_ms,
+            # Errors and slow requests are never sampled away
+            keep=response.status_code >= 400 or duration_ms >= self.slow_ms,
+        )
+        response['X-Request-ID'] = request_id
+        structlog.contextvars.clear_contextvars()
+        return response
@@ -0,0 +1,91 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.core.benchmark import DEFAULT_MIX, compare, run_benchmark
+
+
+def parse_mix(value: str) -> dict:
+    """'jobs.list=40,applications.list=30' -> {'jobs.list': 40, 'applications.list': 30}"""
+    mix = {}
+    for item in value.split(','):
+        name, _, weight = item.partition('=')
+        if name.strip() not in DEFAULT_MIX or not weight.strip().isdigit():
+            raise CommandError(f"Invalid mix entry {item!r}; scenarios: {', '.join(DEFAULT_MIX)}")
+        mix[name.strip()] = int(weight)
+    return mix
+
+
+class Command(BaseCommand):
+    help = "Benchmark the API with a realistic request mix against the local (seeded) database."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--duration', type=float, default=30, help="Seconds to run. Default: 30.")
+        parser.add_argument('--concurrency', type=int, default=4, help="Parallel clients. Default: 4.")
+        parser.add_argument('--requests', type=int, default=10_000, help="Max measured requests per client.")
+        parser.add_argument('--warmup', type=int, default=20, help="Unmeasured requests per client first.")
+        parser.add_argument('--youth', type=int, default=200, help="Generated youth to act as. Default: 200.")
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument(
+            '--mix', type=parse_mix,
+            help=f"Scenario weights, e.g. {','.join(f'{name}={weight}' for name, weight in DEFAULT_MIX.items())}",
+        )
+        parser.add_argument('--save-baseline', metavar='PATH', help="Write the report as a baseline.")
+        parser.add_argument('--baseline', metavar='PATH', help="Compare against a saved baseline.")
+        parser.add_argument(
+            '--tolerance', type=float, default=0.1,
+            help="Allowed relative p95 growth before a scenario counts as regressed. Default: 0.1.",
+        )
+        parser.add_argument('--fail-on-regression', action='store_true', help="Exit non-zero on a regression.")
+        parser.add_argument('--json', action='store_true', help="Print the report as JSON.")
+
+    def handle(self, *args, **options):
+        try:
+            report = run_benchmark(
+                duration=options['duration'],
+                concurrency=options['concurrency'],
+                max_requests=options['requests'],
+                warmup=options['warmup'],
+                youth=options['youth'],
+                mix=options['mix'],
+                seed=options['seed'],
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        changes = None
+        if options['baseline']:
+            with open(options['baseline']) as f:
+                changes = compare(report, json.load(f), options['tolerance'])
+
+        if options['json']:
+            self.stdout.write(json.dumps({'report': report, 'comparison': changes}, indent=2))
+        else:
+            self._print_report(report, changes)
+
+        if options['save_baseline']:
+            with open(options['save_baseline'], 'w') as f:
+                json.dump(report, f, indent=2)
+            self.stderr.write(f"Saved baseline to {options['save_baseline']}.")
+
+        if changes and options['fail_on_regression'] and any(change['regressed'] for change in changes):
+            raise CommandError("Performance regressed against the baseline.")
+
+    def _print_report(self, report, changes):
+        header = f"{'scenario':<22}{'requests':>9}{'errors':>8}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'req/s':>8}{'queries':>9}"
+        self.stdout.write(header)
+        for scenario, row in report.items():
+            self.stdout.write(
+                f"{scenario:<22}{row['requests']:>9}{row['errors']:>8}{row['p50_ms']:>9}{row['p95_ms']:>9}"
+                f"{row['p99_ms']:>9}{row['throughput_rps']:>8}{row['queries_per_request']:>9}"
+            )
+        if changes is None:
+            return
+        self.stdout.write("\nAgainst baseline:")
+        for change in changes:
+            line = (
+                f"{change['scenario']:<22} p95 {change['baseline_p95_ms']} -> {change['p95_ms']} ms "
+                f"({change['p95_change']:+.1%}), queries {change['baseline_queries_per_request']} -> "
+                f"{change['queries_per_request']}"
+            )
+            self.stdout.write(self.style.ERROR(line + "  REGRESSED") if change['regressed'] else line)
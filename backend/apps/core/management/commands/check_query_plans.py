@@ -0,0 +1,38 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.core.query_plans import CHECKS, run_checks
+
+
+class Command(BaseCommand):
+    help = "EXPLAIN the hot querysets against the synthetic dataset and fail on sequential scans or cost regressions."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check', action='append', choices=[check.name for check in CHECKS],
+            help="Only run this check (repeatable).",
+        )
+        parser.add_argument(
+            '--cost-factor', type=float, default=1.0,
+            help="Scale every cost bound, e.g. for a dataset larger than the default. Default: 1.",
+        )
+        parser.add_argument('--show-plans', action='store_true', help="Print the JSON plan of failing checks.")
+
+    def handle(self, *args, **options):
+        try:
+            results = run_checks(options['check'], options['cost_factor'])
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        for result in results:
+            if result.passed:
+                self.stdout.write(self.style.SUCCESS(f"ok    {result.check} (cost {result.cost:.0f})"))
+                continue
+            self.stdout.write(self.style.ERROR(f"FAIL  {result.check}: {'; '.join(result.failures)}"))
+            if options['show_plans']:
+                self.stdout.write(json.dumps(result.plan, indent=2))
+
+        failed = [result.check for result in results if not result.passed]
+        if failed:
+            raise CommandError(f"{len(failed)} of {len(results)} query plan checks failed: {', '.join(failed)}")
@@ -0,0 +1,23 @@
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = "Remove chunked uploads that were never completed (local media storage)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--older-than', type=int, default=settings.UPLOAD_SESSION_MAX_AGE,
+            help="Age in seconds after which an incomplete upload is removed.",
+        )
+
+    def handle(self, *args, **options):
+        if not hasattr(default_storage, 'cleanup_multipart_uploads'):
+            self.stdout.write(
+                "The bucket cleans up incomplete uploads itself; configure its "
+                "AbortIncompleteMultipartUpload lifecycle rule."
+            )
+            return
+        removed = default_storage.cleanup_multipart_uploads(options['older_than'])
+        self.stdout.write(self.style.SUCCESS(f"Removed {removed} incomplete uploads."))
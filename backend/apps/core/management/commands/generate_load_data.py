@@ -0,0 +1,40 @@
+import time
+from dataclasses import fields
+
+from django.core.management.base import BaseCommand
+
+from apps.core.synthetic import LOAD_TEST_PASSWORD, Options, flush, generate
+
+
+class Command(BaseCommand):
+    help = "Generate deterministic, production-scale synthetic data for load testing."
+
+    def add_arguments(self, parser):
+        defaults = Options()
+        for option in fields(Options):
+            parser.add_argument(
+                f"--{option.name.replace('_', '-')}",
+                type=option.type,
+                default=getattr(defaults, option.name),
+                help=f"Default: {getattr(defaults, option.name)}",
+            )
+        parser.add_argument('--flush', action='store_true', help="Delete previously generated data first.")
+        parser.add_argument('--flush-only', action='store_true', help="Delete previously generated data and stop.")
+
+    def handle(self, *args, **options):
+        if options['flush'] or options['flush_only']:
+            flush()
+            self.stdout.write("Removed previously generated load test data.")
+            if options['flush_only']:
+                return
+
+        started = time.monotonic()
+        counts = generate(
+            Options(**{option.name: options[option.name] for option in fields(Options)}),
+            progress=self.stdout.write,
+        )
+        summary = ', '.join(f"{count} {name}" for name, count in counts.items())
+        self.stdout.write(self.style.SUCCESS(
+            f"Generated {summary} in {time.monotonic() - started:.0f}s. "
+            f"Every user's password is {LOAD_TEST_PASSWORD!r}."
+        ))
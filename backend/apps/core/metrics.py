@@ -0,0 +1,292 @@
+"""
+Per-endpoint performance metrics in the Prometheus text format.
+
+MetricsMiddleware records, per resolved view and DRF action:
+
+- request latency (histogram, also labelled with method and status)
+- number of DB queries and time spent in them
+- time spent producing serializer output (``serializer.data``)
+- response size in bytes
+
+Streamed responses (exports, roster imports) do their work while the
+body is iterated, after the view has returned, so they are recorded when
+the stream ends and include the queries and time spent streaming.
+
+The middleware works in both sync and async (ASGI) stacks. Queries are
+counted by a wrapper installed on every DB connection, which finds the
+request through a context variable: it follows the request into
+sync_to_async threads and into the iteration of streamed bodies.
+
+/metrics serves the metrics only with ``Authorization: Bearer
+<METRICS_TOKEN>``, and answers 403 to everyone while METRICS_TOKEN is unset.
+Requests that do not resolve to a view share the ``<unresolved>`` label,
+so scanners cannot blow up label cardinality.
+
+Workers (gunicorn, uvicorn) are separate processes, each with its own
+counters. Set PROMETHEUS_MULTIPROC_DIR to an empty, writable directory
+before the workers start: every worker then writes its samples there and
+/metrics aggregates all of them, whichever worker answers the scrape.
+Clear the directory on deploy, and call mark_worker_dead(pid) from the
+server's child-exit hook (gunicorn: ``child_exit``) so gauges of dead
+workers are dropped.
+
+Metrics are disabled, and the middleware is a pass-through, when
+prometheus_client is not installed.
+"""
+import contextvars
+import os
+import time
+from dataclasses import dataclass, field
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.http import HttpResponse, HttpResponseForbidden
+from django.utils.crypto import constant_time_compare
+
+try:
+    import prometheus_client
+    from prometheus_client import CollectorRegistry, Histogram, multiprocess
+except ImportError:  # metrics are optional
+    prometheus_client = None
+
+UNRESOLVED = '<unresolved>'
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 250)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+
+@dataclass
+class RequestStats:
+    """Accumulated while a request is handled."""
+    db_queries: int = 0
+    db_seconds: float = 0.0
+    serializer_seconds: float = 0.0
+    serializer_depth: int = 0
+    started: float = field(default_factory=time.perf_counter)
+
+
+_current = contextvars.ContextVar('request_metrics', default=None)
+
+
+if prometheus_client is not None:
+    REQUEST_LATENCY = Histogram(
+        'http_request_duration_seconds', "Time to produce the response.",
+        ['view', 'method', 'status'], buckets=LATENCY_BUCKETS,
+    )
+    DB_QUERIES = Histogram(
+        'http_request_db_queries', "DB queries per request.",
+        ['view', 'method'], buckets=QUERY_COUNT_BUCKETS,
+    )
+    DB_SECONDS = Histogram(
+        'http_request_db_seconds', "Time spent in DB queries per request.",
+        ['view', 'method'], buckets=LATENCY_BUCKETS,
+    )
+    SERIALIZER_SECONDS = Histogram(
+        'http_request_serializer_seconds', "Time spent producing serializer output per request.",
+        ['view', 'method'], buckets=LATENCY_BUCKETS,
+    )
+    RESPONSE_SIZE = Histogram(
+        'http_response_size_bytes', "Response body size.",
+        ['view', 'method'], buckets=SIZE_BUCKETS,
+    )
+
+
+def view_label(request) -> str:
+    """'<ViewClass>.<action>' for DRF views, else the URL name or view path."""
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return UNRESOLVED
+    func = match.func
+    cls = getattr(func, 'cls', None) or getattr(func, 'view_class', None)
+    if cls is None:
+        return match.view_name or match._func_path
+    actions = getattr(func, 'actions', None)
+    if actions:
+        action = actions.get(request.method.lower())
+        if action:
+            return f'{cls.__name__}.{action}'
+    return f'{cls.__name__}.{request.method.lower()}'
+
+
+def _count_queries(execute, sql, params, many, context):
+    stats = _current.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.db_queries += 1
+        stats.db_seconds += time.perf_counter() - started
+
+
+def _install_query_counting(sender, connection, **kwargs):
+    if _count_queries not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_count_queries)
+
+
+def install_query_counting() -> None:
+    """Count the queries of every DB connection opened from now on."""
+    connection_created.connect(_install_query_counting, dispatch_uid='apps.core.metrics.query_counting')
+
+
+def install_serializer_timing() -> None:
+    """Time BaseSerializer.data, which every top-level serializer output goes through."""
+    from rest_framework.serializers import BaseSerializer
+
+    original = BaseSerializer.data.fget
+    if getattr(original, 'timed', False):
+        return
+
+    def data(self):
+        stats = _current.get()
+        if stats is None:
+            return original(self)
+        # Serializer.data and ListSerializer.data call up to BaseSerializer.data
+        stats.serializer_depth += 1
+        started = time.perf_counter()
+        try:
+            return original(self)
+        finally:
+            stats.serializer_depth -= 1
+            if stats.serializer_depth == 0:
+                stats.serializer_seconds += time.perf_counter() - started
+
+    data.timed = True
+    BaseSerializer.data = property(data)
+
+
+def _record(request, response, stats: RequestStats, size: int) -> None:
+    view = view_label(request)
+    method = request.method
+    REQUEST_LATENCY.labels(view, method, str(response.status_code)).observe(time.perf_counter() - stats.started)
+    DB_QUERIES.labels(view, method).observe(stats.db_queries)
+    DB_SECONDS.labels(view, method).observe(stats.db_seconds)
+    SERIALIZER_SECONDS.labels(view, method).observe(stats.serializer_seconds)
+    RESPONSE_SIZE.labels(view, method).observe(size)
+
+
+def _streamed(content, stats: RequestStats, finish):
+    """Iterate a streamed body with the request's stats current, then record."""
+    size = 0
+    iterator = iter(content)
+    try:
+        while True:
+            token = _current.set(stats)
+            try:
+                chunk = next(iterator)
+            except StopIteration:
+                break
+            finally:
+                _current.reset(token)
+            size += len(chunk)
+            yield chunk
+    finally:
+        finish(size)
+
+
+async def _astreamed(content, stats: RequestStats, finish):
+    size = 0
+    iterator = aiter(content)
+    try:
+        while True:
+            token = _current.set(stats)
+            try:
+                chunk = await anext(iterator)
+            except StopAsyncIteration:
+                break
+            finally:
+                _current.reset(token)
+            size += len(chunk)
+            yield chunk
+    finally:
+        finish(size)
+
+
+class MetricsMiddleware:
+    """Record per-view latency, DB, serializer and size metrics."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.enabled = prometheus_client is not None
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if not self.enabled:
+            return self.get_response(request)
+
+        stats = RequestStats()
+        token = _current.set(stats)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self._finish(request, response, stats)
+
+    async def __acall__(self, request):
+        if not self.enabled:
+            return await self.get_response(request)
+
+        stats = RequestStats()
+        token = _current.set(stats)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self._finish(request, response, stats)
+
+    def _finish(self, request, response, stats: RequestStats):
+        if not response.streaming:
+            _record(request, response, stats, len(response.content))
+            return response
+
+        def finish(size):
+            _record(request, response, stats, size)
+
+        if response.is_async:
+            response.streaming_content = _astreamed(response.streaming_content, stats, finish)
+        else:
+            response.streaming_content = _streamed(response.streaming_content, stats, finish)
+        return response
+
+
+def _registry():
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return registry
+    return prometheus_client.REGISTRY
+
+
+def has_metrics_token(request) -> bool:
+    """The request carries ``Authorization: Bearer <METRICS_TOKEN>`` (never true while it is unset)."""
+    return bool(settings.METRICS_TOKEN) and constant_time_compare(
+        request.headers.get('Authorization', ''), f'Bearer {settings.METRICS_TOKEN}'
+    )
+
+
+def metrics_view(request):
+    """Prometheus scrape endpoint. Requires ``Authorization: Bearer <METRICS_TOKEN>``; closed without one."""
+    if prometheus_client is None:
+        return HttpResponse("prometheus_client is not installed.", status=503, content_type='text/plain')
+    if not has_metrics_token(request):
+        return HttpResponseForbidden()
+    return HttpResponse(
+        prometheus_client.generate_latest(_registry()),
+        content_type=prometheus_client.CONTENT_TYPE_LATEST,
+    )
+
+
+def mark_worker_dead(pid: int) -> None:
+    """Drop a dead worker's live gauges from the multiprocess directory."""
+    if prometheus_client is not None and os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        multiprocess.mark_process_dead(pid)
@@ -0,0 +1,205 @@
+"""
+Query-plan regression checks for the hot querysets.
+
+Each check builds a queryset the way the code serving it does (the
+lottery service, the role-scoped ViewSet querysets with their ordering
+and first page), runs ``EXPLAIN (FORMAT JSON)`` on it and asserts:
+
+- no sequential scan on a large table (LARGE_TABLE_ROWS or more rows by
+  the planner's statistics), so small lookup tables may still be scanned
+- an index scan on each table listed in ``index_on``, and a scan of
+  each index listed in ``uses_index`` (the hot-path indexes, so
+  dropping or bypassing one is caught)
+- the planner's total cost stays within ``max_cost``, sized for the
+  default generate_load_data dataset (scale with ``cost_factor``)
+
+Plans depend on data and statistics, so run the checks against the
+synthetic dataset (``manage.py generate_load_data``, which ANALYZEs),
+through ``manage.py check_query_plans``.
+"""
+import json
+from dataclasses import dataclass, field
+from typing import Callable
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+from rest_framework.test import APIRequestFactory
+
+from apps.jobs.cache import published_jobs_queryset
+from apps.jobs.views import ApplicationViewSet, JobViewSet
+from apps.lottery.models import JobGroup
+from apps.lottery.services import ELIGIBILITY_BATCH_SIZE, eligible_applications, pending_group_applications
+from apps.lottery.views import LotteryRunViewSet
+from .synthetic import LOAD_TEST_EMAIL_DOMAIN, LOAD_TEST_SLUG_PREFIX, load_test_admin
+
+User = get_user_model()
+
+LARGE_TABLE_ROWS = 10_000
+
+INDEX_SCANS = {'Index Scan', 'Index Only Scan', 'Bitmap Index Scan'}
+
+
+@dataclass
+class PlanCheck:
+    name: str
+    # Returns the queryset to explain, given the Fixtures
+    build: Callable
+    index_on: tuple[str, ...] = ()
+    uses_index: tuple[str, ...] = ()
+    max_cost: float | None = None
+
+
+@dataclass
+class PlanResult:
+    check: str
+    cost: float
+    failures: list[str] = field(default_factory=list)
+    plan: dict | None = None
+
+    @property
+    def passed(self) -> bool:
+        return not self.failures
+
+
+class Fixtures:
+    """Representative rows from the synthetic dataset to parameterize the querysets."""
+
+    def __init__(self):
+        users = User.objects.filter(email__endswith=f'@{LOAD_TEST_EMAIL_DOMAIN}')
+        self.youth = users.filter(role=User.Roles.YOUTH, youth_profile__applications__isnull=False).first()
+        self.group = (
+            JobGroup.objects.filter(municipality__slug__startswith=LOAD_TEST_SLUG_PREFIX, jobs__isnull=False)
+            .select_related('period', 'municipality').first()
+        )
+        if self.youth is None or self.group is None:
+            raise ValueError("No synthetic dataset found; run generate_load_data first.")
+        self.admin = load_test_admin(self.group.municipality)
+
+
+def _view_queryset(viewset, user, action: str = 'list'):
+    """The ViewSet's queryset for this user, ordered and cut to its first page as the list view would."""
+    view = viewset(action=action, format_kwarg=None)
+    request = Request(APIRequestFactory().get('/'))
+    request.user = user
+    view.request = request
+    queryset = view.filter_queryset(view.get_queryset())
+    return queryset[:api_settings.PAGE_SIZE]
+
+
+CHECKS = [
+    PlanCheck(
+        'lottery.pending_group_applications',
+        lambda f: pending_group_applications(f.group),
+        # One ordered scan of the partial index, nothing joined
+        index_on=('jobs_application',),
+        uses_index=('app_group_pending_idx',),
+        max_cost=50_000,
+    ),
+    PlanCheck(
+        'lottery.eligible_applications',
+        lambda f: eligible_applications(
+            f.group,
+            [app['id'] for app in pending_group_applications(f.group)[:ELIGIBILITY_BATCH_SIZE]],
+        ),
+        # Primary key lookups of one batch's applications, youth and jobs
+        index_on=('jobs_application', 'users_youthprofile'),
+    ),
+    PlanCheck(
+        'jobs.youth_listing',
+        lambda f: published_jobs_queryset(f.youth.municipality_id)[:api_settings.PAGE_SIZE],
+        uses_index=('job_published_muni_idx',),
+        max_cost=2_000,
+    ),
+    PlanCheck(
+        'jobs.municipality_admin',
+        lambda f: _view_queryset(JobViewSet, f.admin),
+        uses_index=('job_muni_created_idx',),
+        max_cost=2_000,
+    ),
+    PlanCheck(
+        'applications.youth',
+        lambda f: _view_queryset(ApplicationViewSet, f.youth),
+        # The youth FK index, then a sort of the youth's few applications
+        index_on=('jobs_application',),
+        max_cost=200,
+    ),
+    PlanCheck(
+        'applications.municipality_admin',
+        lambda f: _view_queryset(ApplicationViewSet, f.admin),
+        index_on=('jobs_application',),
+        uses_index=('app_muni_created_idx',),
+        max_cost=5_000,
+    ),
+    PlanCheck(
+        'lottery_runs.municipality_admin',
+        lambda f: _view_queryset(LotteryRunViewSet, f.admin),
+        max_cost=1_000,
+    ),
+]
+
+
+def _large_tables() -> set[str]:
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT relname FROM pg_class WHERE relkind = 'r' AND reltuples >= %s",
+            [LARGE_TABLE_ROWS],
+        )
+        return {row[0] for row in cursor.fetchall()}
+
+
+def _index_tables() -> dict[str, str]:
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT indexname, tablename FROM pg_indexes WHERE schemaname = current_schema()")
+        return dict(cursor.fetchall())
+
+
+def explain(queryset) -> dict:
+    """The JSON plan of a queryset (``EXPLAIN (FORMAT JSON)``, not executed)."""
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return plan[0]['Plan']
+
+
+def _nodes(plan: dict):
+    yield plan
+    for child in plan.get('Plans', ()):
+        yield from _nodes(child)
+
+
+def run_check(check: PlanCheck, fixtures: Fixtures, large_tables: set[str], index_tables: dict[str, str],
+              cost_factor: float = 1.0) -> PlanResult:
+    plan = explain(check.build(fixtures))
+    result = PlanResult(check.name, plan['Total Cost'], plan=plan)
+    indexed, index_names = set(), set()
+    for node in _nodes(plan):
+        relation = node.get('Relation Name')
+        if node['Node Type'] == 'Seq Scan' and relation in large_tables:
+            result.failures.append(f"sequential scan on {relation}")
+        if node['Node Type'] in INDEX_SCANS:
+            indexed.add(relation or index_tables.get(node.get('Index Name')))
+            index_names.add(node.get('Index Name'))
+    for table in check.index_on:
+        if table not in indexed:
+            result.failures.append(f"no index scan on {table}")
+    for index in check.uses_index:
+        if index not in index_names:
+            result.failures.append(f"index {index} not used")
+    if check.max_cost is not None and result.cost > check.max_cost * cost_factor:
+        result.failures.append(f"cost {result.cost:.0f} exceeds {check.max_cost * cost_factor:.0f}")
+    return result
+
+
+def run_checks(names=None, cost_factor: float = 1.0) -> list[PlanResult]:
+    fixtures = Fixtures()
+    large_tables, index_tables = _large_tables(), _index_tables()
+    return [
+        run_check(check, fixtures, large_tables, index_tables, cost_factor)
+        for check in CHECKS
+        if not names or check.name in names
+    ]
@@ -0,0 +1,248 @@
+"""
+Media storage backends with multipart (resumable) uploads.
+
+MEDIA_STORAGE selects the default storage:
+
+- ``local``: LocalMultipartStorage, files under MEDIA_ROOT. Used in
+  development and tests; needs no network.
+- ``s3``: S3MultipartStorage, an S3-compatible bucket (MinIO from
+  docker-compose.yml locally, any S3 API in production). Download URLs
+  are presigned unless the bucket is served publicly (S3_CUSTOM_DOMAIN).
+  Image derivatives are the exception (S3_PUBLIC_DERIVATIVES): their URLs
+  are unsigned and stable, so browsers and CDNs can cache them for good;
+  the bucket must allow anonymous reads of the derivatives/ prefix.
+
+Both implement the same multipart interface, used by the upload API
+(apps/core/uploads.py): start an upload, send numbered parts in any
+order (re-sending a part replaces it), list the parts received so far
+to resume, then complete or abort. Parts are streamed to their
+destination as they are read from the request; no whole file is ever
+held in memory.
+
+Uploads that are never completed leave parts behind. Configure the
+bucket's AbortIncompleteMultipartUpload lifecycle rule, and run
+``cleanup_uploads`` for local storage.
+"""
+import hashlib
+import os
+import shutil
+import time
+import uuid
+
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files.storage import FileSystemStorage
+
+from .images import DERIVATIVES_PREFIX
+
+try:
+    from storages.backends.s3 import S3Storage
+except ImportError:  # django-storages/boto3 are only needed with MEDIA_STORAGE=s3
+    S3Storage = None
+
+# S3 limits: every part but the last must be at least 5 MiB, and there are at most 10 000 parts
+MIN_PART_SIZE = 5 * 1024 * 1024
+MAX_PARTS = 10000
+
+COPY_BUFFER_SIZE = 1024 * 1024
+
+
+class MultipartUploadError(Exception):
+    """An upload is unknown, incomplete or has invalid parts."""
+
+
+def _contiguous(parts: list[dict]) -> None:
+    numbers = [part['part_number'] for part in parts]
+    if not numbers:
+        raise MultipartUploadError("No parts have been uploaded.")
+    missing = sorted(set(range(1, max(numbers) + 1)) - set(numbers))
+    if missing:
+        raise MultipartUploadError(f"Missing parts: {', '.join(map(str, missing[:20]))}.")
+
+
+class LocalMultipartStorage(FileSystemStorage):
+    """
+    FileSystemStorage with the multipart interface. Parts are kept under
+    MEDIA_ROOT/.multipart/<upload_id>/ until the upload is completed.
+    """
+
+    multipart_dir = '.multipart'
+
+    def _upload_dir(self, upload_id: str) -> str:
+        try:
+            uuid.UUID(hex=upload_id)
+        except ValueError:
+            raise MultipartUploadError("Unknown upload.")
+        return os.path.join(self.location, self.multipart_dir, upload_id)
+
+    def _existing_upload_dir(self, upload_id: str) -> str:
+        path = self._upload_dir(upload_id)
+        if not os.path.isdir(path):
+            raise MultipartUploadError("Unknown upload.")
+        return path
+
+    def create_multipart_upload(self, name: str, content_type: str = '') -> str:
+        # Validates the name; the file itself is only created on completion
+        self.path(name)
+        upload_id = uuid.uuid4().hex
+        os.makedirs(self._upload_dir(upload_id))
+        return upload_id
+
+    def upload_part(self, name: str, upload_id: str, part_number: int, stream, size: int) -> str:
+        """Write one part from a file-like stream and return its ETag (MD5, as S3 does)."""
+        directory = self._existing_upload_dir(upload_id)
+        final_path = os.path.join(directory, f'{part_number:05d}')
+        temp_path = f'{final_path}.{uuid.uuid4().hex}.tmp'
+        digest = hashlib.md5(usedforsecurity=False)
+        written = 0
+        try:
+            with open(temp_path, 'wb') as f:
+                while written < size:
+                    chunk = stream.read(min(COPY_BUFFER_SIZE, size - written))
+                    if not chunk:
+                        break
+                    f.write(chunk)
+                    digest.update(chunk)
+                    written += len(chunk)
+            if written != size:
+                raise MultipartUploadError(f"Part {part_number} ended after {written} of {size} bytes.")
+            # Atomic, so a retried part never leaves a half-written file behind
+            os.replace(temp_path, final_path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+        return f'"{digest.hexdigest()}"'
+
+    def list_parts(self, name: str, upload_id: str) -> list[dict]:
+        directory = self._existing_upload_dir(upload_id)
+        parts = []
+        for entry in sorted(os.scandir(directory), key=lambda e: e.name):
+            if entry.is_file() and entry.name.isdigit():
+                parts.append({'part_number': int(entry.name), 'size': entry.stat().st_size})
+        return parts
+
+    def complete_multipart_upload(self, name: str, upload_id: str) -> str:
+        """Join the parts into the final file and return its name."""
+        directory = self._existing_upload_dir(upload_id)
+        parts = self.list_parts(name, upload_id)
+        _contiguous(parts)
+
+        name = self.get_available_name(name)
+        path = self.path(name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'xb') as target:
+            for part in parts:
+                with open(os.path.join(directory, f"{part['part_number']:05d}"), 'rb') as source:
+                    shutil.copyfileobj(source, target, COPY_BUFFER_SIZE)
+        if self.file_permissions_mode is not None:
+            os.chmod(path, self.file_permissions_mode)
+        shutil.rmtree(directory, ignore_errors=True)
+        return name
+
+    def abort_multipart_upload(self, name: str, upload_id: str) -> None:
+        shutil.rmtree(self._upload_dir(upload_id), ignore_errors=True)
+
+    def cleanup_multipart_uploads(self, older_than: float) -> int:
+        """Remove uploads not touched for older_than seconds. Returns how many."""
+        root = os.path.join(self.location, self.multipart_dir)
+        if not os.path.isdir(root):
+            return 0
+        cutoff = time.time() - older_than
+        removed = 0
+        for entry in os.scandir(root):
+            if entry.is_dir() and entry.stat().st_mtime < cutoff:
+                shutil.rmtree(entry.path, ignore_errors=True)
+                removed += 1
+        return removed
+
+
+if S3Storage is not None:
+
+    class S3MultipartStorage(S3Storage):
+        """
+        S3Storage (django-storages) with the multipart interface, talking to
+        the bucket through the boto3 client. Parts go straight from the
+        request stream to the bucket.
+        """
+
+        def _key(self, name: str) -> str:
+            try:
+                return self._normalize_name(self._clean_name(name))
+            except SuspiciousFileOperation as e:
+                raise MultipartUploadError(str(e))
+
+        def get_default_settings(self):
+            return {**super().get_default_settings(), 'public_derivatives': True}
+
+        @property
+        def _client(self):
+            return self.connection.meta.client
+
+        def url(self, name, parameters=None, expire=None, http_method=None):
+            url = super().url(name, parameters, expire, http_method)
+            if self.public_derivatives and self.querystring_auth and name.startswith(f'{DERIVATIVES_PREFIX}/'):
+                # A presigned URL changes on every response and expires; derivatives are public
+                return self._strip_signing_parameters(url)
+            return url
+
+        def get_object_parameters(self, name):
+            params = super().get_object_parameters(name)
+            if name.startswith(f'{DERIVATIVES_PREFIX}/'):
+                # Content-hashed names (see apps/core/images.py) never change content
+                params.setdefault('CacheControl', 'public, max-age=31536000, immutable')
+            return params
+
+        def create_multipart_upload(self, name: str, content_type: str = '') -> str:
+            params = self.get_object_parameters(name)
+            if content_type:
+                params['ContentType'] = content_type
+            response = self._client.create_multipart_upload(Bucket=self.bucket_name, Key=self._key(name), **params)
+            return response['UploadId']
+
+        def upload_part(self, name: str, upload_id: str, part_number: int, stream, size: int) -> str:
+            try:
+                response = self._client.upload_part(
+                    Bucket=self.bucket_name,
+                    Key=self._key(name),
+                    UploadId=upload_id,
+                    PartNumber=part_number,
+                    Body=stream,
+                    ContentLength=size,
+                )
+            except self._client.exceptions.NoSuchUpload:
+                raise MultipartUploadError("Unknown upload.")
+            return response['ETag']
+
+        def _list_parts(self, name: str, upload_id: str) -> list[dict]:
+            parts = []
+            paginator = self._client.get_paginator('list_parts')
+            try:
+                for page in paginator.paginate(Bucket=self.bucket_name, Key=self._key(name), UploadId=upload_id):
+                    parts.extend(page.get('Parts', []))
+            except self._client.exceptions.NoSuchUpload:
+                raise MultipartUploadError("Unknown upload.")
+            return parts
+
+        def list_parts(self, name: str, upload_id: str) -> list[dict]:
+            return [
+                {'part_number': part['PartNumber'], 'size': part['Size']}
+                for part in self._list_parts(name, upload_id)
+            ]
+
+        def complete_multipart_upload(self, name: str, upload_id: str) -> str:
+            # The bucket's own part list is authoritative, so clients never send ETags
+            parts = self._list_parts(name, upload_id)
+            _contiguous([{'part_number': part['PartNumber']} for part in parts])
+            self._client.complete_multipart_upload(
+                Bucket=self.bucket_name,
+                Key=self._key(name),
+                UploadId=upload_id,
+                MultipartUpload={'Parts': [{'PartNumber': p['PartNumber'], 'ETag': p['ETag']} for p in parts]},
+            )
+            return name
+
+        def abort_multipart_upload(self, name: str, upload_id: str) -> None:
+            try:
+                self._client.abort_multipart_upload(Bucket=self.bucket_name, Key=self._key(name), UploadId=upload_id)
+            except self._client.exceptions.NoSuchUpload:
+                pass
+
@@ -0,0 +1,311 @@
+"""
+Deterministic synthetic data for load testing.
+
+generate() builds a complete, production-shaped data set: municipalities
+with workplaces, periods, job groups and published jobs, youth users with
+profiles, and ranked applications. The same seed and options always
+produce the same rows, ids included (youth profiles excepted: their ids
+come from the table's sequence).
+
+Small tables are written with bulk_create. Users, youth profiles and
+applications are streamed to PostgreSQL with COPY, straight from
+generators, so a million applications take minutes and little memory.
+No password is hashed per user: every generated user shares one hash of
+LOAD_TEST_PASSWORD, so the data can also drive login load tests.
+
+Rows are written with COPY and bulk_create, so signals do not run; the
+demand counters and the published job listings cache are refreshed
+explicitly at the end.
+
+Everything generated is recognizable by slug (``loadtest-``) and email
+domain (LOAD_TEST_EMAIL_DOMAIN), and flush() removes it again.
+"""
+import bisect
+import itertools
+import json
+import random
+import uuid
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta, timezone as dt_timezone
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import connection, transaction
+
+from apps.core.grades import GRADE_ORDER
+from apps.jobs.cache import invalidate_published_jobs
+from apps.jobs.demand import refresh_job_demand
+from apps.jobs.models import Application, Job
+from apps.lottery.models import JobGroup, Period
+from apps.organizations.models import Municipality, Workplace
+from apps.users.models import YouthProfile
+
+User = get_user_model()
+
+LOAD_TEST_SLUG_PREFIX = 'loadtest-'
+LOAD_TEST_EMAIL_DOMAIN = 'loadtest.invalid'
+LOAD_TEST_PASSWORD = 'loadtest-password'
+
+SCHOOLS = ['Centralskolan', 'Norrskolan', 'Söderskolan', 'Västerskolan', 'Österskolan', 'Gymnasiet']
+FIRST_NAMES = ['Alva', 'Elsa', 'Maja', 'Ella', 'Wilma', 'Noah', 'William', 'Hugo', 'Lucas', 'Liam', 'Ali', 'Sara']
+LAST_NAMES = ['Andersson', 'Johansson', 'Karlsson', 'Nilsson', 'Eriksson', 'Larsson', 'Olsson', 'Persson']
+JOB_TITLES = ['Parkarbetare', 'Bibliotekshjälp', 'Vårdbiträde', 'Fritidsledare', 'Kökshjälp', 'Lägerledare']
+
+# Youth grades (the summer job ages), most common first
+YOUTH_GRADES = ['GYM_1', 'YEAR_9', 'GYM_2', 'YEAR_8', 'GYM_3']
+YOUTH_GRADE_WEIGHTS = [30, 25, 20, 15, 10]
+
+COPY_PROGRESS_EVERY = 100_000
+
+
+@dataclass
+class Options:
+    seed: int = 1
+    municipalities: int = 5
+    workplaces_per_municipality: int = 20
+    periods_per_municipality: int = 3
+    groups_per_period: int = 4
+    jobs: int = 5000
+    youth: int = 100_000
+    # Applications per youth: uniform between the two, capped by available jobs
+    min_choices: int = 5
+    max_choices: int = 15
+    # Zipf exponent of job popularity (0: every job equally popular)
+    popularity_skew: float = 1.1
+    # Share of jobs open to every grade; the rest have a grade window
+    open_job_share: float = 0.5
+    # Summer the data is for; all dates derive from it, keeping runs deterministic
+    year: int = 2026
+
+
+class _Ids:
+    """Deterministic UUIDs from the run's random generator."""
+
+    def __init__(self, rng: random.Random):
+        self.rng = rng
+
+    def __call__(self) -> uuid.UUID:
+        return uuid.UUID(int=self.rng.getrandbits(128), version=4)
+
+
+def _copy(table: str, columns: list[str], rows, progress=None) -> int:
+    """Stream rows into a table with COPY FROM STDIN."""
+    count = 0
+    with connection.cursor() as cursor:
+        with cursor.cursor.copy(f'COPY {table} ({", ".join(columns)}) FROM STDIN') as copy:
+            for row in rows:
+                copy.write_row(row)
+                count += 1
+                if progress and count % COPY_PROGRESS_EVERY == 0:
+                    progress(f"  {table}: {count} rows")
+    return count
+
+
+def _zipf_cumulative_weights(count: int, skew: float) -> list[float]:
+    return list(itertools.accumulate(1 / (rank ** skew) for rank in range(1, count + 1)))
+
+
+def load_test_admin(municipality):
+    """The generated municipality's admin user (created on first use)."""
+    admin, _ = User.objects.get_or_create(
+        email=f'admin-{municipality.slug}@{LOAD_TEST_EMAIL_DOMAIN}',
+        defaults={
+            'username': f'admin-{municipality.slug}',
+            'role': User.Roles.MUNICIPALITY_ADMIN,
+            'municipality': municipality,
+            'password': make_password(LOAD_TEST_PASSWORD),
+        },
+    )
+    return admin
+
+
+def flush() -> None:
+    """Delete everything a previous generate() created."""
+    youth = YouthProfile.objects.filter(user__email__endswith=f'@{LOAD_TEST_EMAIL_DOMAIN}')
+    municipalities = Municipality.objects.filter(slug__startswith=LOAD_TEST_SLUG_PREFIX)
+    with transaction.atomic():
+        # Raw deletes: the ORM would collect and signal every row first
+        Application.objects.filter(youth__in=youth)._raw_delete(connection.alias)
+        youth._raw_delete(connection.alias)
+        User.objects.filter(email__endswith=f'@{LOAD_TEST_EMAIL_DOMAIN}')._raw_delete(connection.alias)
+        Application.objects.filter(municipality__in=municipalities)._raw_delete(connection.alias)
+        municipalities.delete()
+
+
+def generate(options: Options, progress=print) -> dict:
+    """
+    Generate a data set. Fails on unique constraints if the same seed was
+    already generated; flush() first.
+
+    Returns:
+        Row counts per model.
+    """
+    rng = random.Random(options.seed)
+    new_id = _Ids(rng)
+    created_at = datetime(options.year, 3, 1, 8, 0, tzinfo=dt_timezone.utc)
+    tag = f'{LOAD_TEST_SLUG_PREFIX}{options.seed}'
+    counts = {}
+
+    with transaction.atomic():
+        # Organizations, periods, groups
+        municipalities = [
+            Municipality(
+                id=new_id(),
+                name=f'Loadtest {options.seed}-{index}',
+                slug=f'{tag}-{index}',
+                custom_fields_schema=[{
+                    'key': 'school', 'label': 'Skola', 'type': 'single_select',
+                    'options': SCHOOLS, 'required': False,
+                }],
+            )
+            for index in range(options.municipalities)
+        ]
+        Municipality.objects.bulk_create(municipalities)
+
+        workplaces, periods, groups = [], [], []
+        for municipality in municipalities:
+            workplaces += [
+                Workplace(id=new_id(), municipality=municipality, name=f'Arbetsplats {index}')
+                for index in range(options.workplaces_per_municipality)
+            ]
+            for index in range(options.periods_per_municipality):
+                start = date(options.year, 6, 15) + timedelta(weeks=3 * index)
+                period = Period(
+                    id=new_id(),
+                    municipality=municipality,
+                    name=f'Period {index + 1}',
+                    start_date=start,
+                    end_date=start + timedelta(weeks=3),
+                    application_open=datetime.combine(date(options.year, 3, 1), time(8), dt_timezone.utc),
+                    application_close=datetime.combine(date(options.year, 4, 30), time(23, 59), dt_timezone.utc),
+                )
+                periods.append(period)
+                groups += [
+                    JobGroup(id=new_id(), municipality=municipality, period=period, name=f'Grupp {group} - {period.name}')
+                    for group in range(options.groups_per_period)
+                ]
+        Workplace.objects.bulk_create(workplaces)
+        Period.objects.bulk_create(periods)
+        JobGroup.objects.bulk_create(groups)
+        counts.update(municipalities=len(municipalities), workplaces=len(workplaces),
+                      periods=len(periods), groups=len(groups))
+
+        # Jobs, spread evenly over municipalities
+        workplaces_by_municipality = {m.id: [w for w in workplaces if w.municipality_id == m.id] for m in municipalities}
+        groups_by_municipality = {m.id: [g for g in groups if g.municipality_id == m.id] for m in municipalities}
+        jobs = []
+        for index in range(options.jobs):
+            municipality = municipalities[index % len(municipalities)]
+            group = rng.choice(groups_by_municipality[municipality.id]) if groups else None
+            min_grade = max_grade = None
+            if rng.random() >= options.open_job_share:
+                low = rng.randrange(GRADE_ORDER.index('YEAR_8'), GRADE_ORDER.index('GYM_2') + 1)
+                min_grade, max_grade = GRADE_ORDER[low], GRADE_ORDER[min(low + rng.randrange(1, 4), len(GRADE_ORDER) - 1)]
+            jobs.append(Job(
+                id=new_id(),
+                municipality=municipality,
+                workplace=rng.choice(workplaces_by_municipality[municipality.id]) if workplaces else None,
+                lottery_group=group,
+                title=f'{rng.choice(JOB_TITLES)} {index}',
+                total_spots=rng.choice((1, 1, 2, 2, 3, 5, 10)),
+                hourly_rate=Decimal(rng.randrange(90, 140)),
+                min_grade=min_grade,
+                max_grade=max_grade,
+                status=Job.Status.PUBLISHED,
+                job_type=Job.JobType.LOTTERY if group else Job.JobType.NORMAL,
+                custom_attributes={'school': rng.choice(SCHOOLS)} if rng.random() < 0.2 else {},
+            ))
+        Job.objects.bulk_create(jobs, batch_size=2000)
+        counts['jobs'] = len(jobs)
+        progress(f"Created {len(jobs)} jobs in {len(municipalities)} municipalities.")
+
+        # Users and youth profiles
+        password = make_password(LOAD_TEST_PASSWORD)
+        youth_municipality = [municipalities[index % len(municipalities)].id for index in range(options.youth)]
+        user_ids = [new_id() for _ in range(options.youth)]
+
+        def user_rows():
+            for index, user_id in enumerate(user_ids):
+                username = f'{tag}-youth-{index}'
+                yield (
+                    user_id, password, None, False, username,
+                    rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES), f'{username}@{LOAD_TEST_EMAIL_DOMAIN}',
+                    False, True, created_at, User.Roles.YOUTH, youth_municipality[index], None,
+                )
+
+        counts['users'] = _copy(
+            User._meta.db_table,
+            ['id', 'password', 'last_login', 'is_superuser', 'username', 'first_name', 'last_name', 'email',
+             'is_staff', 'is_active', 'date_joined', 'role', 'municipality_id', 'workplace_id'],
+            user_rows(), progress,
+        )
+
+        def profile_rows():
+            for index, user_id in enumerate(user_ids):
+                grade = rng.choices(YOUTH_GRADES, YOUTH_GRADE_WEIGHTS)[0]
+                age = 15 + max(0, GRADE_ORDER.index(grade) - GRADE_ORDER.index('YEAR_9'))
+                birth = date(options.year - age, 1, 1) + timedelta(days=rng.randrange(365))
+                yield (
+                    user_id, youth_municipality[index], '', birth, '', rng.choice(('MALE', 'FEMALE', 'OTHER')),
+                    grade, False, None, json.dumps({'school': rng.choice(SCHOOLS)}), created_at, created_at,
+                )
+
+        counts['youth_profiles'] = _copy(
+            YouthProfile._meta.db_table,
+            ['user_id', 'municipality_id', 'personal_number', 'date_of_birth', 'phone_number', 'gender',
+             'grade', 'has_protected_identity', 'manual_verification_code', 'custom_attributes',
+             'created_at', 'updated_at'],
+            profile_rows(), progress,
+        )
+        # Profile ids come from the table's sequence
+        profile_ids = dict(
+            YouthProfile.objects.filter(user_id__in=user_ids).values_list('user_id', 'id').iterator(chunk_size=10000)
+        )
+        progress(f"Created {counts['users']} youth users and profiles.")
+
+        # Ranked applications, with Zipf-distributed job popularity per municipality
+        jobs_by_municipality = {m.id: [job.id for job in jobs if job.municipality_id == m.id] for m in municipalities}
+        job_groups = {job.id: job.lottery_group_id for job in jobs}
+        weights = {
+            municipality_id: _zipf_cumulative_weights(len(job_ids), options.popularity_skew)
+            for municipality_id, job_ids in jobs_by_municipality.items()
+        }
+
+        def application_rows():
+            for index, user_id in enumerate(user_ids):
+                job_ids = jobs_by_municipality[youth_municipality[index]]
+                if not job_ids:
+                    continue
+                cumulative = weights[youth_municipality[index]]
+                wanted = min(rng.randint(options.min_choices, options.max_choices), len(job_ids))
+                chosen = {}
+                for _ in range(wanted * 20):
+                    job_id = job_ids[bisect.bisect(cumulative, rng.random() * cumulative[-1])]
+                    chosen.setdefault(job_id, len(chosen) + 1)
+                    if len(chosen) == wanted:
+                        break
+                applied_at = created_at + timedelta(seconds=rng.randrange(60 * 24 * 3600))
+                youth_id = profile_ids[user_id]
+                municipality_id = youth_municipality[index]
+                for job_id, rank in chosen.items():
+                    yield (
+                        new_id(), job_id, youth_id, Application.Status.PENDING, rank, applied_at,
+                        municipality_id, job_groups[job_id],
+                    )
+
+        counts['applications'] = _copy(
+            Application._meta.db_table,
+            ['id', 'job_id', 'youth_id', 'status', 'priority_rank', 'created_at', 'municipality_id', 'lottery_group_id'],
+            application_rows(), progress,
+        )
+        progress(f"Created {counts['applications']} applications.")
+
+        refresh_job_demand([job.id for job in jobs])
+
+    for municipality in municipalities:
+        invalidate_published_jobs(municipality.id)
+    with connection.cursor() as cursor:
+        for model in (User, YouthProfile, Job, Application):
+            cursor.execute(f'ANALYZE {model._meta.db_table}')
+    return counts
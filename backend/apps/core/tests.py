@@ -0,0 +1,77 @@
+import datetime
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from apps.jobs.models import Job
+from apps.jobs.views import JobViewSet
+from apps.organizations.models import Municipality
+from apps.users.models import User, YouthProfile
+from .tracing import instrument_drf, start_trace
+
+
+class CollectingExporter:
+    def __init__(self):
+        self.traces = []
+
+    def export(self, trace: dict) -> None:
+        self.traces.append(trace)
+
+
+@override_settings(TRACE_SAMPLE_RATE=0, TRACE_ALLOW_FORCE=True, TRACE_N_PLUS_ONE_THRESHOLD=3)
+class TracingTests(TestCase):
+    """Forced traces, exported to a list instead of the trace file."""
+
+    def setUp(self):
+        self.exporter = CollectingExporter()
+        patcher = mock.patch('apps.core.tracing.get_exporter', return_value=self.exporter)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.municipality = Municipality.objects.create(name='Testkommun', slug='testkommun')
+        Job.objects.create(municipality=self.municipality, title='Parkarbetare', status=Job.Status.PUBLISHED)
+        user = User.objects.create(email='youth@example.com', username='youth@example.com', role=User.Roles.YOUTH)
+        YouthProfile.objects.create(user=user, municipality=self.municipality, date_of_birth=datetime.date(2009, 5, 1))
+        self.client = APIClient()
+        self.client.force_authenticate(user)
+
+    def test_forced_request_is_traced_and_wrapped_action_routes(self):
+        response = self.client.get('/api/v1/jobs/eligible/', HTTP_X_TRACE='1')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['results']), 1)
+        [trace] = self.exporter.traces
+        self.assertEqual(response['X-Trace-ID'], trace['trace_id'])
+        self.assertEqual(trace['attributes']['status'], 200)
+        span_names = {span['name'] for span in trace['spans']}
+        self.assertIn('JobViewSet.eligible', span_names)
+        self.assertIn('db.query', span_names)
+
+    def test_untraced_request_has_no_trace_id(self):
+        response = self.client.get('/api/v1/jobs/eligible/')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn('X-Trace-ID', response)
+        self.assertEqual(self.exporter.traces, [])
+
+    def test_instrumented_action_keeps_its_routing_attributes(self):
+        instrument_drf()
+
+        self.assertTrue(getattr(JobViewSet.eligible, '__traced__', False))
+        self.assertEqual(JobViewSet.eligible.mapping, {'get': 'eligible'})
+        self.assertFalse(JobViewSet.eligible.detail)
+        self.assertIn('eligible', [action.__name__ for action in JobViewSet.get_extra_actions()])
+
+    def test_repeated_statement_is_reported_as_n_plus_one(self):
+        with start_trace('test', force=True) as trace:
+            for _ in range(3):
+                Municipality.objects.filter(pk=self.municipality.pk).exists()
+            Job.objects.count()
+
+        self.assertIsNotNone(trace)
+        [report] = self.exporter.traces[0]['summary']['n_plus_one']
+        self.assertIn('organizations_municipality', report['sql'])
+        self.assertEqual(report['count'], 3)
+        self.assertEqual(report['issued_by'], ['<root>'])
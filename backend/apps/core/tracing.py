@@ -0,0 +1,404 @@
+"""
+Lightweight request tracing.
+
+A sampled request (TRACE_SAMPLE_RATE, or any request sent with
+``X-Trace: 1`` when TRACE_ALLOW_FORCE is on) records a tree of spans:
+
+    http.request GET /api/v1/applications/
+      APIView.initial
+      ListModelMixin.list
+        ApplicationViewSet.get_queryset
+        GenericAPIView.paginate_queryset
+          db.query SELECT COUNT(*) ...
+          db.query SELECT ... FROM "jobs_application" ...
+        Serializer.to_representation
+          ApplicationSerializer.get_youth_name
+            db.query SELECT ... FROM "users_youthprofile" ...   <- once per row
+
+Spans come from:
+
+- DRF views and serializers, instrumented automatically: the generic DRF
+  methods (initial, get_queryset, get_object, paginate_queryset, list,
+  create, ..., Serializer.to_representation) plus every method the
+  project's own view and serializer classes define (actions, get_*
+  SerializerMethodField getters, validate*, ...).
+- ``@traced`` functions and ``with span(...)`` blocks, e.g. the lottery
+  services and their phases.
+- Every SQL statement, through an execute wrapper installed on each DB
+  connection; it finds the trace through a context variable, so queries
+  run in sync_to_async threads under ASGI are traced too.
+
+When the request finishes, the trace is summarized (span and query
+counts, time in SQL) and statements run at least
+TRACE_N_PLUS_ONE_THRESHOLD times are reported under ``n_plus_one`` with
+the spans that issued them. Traces are exported as one JSON object per
+line to TRACE_FILE, or POSTed to TRACE_COLLECTOR_URL, from a background
+thread.
+
+Unsampled requests pay for one context variable lookup per instrumented
+call.
+"""
+import contextvars
+import functools
+import json
+import queue
+import random
+import re
+import threading
+import time
+import urllib.request
+import uuid
+from collections import defaultdict
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.backends.signals import connection_created
+
+SQL_MAX_LENGTH = 1000
+
+# Generic DRF methods worth a span; the project's own methods are added per class
+VIEW_METHODS = {
+    'rest_framework.views.APIView': ['initial', 'finalize_response'],
+    'rest_framework.generics.GenericAPIView': [
+        'get_queryset', 'get_object', 'filter_queryset', 'paginate_queryset', 'get_serializer',
+    ],
+    'rest_framework.mixins.ListModelMixin': ['list'],
+    'rest_framework.mixins.RetrieveModelMixin': ['retrieve'],
+    'rest_framework.mixins.CreateModelMixin': ['create', 'perform_create'],
+    'rest_framework.mixins.UpdateModelMixin': ['update', 'perform_update'],
+    'rest_framework.mixins.DestroyModelMixin': ['destroy', 'perform_destroy'],
+    'rest_framework.serializers.Serializer': ['to_representation', 'is_valid'],
+    'rest_framework.serializers.ListSerializer': ['to_representation'],
+}
+
+# IN (%s, %s, %s) lists differ in length but are the same statement
+_IN_LIST = re.compile(r'\((?:%s, )+%s\)')
+
+
+@dataclass
+class Span:
+    name: str
+    span_id: str
+    parent_id: str | None
+    start: float
+    attributes: dict = field(default_factory=dict)
+    duration_ms: float | None = None
+
+    def as_dict(self, trace_start: float) -> dict:
+        return {
+            'name': self.name,
+            'span_id': self.span_id,
+            'parent_id': self.parent_id,
+            'start_ms': round((self.start - trace_start) * 1000, 3),
+            'duration_ms': self.duration_ms,
+            **({'attributes': self.attributes} if self.attributes else {}),
+        }
+
+
+class Trace:
+    """The spans of one sampled request (or other root operation)."""
+
+    def __init__(self, max_spans: int):
+        self.trace_id = uuid.uuid4().hex
+        self.start = time.perf_counter()
+        self.max_spans = max_spans
+        self.spans: list[Span] = []
+        self.dropped = 0
+        self.current: Span | None = None
+
+    def open(self, name: str, attributes: dict) -> Span | None:
+        if len(self.spans) >= self.max_spans:
+            self.dropped += 1
+            return None
+        span = Span(
+            name=name,
+            span_id=uuid.uuid4().hex[:16],
+            parent_id=self.current.span_id if self.current else None,
+            start=time.perf_counter(),
+            attributes=attributes,
+        )
+        self.spans.append(span)
+        return span
+
+    def summary(self, n_plus_one_threshold: int) -> dict:
+        names = {span.span_id: span.name for span in self.spans}
+        queries = [span for span in self.spans if span.name == 'db.query']
+        statements = defaultdict(list)
+        for span in queries:
+            statements[_IN_LIST.sub('(%s...)', span.attributes.get('sql', ''))].append(span)
+        repeated = [
+            {
+                'sql': sql,
+                'count': len(spans),
+                'total_ms': round(sum(span.duration_ms or 0 for span in spans), 3),
+                'issued_by': sorted({names.get(span.parent_id, '<root>') for span in spans}),
+            }
+            for sql, spans in statements.items()
+            if len(spans) >= n_plus_one_threshold
+        ]
+        return {
+            'span_count': len(self.spans),
+            'dropped_spans': self.dropped,
+            'query_count': len(queries),
+            'query_ms': round(sum(span.duration_ms or 0 for span in queries), 3),
+            'n_plus_one': sorted(repeated, key=lambda item: -item['count']),
+        }
+
+    def export_dict(self, name: str, n_plus_one_threshold: int, attributes: dict) -> dict:
+        return {
+            'trace_id': self.trace_id,
+            'name': name,
+            'duration_ms': round((time.perf_counter() - self.start) * 1000, 3),
+            'attributes': attributes,
+            'summary': self.summary(n_plus_one_threshold),
+            'spans': [span.as_dict(self.start) for span in self.spans],
+        }
+
+
+_trace = contextvars.ContextVar('trace', default=None)
+
+
+def current_trace() -> Trace | None:
+    return _trace.get()
+
+
+@contextmanager
+def span(name: str, **attributes):
+    """Record a span if the current request is being traced."""
+    trace = _trace.get()
+    opened = trace.open(name, attributes) if trace is not None else None
+    if opened is None:
+        yield None
+        return
+    parent = trace.current
+    trace.current = opened
+    try:
+        yield opened
+    except BaseException as e:
+        opened.attributes['error'] = type(e).__name__
+        raise
+    finally:
+        opened.duration_ms = round((time.perf_counter() - opened.start) * 1000, 3)
+        trace.current = parent
+
+
+def traced(name: str | None = None):
+    """Decorator recording a span around each call of the function."""
+    def decorator(func):
+        span_name = name or f'{func.__module__}.{func.__qualname__}'
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _trace.get() is None:
+                return func(*args, **kwargs)
+            with span(span_name):
+                return func(*args, **kwargs)
+
+        wrapper.__traced__ = True
+        return wrapper
+    return decorator
+
+
+def _trace_queries(execute, sql, params, many, context):
+    if _trace.get() is None:
+        return execute(sql, params, many, context)
+    with span('db.query', sql=sql[:SQL_MAX_LENGTH], many=many):
+        return execute(sql, params, many, context)
+
+
+def _install_query_tracing(sender, connection, **kwargs):
+    if _trace_queries not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_trace_queries)
+
+
+def install_query_tracing() -> None:
+    """Trace the queries of every DB connection opened from now on."""
+    connection_created.connect(_install_query_tracing, dispatch_uid='apps.core.tracing.query_tracing')
+
+
+@contextmanager
+def start_trace(name: str, force: bool = False, attributes: dict | None = None):
+    """
+    Trace an operation (sampled by TRACE_SAMPLE_RATE unless forced).
+
+    Yields the Trace, or None when the operation is not sampled or a
+    trace is already active (its spans then join that trace). Attributes
+    added to ``attributes`` before the block ends are exported.
+    """
+    if _trace.get() is not None or not (force or random.random() < settings.TRACE_SAMPLE_RATE):
+        yield None
+        return
+    trace = Trace(settings.TRACE_MAX_SPANS)
+    token = _trace.set(trace)
+    try:
+        yield trace
+    finally:
+        _trace.reset(token)
+        get_exporter().export(trace.export_dict(name, settings.TRACE_N_PLUS_ONE_THRESHOLD, attributes or {}))
+
+
+# Instrumentation
+
+def _wrap_method(cls, method_name: str, span_name: str) -> None:
+    method = cls.__dict__.get(method_name)
+    if not callable(method) or getattr(method, '__traced__', False) or isinstance(method, (staticmethod, classmethod)):
+        return
+    # functools.wraps keeps the function's attributes, including @action's
+    setattr(cls, method_name, traced(span_name)(method))
+
+
+def _all_subclasses(cls):
+    for subclass in cls.__subclasses__():
+        yield subclass
+        yield from _all_subclasses(subclass)
+
+
+def instrument_drf() -> None:
+    """Add spans to DRF's generic methods and to the project's views and serializers."""
+    from django.urls import get_resolver
+    from django.utils.module_loading import import_string
+    from rest_framework.serializers import BaseSerializer
+    from rest_framework.views import APIView
+
+    for path, method_names in VIEW_METHODS.items():
+        cls = import_string(path)
+        for method_name in method_names:
+            _wrap_method(cls, method_name, f'{cls.__name__}.{method_name}')
+
+    # Import every view (and with them the serializers) before walking the classes
+    get_resolver().url_patterns
+    for base in (APIView, BaseSerializer):
+        for cls in _all_subclasses(base):
+            if not cls.__module__.startswith('apps.'):
+                continue
+            for method_name, value in list(cls.__dict__.items()):
+                if method_name.startswith('__') or method_name in ('Meta', 'as_view'):
+                    continue
+                if callable(value) and not isinstance(value, type):
+                    _wrap_method(cls, method_name, f'{cls.__name__}.{method_name}')
+
+
+# Export
+
+class TraceExporter:
+    """Hands finished traces to a background thread, which writes them."""
+
+    def __init__(self, maxsize: int = 1000):
+        self.queue = queue.Queue(maxsize)
+        self.dropped = 0
+        threading.Thread(target=self._run, name='trace-exporter', daemon=True).start()
+
+    def export(self, trace: dict) -> None:
+        try:
+            self.queue.put_nowait(trace)
+        except queue.Full:
+            self.dropped += 1
+
+    def _run(self):
+        while True:
+            trace = self.queue.get()
+            try:
+                self.write(json.dumps(trace, cls=DjangoJSONEncoder))
+            except Exception:  # an unreachable collector must not kill the thread
+                self.dropped += 1
+
+    def write(self, line: str) -> None:
+        raise NotImplementedError
+
+
+class FileTraceExporter(TraceExporter):
+    """Append traces as JSON lines to a local file."""
+
+    def __init__(self, path):
+        self.path = path
+        super().__init__()
+
+    def write(self, line: str) -> None:
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(line + '\n')
+
+
+class HTTPTraceExporter(TraceExporter):
+    """POST each trace as JSON to a collector."""
+
+    def __init__(self, url: str, timeout: float = 5):
+        self.url = url
+        self.timeout = timeout
+        super().__init__()
+
+    def write(self, line: str) -> None:
+        request = urllib.request.Request(
+            self.url, data=line.encode(), headers={'Content-Type': 'application/json'}, method='POST'
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout):
+            pass
+
+
+_exporter = None
+_exporter_lock = threading.Lock()
+
+
+def get_exporter() -> TraceExporter:
+    global _exporter
+    if _exporter is None:
+        with _exporter_lock:
+            if _exporter is None:
+                if settings.TRACE_EXPORTER == 'http':
+                    _exporter = HTTPTraceExporter(settings.TRACE_COLLECTOR_URL)
+                else:
+                    _exporter = FileTraceExporter(settings.TRACE_FILE)
+    return _exporter
+
+
+class TracingMiddleware:
+    """Trace sampled requests; returns the trace id in X-Trace-ID."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.enabled = settings.TRACE_SAMPLE_RATE > 0 or settings.TRACE_ALLOW_FORCE
+        if self.enabled:
+            instrument_drf()
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if not self.enabled:
+            return self.get_response(request)
+
+        force, attributes = self._trace_options(request)
+        with start_trace('http.request', force=force, attributes=attributes) as trace:
+            if trace is None:
+                return self.get_response(request)
+            with span(f'http.request {request.method} {request.path}'):
+                response = self.get_response(request)
+            attributes['status'] = response.status_code
+            response['X-Trace-ID'] = trace.trace_id
+        return response
+
+    async def __acall__(self, request):
+        if not self.enabled:
+            return await self.get_response(request)
+
+        force, attributes = self._trace_options(request)
+        with start_trace('http.request', force=force, attributes=attributes) as trace:
+            if trace is None:
+                return await self.get_response(request)
+            with span(f'http.request {request.method} {request.path}'):
+                response = await self.get_response(request)
+            attributes['status'] = response.status_code
+            response['X-Trace-ID'] = trace.trace_id
+        return response
+
+    @staticmethod
+    def _trace_options(request):
+        force = settings.TRACE_ALLOW_FORCE and request.headers.get('X-Trace') == '1'
+        return force, {'method': request.method, 'path': request.path}
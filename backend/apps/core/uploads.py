@@ -0,0 +1,218 @@
+"""
+Resumable chunked uploads to the default storage.
+
+    POST   /api/v1/uploads/                          {"filename", "size", "content_type"}
+    PUT    /api/v1/uploads/<upload>/parts/<number>/  raw part bytes
+    GET    /api/v1/uploads/<upload>/                 parts received so far (resume)
+    POST   /api/v1/uploads/<upload>/complete/        join the parts
+    DELETE /api/v1/uploads/<upload>/                 abort
+
+Starting an upload returns a signed token (<upload>) holding the target
+name, the storage's upload id, the owner and the agreed part size, so no
+upload state is kept in the database. Every part but the last must be
+exactly ``part_size`` bytes. Part bodies are streamed from the request
+to the storage (see apps/core/storage.py) and are never parsed or
+buffered by Django. Only the admins who manage media (municipality,
+workplace and super admins) may upload.
+
+With MEDIA_STORAGE=s3, /media/<name> redirects to the file's (presigned)
+URL, so media links keep working without the DEBUG-only static() route.
+"""
+import math
+import os
+import uuid
+
+from django.conf import settings
+from django.core import signing
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files.storage import default_storage
+from django.http import Http404, HttpResponseRedirect
+from django.utils import timezone
+from django.utils.text import get_valid_filename
+from rest_framework import permissions, serializers, status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .storage import MAX_PARTS, MIN_PART_SIZE, MultipartUploadError
+
+UPLOAD_TOKEN_SALT = 'apps.core.uploads'
+
+# Roles that upload media (organization and workplace images)
+UPLOAD_ROLES = ['MUNICIPALITY_ADMIN', 'WORKPLACE_ADMIN', 'SUPER_ADMIN']
+
+
+class CanUploadMedia(permissions.BasePermission):
+    message = "Only admins can upload files."
+
+    def has_permission(self, request, view):
+        return getattr(request.user, 'role', None) in UPLOAD_ROLES
+
+
+class StartUploadSerializer(serializers.Serializer):
+    filename = serializers.CharField(max_length=200)
+    size = serializers.IntegerField(min_value=1)
+    content_type = serializers.CharField(max_length=100, required=False, allow_blank=True, default='')
+
+    def validate_size(self, value):
+        if value > settings.UPLOAD_MAX_SIZE:
+            raise serializers.ValidationError(f"Files may be at most {settings.UPLOAD_MAX_SIZE} bytes.")
+        return value
+
+    def validate_filename(self, value):
+        try:
+            return get_valid_filename(os.path.basename(value))
+        except SuspiciousFileOperation:
+            raise serializers.ValidationError("Invalid file name.")
+
+
+class _PartStream:
+    """Read at most ``size`` bytes of the request body."""
+
+    def __init__(self, stream, size: int):
+        self._stream = stream
+        self._remaining = size
+
+    def read(self, amt: int = -1) -> bytes:
+        if self._remaining <= 0:
+            return b''
+        if amt is None or amt < 0 or amt > self._remaining:
+            amt = self._remaining
+        chunk = self._stream.read(amt)
+        self._remaining -= len(chunk)
+        return chunk
+
+
+def part_size_for(size: int) -> int:
+    """The configured part size, raised to S3's minimum and to fit within MAX_PARTS."""
+    return max(settings.UPLOAD_PART_SIZE, MIN_PART_SIZE, math.ceil(size / MAX_PARTS))
+
+
+def _load_upload(request, token: str) -> dict:
+    try:
+        upload = signing.loads(token, salt=UPLOAD_TOKEN_SALT, max_age=settings.UPLOAD_SESSION_MAX_AGE)
+    except signing.BadSignature:
+        raise Http404
+    if upload['owner'] != str(request.user.pk):
+        raise Http404
+    return upload
+
+
+def _describe(token: str, upload: dict, parts: list[dict]) -> dict:
+    return {
+        'upload': token,
+        'name': upload['name'],
+        'size': upload['size'],
+        'part_size': upload['part_size'],
+        'part_count': math.ceil(upload['size'] / upload['part_size']),
+        'parts': parts,
+    }
+
+
+class UploadView(APIView):
+    permission_classes = [permissions.IsAuthenticated, CanUploadMedia]
+
+
+class UploadListView(UploadView):
+    """POST: start a chunked upload."""
+
+    def post(self, request):
+        serializer = StartUploadSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+
+        # A fresh directory per upload, so completed names never collide
+        name = default_storage.generate_filename(
+            f'uploads/{request.user.pk}/{timezone.now():%Y/%m}/{uuid.uuid4().hex}/{data["filename"]}'
+        )
+        try:
+            upload_id = default_storage.create_multipart_upload(name, data['content_type'])
+        except MultipartUploadError as e:
+            return Response({'detail': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        upload = {
+            'name': name,
+            'id': upload_id,
+            # A string: user ids are UUIDs, which the JSON token cannot hold
+            'owner': str(request.user.pk),
+            'size': data['size'],
+            'part_size': part_size_for(data['size']),
+        }
+        token = signing.dumps(upload, salt=UPLOAD_TOKEN_SALT, compress=True)
+        return Response(_describe(token, upload, []), status=status.HTTP_201_CREATED)
+
+
+class UploadDetailView(UploadView):
+    """GET: upload status and received parts. DELETE: abort the upload."""
+
+    def get(self, request, token):
+        upload = _load_upload(request, token)
+        try:
+            parts = default_storage.list_parts(upload['name'], upload['id'])
+        except MultipartUploadError:
+            raise Http404
+        return Response(_describe(token, upload, parts))
+
+    def delete(self, request, token):
+        upload = _load_upload(request, token)
+        default_storage.abort_multipart_upload(upload['name'], upload['id'])
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class UploadPartView(UploadView):
+    """PUT: upload (or re-upload) one part, sent as the raw request body."""
+
+    def put(self, request, token, part_number):
+        upload = _load_upload(request, token)
+        part_count = math.ceil(upload['size'] / upload['part_size'])
+        if not 1 <= part_number <= part_count:
+            return Response(
+                {'detail': f"Part number must be between 1 and {part_count}."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        expected = min(upload['part_size'], upload['size'] - (part_number - 1) * upload['part_size'])
+        try:
+            length = int(request.META.get('CONTENT_LENGTH') or 0)
+        except ValueError:
+            length = 0
+        if length != expected:
+            return Response(
+                {'detail': f"Part {part_number} must be exactly {expected} bytes, got {length}."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        # request.stream is the unparsed body; request.data is never touched
+        try:
+            etag = default_storage.upload_part(
+                upload['name'], upload['id'], part_number, _PartStream(request.stream, length), length
+            )
+        except MultipartUploadError as e:
+            return Response({'detail': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({'part_number': part_number, 'size': length, 'etag': etag})
+
+
+class UploadCompleteView(UploadView):
+    """POST: join the uploaded parts into the final file."""
+
+    def post(self, request, token):
+        upload = _load_upload(request, token)
+        try:
+            parts = default_storage.list_parts(upload['name'], upload['id'])
+            received = sum(part['size'] for part in parts)
+            if received != upload['size']:
+                raise MultipartUploadError(f"Received {received} of {upload['size']} bytes.")
+            name = default_storage.complete_multipart_upload(upload['name'], upload['id'])
+        except MultipartUploadError as e:
+            return Response({'detail': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({
+            'name': name,
+            'size': upload['size'],
+            'url': default_storage.url(name),
+        })
+
+
+def media_redirect(request, name):
+    """Redirect a /media/ path to the stored file's (presigned) URL."""
+    if not default_storage.exists(name):
+        raise Http404
+    return HttpResponseRedirect(default_storage.url(name))
@@ -0,0 +1,82 @@
+"""
+Published job listing cache.
+
+Every youth sees the same published-job pages, so the serialized pages are
+cached per municipality scope. A scope is invalidated by bumping its cache
+version whenever a job in it changes (see signals.py), and the pages are
+pre-warmed shortly before an application window opens (see tasks.py).
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from rest_framework.settings import api_settings
+
+from apps.core.cache import bump_cache_version, versioned_key
+from .models import Job
+from .serializers import JobSerializer
+
+# Scope used when youth browse jobs without a municipality filter
+ALL_MUNICIPALITIES = 'all'
+
+
+def _namespace(scope) -> str:
+    return f'jobs:published:{scope}'
+
+
+def published_jobs_queryset(municipality_id=None):
+    """Published jobs, optionally limited to one municipality."""
+    queryset = Job.objects.filter(
+        status=Job.Status.PUBLISHED
+    ).select_related('municipality', 'workplace', 'lottery_group')
+    if municipality_id:
+        queryset = queryset.filter(municipality_id=municipality_id)
+    return queryset
+
+
+def build_published_jobs_page(municipality_id=None, page_number: int = 1) -> dict:
+    """
+    Serialize one page of published jobs straight from the database.
+
+    Raises:
+        django.core.paginator.InvalidPage: If the page is out of range
+    """
+    paginator = Paginator(published_jobs_queryset(municipality_id), api_settings.PAGE_SIZE)
+    page = paginator.page(page_number)
+    return {
+        'count': paginator.count,
+        'results': JobSerializer(page.object_list, many=True).data,
+    }
+
+
+def get_published_jobs_page(municipality_id=None, page_number: int = 1) -> dict:
+    """
+    Return one page of published jobs as {"count", "results"}, from cache when possible.
+
+    Raises:
+        django.core.paginator.InvalidPage: If the page is out of range
+    """
+    scope = str(municipality_id) if municipality_id else ALL_MUNICIPALITIES
+    key = versioned_key(_namespace(scope), 'page', page_number, api_settings.PAGE_SIZE)
+
+    page_data = cache.get(key)
+    if page_data is None:
+        page_data = build_published_jobs_page(municipality_id, page_number)
+        cache.set(key, page_data, settings.PUBLISHED_JOBS_CACHE_TTL)
+    return page_data
+
+
+def warm_published_jobs(municipality_id=None, pages: int | None = None) -> int:
+    """Make sure the first pages of a scope are cached. Returns the number of pages warmed."""
+    pages = pages or settings.PUBLISHED_JOBS_WARM_PAGES
+    paginator = Paginator(published_jobs_queryset(municipality_id), api_settings.PAGE_SIZE)
+    warmed = 0
+    for page_number in range(1, min(pages, paginator.num_pages) + 1):
+        get_published_jobs_page(municipality_id, page_number)
+        warmed += 1
+    return warmed
+
+
+def invalidate_published_jobs(municipality_id) -> None:
+    """Drop the cached pages of a municipality and of the unfiltered listing."""
+    bump_cache_version(_namespace(municipality_id))
+    bump_cache_version(_namespace(ALL_MUNICIPALITIES))
@@ -0,0 +1,83 @@
+"""
+Maintenance of the per-job demand counters (JobDemand).
+
+Single-row writes adjust the counters by delta inside the write's
+transaction (see signals.py). Bulk writes either pass their own deltas to
+apply_demand_deltas() or recount the affected jobs with
+refresh_job_demand(), which is also what the reconciliation command uses.
+"""
+from collections import defaultdict
+
+from django.db.models import Case, Count, F, IntegerField, Q, Value, When
+
+from .models import Application, Job, JobDemand
+
+COUNTER_FIELDS = ('total_applications', 'pending_applications', 'first_choice_applications')
+
+
+def contribution(status: str | None, priority_rank: int | None) -> tuple[int, int, int]:
+    """What one application adds to each counter (COUNTER_FIELDS order)."""
+    if status is None:
+        # Application does not exist (before insert / after delete)
+        return 0, 0, 0
+    return 1, int(status == Application.Status.PENDING), int(priority_rank == 1)
+
+
+def demand_delta(before: tuple, after: tuple) -> tuple[int, int, int]:
+    return tuple(new - old for old, new in zip(contribution(*before), contribution(*after)))
+
+
+def apply_demand_deltas(deltas: dict) -> None:
+    """
+    Add per-job deltas to the counters in a single UPDATE.
+
+    Args:
+        deltas: {job_id: (total, pending, first_choice)}
+    """
+    deltas = {job_id: delta for job_id, delta in deltas.items() if any(delta)}
+    if not deltas:
+        return
+
+    # Rows are created with their job (signals.py) and by the migration
+    JobDemand.objects.filter(job_id__in=deltas).update(**{
+        field: F(field) + Case(
+            *[When(job_id=job_id, then=Value(delta[index])) for job_id, delta in deltas.items()],
+            default=Value(0),
+            output_field=IntegerField(),
+        )
+        for index, field in enumerate(COUNTER_FIELDS)
+    })
+
+
+def refresh_job_demand(job_ids=None) -> int:
+    """
+    Recount the counters from Application rows with one grouped query.
+
+    Args:
+        job_ids: Jobs to recount, or None for every job
+
+    Returns:
+        Number of counter rows written
+    """
+    jobs = Job.objects.all() if job_ids is None else Job.objects.filter(id__in=job_ids)
+    counts = defaultdict(lambda: (0, 0, 0))
+    applications = Application.objects.filter(job__in=jobs).values('job_id').annotate(
+        total=Count('id'),
+        pending=Count('id', filter=Q(status=Application.Status.PENDING)),
+        first_choice=Count('id', filter=Q(priority_rank=1)),
+    ).order_by()
+    for row in applications:
+        counts[row['job_id']] = (row['total'], row['pending'], row['first_choice'])
+
+    rows = [
+        JobDemand(job_id=job_id, **dict(zip(COUNTER_FIELDS, counts[job_id])))
+        for job_id in jobs.values_list('id', flat=True)
+    ]
+    JobDemand.objects.bulk_create(
+        rows,
+        update_conflicts=True,
+        unique_fields=['job'],
+        update_fields=[*COUNTER_FIELDS, 'updated_at'],
+        batch_size=1000,
+    )
+    return len(rows)
@@ -0,0 +1,55 @@
+"""
+Application lifecycle events in the log stream.
+
+``application.created`` (sampled, see LOG_SAMPLE_RATES) and
+``application.status_changed`` are logged once the transaction commits,
+whether the row was written by Model.save() (signals.py) or in bulk: the
+ranked submission and queued intake inserts, and the lottery's status
+updates.
+"""
+from functools import partial
+
+import structlog
+from django.db import transaction
+
+logger = structlog.get_logger(__name__)
+
+
+def _log_events(events: list[tuple[str, dict]]) -> None:
+    for event, values in events:
+        logger.info(event, **values)
+
+
+def log_application_events(event: str, rows) -> None:
+    """
+    Log ``event`` for each row after commit.
+
+    Rows are dicts with the application's ``id``, ``job_id`` and
+    ``youth_id``, and its ``from_status`` and ``to_status``.
+    """
+    events = [
+        (event, {
+            'application_id': str(row['id']),
+            'job_id': str(row['job_id']),
+            'youth_id': str(row['youth_id']),
+            'from_status': row['from_status'],
+            'to_status': row['to_status'],
+        })
+        for row in rows
+    ]
+    if events:
+        transaction.on_commit(partial(_log_events, events))
+
+
+def log_applications_created(applications) -> None:
+    """Log ``application.created`` for newly inserted Application instances."""
+    log_application_events('application.created', [
+        {
+            'id': application.id,
+            'job_id': application.job_id,
+            'youth_id': application.youth_id,
+            'from_status': None,
+            'to_status': application.status,
+        }
+        for application in applications
+    ])
@@ -0,0 +1,218 @@
+"""
+Write-behind application intake.
+
+When APPLICATION_INTAKE_MODE is "queue", application POSTs are validated
+cheaply, pushed onto a durable queue and answered with 202 and a receipt.
+A Celery beat task drains the queue and inserts the applications in
+batches, deduplicated on (job, youth).
+
+Brokers share a small interface (publish / consume / ack) so tests and
+local development can swap the Redis stream for the in-memory broker:
+
+    APPLICATION_INTAKE_BROKER = 'apps.jobs.intake.InMemoryBroker'
+"""
+import os
+import socket
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from itertools import count
+
+import redis
+from django.conf import settings
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+from apps.users.models import YouthProfile
+from .demand import refresh_job_demand
+from .events import log_applications_created
+from .models import Application, Job
+
+
+class RedisStreamBroker:
+    """
+    Durable intake queue on a Redis stream with a consumer group.
+
+    Entries stay in the group's pending list until acknowledged, so a worker
+    that dies mid-batch leaves them to be reclaimed by the next drain.
+    """
+
+    STREAM = 'applications:intake'
+    GROUP = 'intake-workers'
+
+    def __init__(self):
+        self._redis = redis.Redis.from_url(settings.APPLICATION_INTAKE_REDIS_URL, decode_responses=True)
+        self._group_ready = False
+
+    def _ensure_group(self):
+        if self._group_ready:
+            return
+        try:
+            self._redis.xgroup_create(self.STREAM, self.GROUP, id='0', mkstream=True)
+        except redis.ResponseError as e:
+            if 'BUSYGROUP' not in str(e):
+                raise
+        self._group_ready = True
+
+    def publish(self, payload: dict) -> str:
+        return self._redis.xadd(self.STREAM, payload)
+
+    def consume(self, consumer: str, count: int) -> list[tuple[str, dict]]:
+        self._ensure_group()
+
+        # First reclaim entries a crashed worker read but never acknowledged
+        _, entries, *_ = self._redis.xautoclaim(
+            self.STREAM, self.GROUP, consumer,
+            min_idle_time=settings.APPLICATION_INTAKE_RECLAIM_MS,
+            count=count,
+        )
+        if entries:
+            return entries
+
+        response = self._redis.xreadgroup(self.GROUP, consumer, {self.STREAM: '>'}, count=count)
+        return response[0][1] if response else []
+
+    def ack(self, entry_ids: list[str]) -> None:
+        if entry_ids:
+            self._redis.xack(self.STREAM, self.GROUP, *entry_ids)
+            self._redis.xdel(self.STREAM, *entry_ids)
+
+
+class InMemoryBroker:
+    """Process-local stand-in for the Redis stream, used by tests and local development."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._ids = count(1)
+        self._queued: OrderedDict[str, dict] = OrderedDict()
+        self._pending: dict[str, dict] = {}
+
+    def publish(self, payload: dict) -> str:
+        with self._lock:
+            entry_id = f'{next(self._ids)}-0'
+            self._queued[entry_id] = dict(payload)
+            return entry_id
+
+    def consume(self, consumer: str, count: int) -> list[tuple[str, dict]]:
+        with self._lock:
+            entries = []
+            while self._queued and len(entries) < count:
+                entry_id, payload = self._queued.popitem(last=False)
+                self._pending[entry_id] = payload
+                entries.append((entry_id, payload))
+            return entries
+
+    def ack(self, entry_ids: list[str]) -> None:
+        with self._lock:
+            for entry_id in entry_ids:
+                self._pending.pop(entry_id, None)
+
+    def __len__(self):
+        return len(self._queued) + len(self._pending)
+
+    def clear(self):
+        with self._lock:
+            self._queued.clear()
+            self._pending.clear()
+
+
+@lru_cache(maxsize=None)
+def _load_broker(path: str):
+    return import_string(path)()
+
+
+def get_intake_broker():
+    """Return the shared broker instance configured by APPLICATION_INTAKE_BROKER."""
+    return _load_broker(settings.APPLICATION_INTAKE_BROKER)
+
+
+def is_queued_intake_enabled() -> bool:
+    return settings.APPLICATION_INTAKE_MODE == 'queue'
+
+
+def enqueue_application(youth_id, job_id, priority_rank: int | None = None) -> str:
+    """Push an application onto the intake queue and return its receipt."""
+    return get_intake_broker().publish({
+        'youth_id': str(youth_id),
+        'job_id': str(job_id),
+        # Streams only hold strings; empty means "no rank"
+        'priority_rank': '' if priority_rank is None else str(priority_rank),
+    })
+
+
+def drain_application_intake(max_batches: int | None = None) -> dict:
+    """
+    Insert queued applications in batches until the queue is empty.
+
+    Duplicates are dropped both within a batch and against existing rows
+    (ON CONFLICT DO NOTHING on the (job, youth) constraint), so replaying
+    an entry after a crash is harmless. Entries are acknowledged only after
+    their batch has been committed.
+    """
+    broker = get_intake_broker()
+    consumer = f'{socket.gethostname()}-{os.getpid()}'
+    batch_size = settings.APPLICATION_INTAKE_BATCH_SIZE
+    stats = {"batches": 0, "received": 0, "written": 0, "dropped": 0}
+
+    while max_batches is None or stats["batches"] < max_batches:
+        entries = broker.consume(consumer, batch_size)
+        if not entries:
+            break
+
+        # Keep the latest submission per (job, youth)
+        unique: dict[tuple[str, str], dict] = {}
+        for _, payload in entries:
+            unique[(payload['job_id'], payload['youth_id'])] = payload
+
+        # Drop entries whose job or profile was deleted after they were queued,
+        # otherwise the FK violation would fail (and replay) the whole batch
+        job_keys = {
+            str(job_id): {'municipality_id': municipality_id, 'lottery_group_id': lottery_group_id}
+            for job_id, municipality_id, lottery_group_id in Job.objects.filter(
+                id__in={job_id for job_id, _ in unique}
+            ).values_list('id', 'municipality_id', 'lottery_group_id')
+        }
+        existing_youth = {
+            str(youth_id) for youth_id in YouthProfile.objects.filter(
+                id__in={youth_id for _, youth_id in unique}
+            ).values_list('id', flat=True)
+        }
+        valid = [
+            payload for (job_id, youth_id), payload in unique.items()
+            if job_id in job_keys and youth_id in existing_youth
+        ]
+
+        with transaction.atomic():
+            # ON CONFLICT DO NOTHING does not report which rows were new, so look first
+            existing = {
+                (str(job_id), str(youth_id)) for job_id, youth_id in Application.objects.filter(
+                    job_id__in={payload['job_id'] for payload in valid},
+                    youth_id__in={payload['youth_id'] for payload in valid},
+                ).values_list('job_id', 'youth_id')
+            }
+            created = Application.objects.bulk_create(
+                [
+                    Application(
+                        job_id=payload['job_id'],
+                        youth_id=payload['youth_id'],
+                        priority_rank=int(payload['priority_rank']) if payload['priority_rank'] else None,
+                        **job_keys[payload['job_id']],
+                    )
+                    for payload in valid
+                ],
+                ignore_conflicts=True,
+            )
+            log_applications_created(
+                application for application in created
+                if (application.job_id, application.youth_id) not in existing
+            )
+            # ON CONFLICT DO NOTHING does not report which rows were new, so recount
+            refresh_job_demand({payload['job_id'] for payload in valid})
+        broker.ack([entry_id for entry_id, _ in entries])
+
+        stats["batches"] += 1
+        stats["received"] += len(entries)
+        stats["written"] += len(valid)
+        stats["dropped"] += len(unique) - len(valid)
+
+    return stats
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from apps.jobs.demand import refresh_job_demand
+
+
+class Command(BaseCommand):
+    help = "Rebuild the per-job demand counters (JobDemand) from Application rows."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--job',
+            action='append',
+            dest='job_ids',
+            help="Only rebuild this job (can be repeated). Default: all jobs.",
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            rows = refresh_job_demand(options['job_ids'])
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt demand counters for {rows} jobs."))
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-19 07:22
+
+import django.contrib.postgres.indexes
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0007_add_job_type'),
+        ('lottery', '0001_initial'),
+        ('organizations', '0004_workplace_logo_workplace_promo_image_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='job',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['custom_attributes'], name='job_custom_attrs_gin', opclasses=['jsonb_path_ops']),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-19 07:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0008_custom_attributes_gin'),
+        ('lottery', '0001_initial'),
+        ('organizations', '0004_workplace_logo_workplace_promo_image_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='max_grade_rank',
+            field=models.GeneratedField(db_persist=True, expression=models.Case(models.When(max_grade='YEAR_1', then=models.Value(0)), models.When(max_grade='YEAR_2', then=models.Value(1)), models.When(max_grade='YEAR_3', then=models.Value(2)), models.When(max_grade='YEAR_4', then=models.Value(3)), models.When(max_grade='YEAR_5', then=models.Value(4)), models.When(max_grade='YEAR_6', then=models.Value(5)), models.When(max_grade='YEAR_7', then=models.Value(6)), models.When(max_grade='YEAR_8', then=models.Value(7)), models.When(max_grade='YEAR_9', then=models.Value(8)), models.When(max_grade='GYM_1', then=models.Value(9)), models.When(max_grade='GYM_2', then=models.Value(10)), models.When(max_grade='GYM_3', then=models.Value(11)), models.When(max_grade='GYM_4', then=models.Value(12)), default=None, output_field=models.PositiveSmallIntegerField()), output_field=models.PositiveSmallIntegerField(null=True)),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='min_grade_rank',
+            field=models.GeneratedField(db_persist=True, expression=models.Case(models.When(min_grade='YEAR_1', then=models.Value(0)), models.When(min_grade='YEAR_2', then=models.Value(1)), models.When(min_grade='YEAR_3', then=models.Value(2)), models.When(min_grade='YEAR_4', then=models.Value(3)), models.When(min_grade='YEAR_5', then=models.Value(4)), models.When(min_grade='YEAR_6', then=models.Value(5)), models.When(min_grade='YEAR_7', then=models.Value(6)), models.When(min_grade='YEAR_8', then=models.Value(7)), models.When(min_grade='YEAR_9', then=models.Value(8)), models.When(min_grade='GYM_1', then=models.Value(9)), models.When(min_grade='GYM_2', then=models.Value(10)), models.When(min_grade='GYM_3', then=models.Value(11)), models.When(min_grade='GYM_4', then=models.Value(12)), default=None, output_field=models.PositiveSmallIntegerField()), output_field=models.PositiveSmallIntegerField(null=True)),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['status', 'min_grade_rank', 'max_grade_rank'], name='job_status_grade_idx'),
+        ),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 5.2.18 on 2026-10-19 07:25
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+
+def build_job_demand(apps, schema_editor):
+    """Create counter rows for existing jobs from their applications."""
+    Job = apps.get_model('jobs', 'Job')
+    Application = apps.get_model('jobs', 'Application')
+    JobDemand = apps.get_model('jobs', 'JobDemand')
+
+    counts = {
+        row['job_id']: row
+        for row in Application.objects.values('job_id').annotate(
+            total=Count('id'),
+            pending=Count('id', filter=Q(status='PENDING')),
+            first_choice=Count('id', filter=Q(priority_rank=1)),
+        ).order_by()
+    }
+    empty = {'total': 0, 'pending': 0, 'first_choice': 0}
+    JobDemand.objects.bulk_create(
+        [
+            JobDemand(
+                job_id=job_id,
+                total_applications=counts.get(job_id, empty)['total'],
+                pending_applications=counts.get(job_id, empty)['pending'],
+                first_choice_applications=counts.get(job_id, empty)['first_choice'],
+            )
+            for job_id in Job.objects.values_list('id', flat=True)
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0009_grade_rank'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobDemand',
+            fields=[
+                ('job', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='demand', serialize=False, to='jobs.job')),
+                ('total_applications', models.IntegerField(default=0)),
+                ('pending_applications', models.IntegerField(default=0)),
+                ('first_choice_applications', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.RunPython(build_job_demand, migrations.RunPython.noop),
+    ]
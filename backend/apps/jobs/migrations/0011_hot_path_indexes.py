@@ -0,0 +1,41 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:40
+
+import django.contrib.postgres.operations
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction; building the
+    # indexes this way does not block writes to the (large) tables meanwhile
+    atomic = False
+
+    dependencies = [
+        ('jobs', '0010_job_demand'),
+    ]
+
+    operations = [
+        django.contrib.postgres.operations.AddIndexConcurrently(
+            model_name='job',
+            index=models.Index(fields=['lottery_group', 'status'], name='job_group_status_idx'),
+        ),
+        django.contrib.postgres.operations.AddIndexConcurrently(
+            model_name='job',
+            index=models.Index(fields=['municipality', '-created_at'], name='job_muni_created_idx'),
+        ),
+        django.contrib.postgres.operations.AddIndexConcurrently(
+            model_name='job',
+            index=models.Index(condition=models.Q(('status', 'PUBLISHED')), fields=['municipality', '-created_at'], name='job_published_muni_idx'),
+        ),
+        django.contrib.postgres.operations.AddIndexConcurrently(
+            model_name='application',
+            index=models.Index(condition=models.Q(('status', 'PENDING')), fields=['job'], include=('youth', 'priority_rank', 'created_at'), name='app_pending_job_idx'),
+        ),
+        django.contrib.postgres.operations.AddIndexConcurrently(
+            model_name='application',
+            index=models.Index(fields=['youth', '-created_at'], name='app_youth_created_idx'),
+        ),
+        django.contrib.postgres.operations.AddIndexConcurrently(
+            model_name='application',
+            index=models.Index(fields=['-created_at'], name='app_created_idx'),
+        ),
+    ]
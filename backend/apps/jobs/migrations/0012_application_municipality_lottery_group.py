@@ -0,0 +1,41 @@
+# Generated by Django 5.2.18 on 2026-10-19 10:15
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def copy_job_keys(apps, schema_editor):
+    """Copy each application's job municipality and lottery group onto it."""
+    Application = apps.get_model('jobs', 'Application')
+    Job = apps.get_model('jobs', 'Job')
+    job = Job.objects.filter(id=OuterRef('job_id'))
+    Application.objects.update(
+        municipality_id=Subquery(job.values('municipality_id')[:1]),
+        lottery_group_id=Subquery(job.values('lottery_group_id')[:1]),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0011_hot_path_indexes'),
+        ('lottery', '0003_lotteryrun_group_executed_idx'),
+        ('organizations', '0005_image_variants'),
+    ]
+
+    operations = [
+        # Nullable until backfilled; made NOT NULL in 0013 (a table cannot be
+        # altered in the transaction that updated it while FK checks are pending)
+        migrations.AddField(
+            model_name='application',
+            name='municipality',
+            field=models.ForeignKey(db_index=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='applications', to='organizations.municipality'),
+        ),
+        migrations.AddField(
+            model_name='application',
+            name='lottery_group',
+            field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='applications', to='lottery.jobgroup'),
+        ),
+        migrations.RunPython(copy_job_keys, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.18 on 2026-10-19 10:16
+
+import django.contrib.postgres.operations
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # CREATE/DROP INDEX CONCURRENTLY cannot run inside a transaction
+    atomic = False
+
+    dependencies = [
+        ('jobs', '0012_application_municipality_lottery_group'),
+        ('lottery', '0003_lotteryrun_group_executed_idx'),
+        ('organizations', '0005_image_variants'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='application',
+            name='municipality',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='applications', to='organizations.municipality'),
+        ),
+        django.contrib.postgres.operations.AddIndexConcurrently(
+            model_name='application',
+            index=models.Index(condition=models.Q(('status', 'PENDING')), fields=['lottery_group', 'youth', 'priority_rank', 'created_at'], include=('job',), name='app_group_pending_idx'),
+        ),
+        django.contrib.postgres.operations.AddIndexConcurrently(
+            model_name='application',
+            index=models.Index(fields=['lottery_group', 'status'], name='app_group_status_idx'),
+        ),
+        django.contrib.postgres.operations.AddIndexConcurrently(
+            model_name='application',
+            index=models.Index(fields=['municipality', '-created_at'], name='app_muni_created_idx'),
+        ),
+        # Every query it served now filters on the group instead
+        django.contrib.postgres.operations.RemoveIndexConcurrently(
+            model_name='application',
+            name='app_pending_job_idx',
+        ),
+    ]
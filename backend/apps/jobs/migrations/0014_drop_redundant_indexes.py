@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-19 11:05
+
+import django.contrib.postgres.operations
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # DROP INDEX CONCURRENTLY cannot run inside a transaction
+    atomic = False
+
+    dependencies = [
+        ('jobs', '0013_application_denormalized_indexes'),
+        ('lottery', '0003_lotteryrun_group_executed_idx'),
+        ('organizations', '0005_image_variants'),
+    ]
+
+    operations = [
+        # The planner serves a youth's applications from the youth FK index
+        # (a handful of rows, sorted), never from this one
+        django.contrib.postgres.operations.RemoveIndexConcurrently(
+            model_name='application',
+            name='app_youth_created_idx',
+        ),
+        # The FK indexes duplicate the leading column of job_muni_created_idx
+        # and job_group_status_idx; the jobs table is small enough to drop
+        # them without CONCURRENTLY
+        migrations.AlterField(
+            model_name='job',
+            name='municipality',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='jobs', to='organizations.municipality'),
+        ),
+        migrations.AlterField(
+            model_name='job',
+            name='lottery_group',
+            field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='jobs', to='lottery.jobgroup'),
+        ),
+    ]
@@ -1,5 +1,8 @@
 import uuid
-from django.db import models
+from django.contrib.postgres.indexes import GinIndex
+from django.db import models, transaction
+
+from apps.core.grades import grade_rank_expression
 
 
 class Job(models.Model):
@@ -32,10 +35,12 @@ class Job(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
 
     # Ownership
+    # Indexed by job_muni_created_idx rather than on its own
     municipality = models.ForeignKey(
         'organizations.Municipality',
         on_delete=models.CASCADE,
-        related_name='jobs'
+        related_name='jobs',
+        db_index=False,
     )
     workplace = models.ForeignKey(
         'organizations.Workplace',
@@ -47,12 +52,14 @@ class Job(models.Model):
 
     # Link to Lottery System
     # null=True because some jobs might be "Direct" (outside lottery)
+    # Indexed by job_group_status_idx rather than on its own
     lottery_group = models.ForeignKey(
         'lottery.JobGroup',
         on_delete=models.SET_NULL,
         null=True,
         blank=True,
-        related_name='jobs'
+        related_name='jobs',
+        db_index=False,
     )
 
     # Content
@@ -95,6 +102,17 @@ class Job(models.Model):
         blank=True,
         help_text="Maximum allowed grade to apply"
     )
+    # Positions of min/max grade in school order, for eligibility filtering in SQL
+    min_grade_rank = models.GeneratedField(
+        expression=grade_rank_expression('min_grade'),
+        output_field=models.PositiveSmallIntegerField(null=True),
+        db_persist=True,
+    )
+    max_grade_rank = models.GeneratedField(
+        expression=grade_rank_expression('max_grade'),
+        output_field=models.PositiveSmallIntegerField(null=True),
+        db_persist=True,
+    )
 
     # Dates
     start_date = models.DateField(null=True, blank=True)
@@ -123,10 +141,33 @@ class Job(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Containment (@>) queries on required attributes
+            GinIndex(fields=['custom_attributes'], opclasses=['jsonb_path_ops'], name='job_custom_attrs_gin'),
+            # Eligibility-aware job feed (published jobs by grade range)
+            models.Index(fields=['status', 'min_grade_rank', 'max_grade_rank'], name='job_status_grade_idx'),
+            # Lottery fetch and preview: a group's (published) jobs
+            models.Index(fields=['lottery_group', 'status'], name='job_group_status_idx'),
+            # Municipality admin listing, newest first, without a sort
+            models.Index(fields=['municipality', '-created_at'], name='job_muni_created_idx'),
+            # Youth listing: a municipality's published jobs, newest first
+            models.Index(
+                fields=['municipality', '-created_at'],
+                condition=models.Q(status='PUBLISHED'),
+                name='job_published_muni_idx',
+            ),
+        ]
 
     def __str__(self):
         return f"{self.title} ({self.municipality.name})"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the persisted values so signal handlers can tell what changed
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
 
 class Application(models.Model):
     """Youth application to a job."""
@@ -158,12 +199,92 @@ class Application(models.Model):
     # Store the rank if they prioritized this job (1st choice, 2nd choice...)
     priority_rank = models.PositiveIntegerField(null=True, blank=True)
 
+    # Copies of the job's municipality and lottery group, so the lottery and
+    # admin queries filter applications without joining Job. Set on save()
+    # (bulk inserts pass them explicitly) and kept in step by signals.py.
+    # Indexed by the composite indexes below rather than on their own.
+    municipality = models.ForeignKey(
+        'organizations.Municipality',
+        on_delete=models.CASCADE,
+        related_name='applications',
+        db_index=False,
+    )
+    lottery_group = models.ForeignKey(
+        'lottery.JobGroup',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='applications',
+        db_index=False,
+    )
+
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
         # A youth can only apply to the same job once
         unique_together = ('job', 'youth')
         ordering = ['-created_at']
+        indexes = [
+            # Lottery fetch: a group's PENDING applications, already in the
+            # order the lottery walks them (youth, then rank)
+            models.Index(
+                fields=['lottery_group', 'youth', 'priority_rank', 'created_at'],
+                include=['job'],
+                condition=models.Q(status='PENDING'),
+                name='app_group_pending_idx',
+            ),
+            # Preview counts, run exports and the dashboard's per-group statuses
+            models.Index(fields=['lottery_group', 'status'], name='app_group_status_idx'),
+            # Municipality admin listing, newest first
+            models.Index(fields=['municipality', '-created_at'], name='app_muni_created_idx'),
+            # Super admin listing walks all applications newest first and stops after a page
+            models.Index(fields=['-created_at'], name='app_created_idx'),
+        ]
 
     def __str__(self):
         return f"{self.youth.user.email} -> {self.job.title}"
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the persisted values so signal handlers can tell what changed
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
+    def copy_job_keys(self, job: Job) -> None:
+        """Copy the job's municipality and lottery group onto the application."""
+        self.municipality_id = job.municipality_id
+        self.lottery_group_id = job.lottery_group_id
+
+    def save(self, *args, **kwargs):
+        loaded_job_id = getattr(self, '_loaded_values', {}).get('job_id', self.job_id)
+        if self._state.adding or loaded_job_id != self.job_id:
+            self.copy_job_keys(self.job)
+        # Keep the row and its JobDemand counters (updated by signals) in one transaction
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
+
+class JobDemand(models.Model):
+    """
+    Denormalized application counters per job, so dashboards read demand in O(1).
+
+    Kept up to date by apps.jobs.demand (signals for single rows, explicit
+    calls for bulk writes). Rebuild with `manage.py rebuild_job_demand`.
+    """
+    job = models.OneToOneField(Job, on_delete=models.CASCADE, primary_key=True, related_name='demand')
+
+    total_applications = models.IntegerField(default=0)
+    pending_applications = models.IntegerField(default=0)
+    first_choice_applications = models.IntegerField(default=0)  # priority_rank == 1
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Demand for {self.job_id}: {self.total_applications} applications"
+
+    @property
+    def applications_per_spot(self):
+        if not self.job.total_spots:
+            return None
+        return round(self.total_applications / self.job.total_spots, 2)
@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from .models import Job, Application
+from .models import Job, Application, JobDemand
 
 
 class JobSerializer(serializers.ModelSerializer):
@@ -80,6 +80,38 @@ class JobSerializer(serializers.ModelSerializer):
         return data
 
 
+class JobQualifyingYouthSerializer(serializers.ModelSerializer):
+    """Job with the number of youth whose custom attributes satisfy it."""
+    qualifying_youth = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = Job
+        fields = ['id', 'title', 'status', 'custom_attributes', 'qualifying_youth']
+        read_only_fields = fields
+
+
+class JobDemandSerializer(serializers.ModelSerializer):
+    """Application counters for a job (read from the denormalized JobDemand row)."""
+    id = serializers.UUIDField(source='job_id', read_only=True)
+    title = serializers.CharField(source='job.title', read_only=True)
+    total_spots = serializers.IntegerField(source='job.total_spots', read_only=True)
+    applications_per_spot = serializers.FloatField(read_only=True, allow_null=True)
+
+    class Meta:
+        model = JobDemand
+        fields = [
+            'id',
+            'title',
+            'total_spots',
+            'total_applications',
+            'pending_applications',
+            'first_choice_applications',
+            'applications_per_spot',
+            'updated_at',
+        ]
+        read_only_fields = fields
+
+
 class ApplicationSerializer(serializers.ModelSerializer):
     """Serializer for Application model."""
 
@@ -125,3 +157,18 @@ class ApplicationSerializer(serializers.ModelSerializer):
         if user.first_name or user.last_name:
             return f"{user.first_name} {user.last_name}".strip()
         return user.email
+
+
+class RankedApplicationsSerializer(serializers.Serializer):
+    """Input for submitting a youth's whole ranked choice list at once."""
+    choices = serializers.ListField(
+        child=serializers.UUIDField(),
+        allow_empty=False,
+        max_length=50,
+        help_text="Job IDs ordered by preference (first = 1st choice)"
+    )
+
+    def validate_choices(self, value):
+        if len(set(value)) != len(value):
+            raise serializers.ValidationError('Each job can only be ranked once.')
+        return value
@@ -0,0 +1,129 @@
+"""
+Application Service Layer.
+
+Business logic for jobs and youth applications that does not fit in a
+single serializer call, such as submitting a whole ranked choice list at
+once or matching custom attributes.
+"""
+from django.db import transaction
+from django.db.models import Case, Func, IntegerField, OuterRef, Q, Subquery, Value, When
+from django.db.models.functions import Coalesce
+from rest_framework.exceptions import ValidationError
+
+from apps.users.models import YouthProfile
+from .demand import apply_demand_deltas, demand_delta
+from .events import log_applications_created
+from .models import Application, Job
+
+
+def submit_ranked_applications(youth: YouthProfile, job_ids: list) -> list[Application]:
+    """
+    Apply to a ranked list of jobs and set priority ranks in one go.
+
+    The list order is the ranking (index 0 = first choice). Missing
+    applications are inserted with INSERT ... ON CONFLICT DO NOTHING on the
+    (job, youth) unique constraint, then the ranks of all PENDING
+    applications in the list are reassigned with a single UPDATE.
+    Applications not in the list are left as they are.
+
+    Returns:
+        The youth's applications for the listed jobs, in ranked order
+
+    Raises:
+        ValidationError: If any job the youth has not applied to yet does
+            not exist or is not published. Jobs already applied to may be
+            re-ranked after they close.
+    """
+    ranks = {job_id: rank for rank, job_id in enumerate(job_ids, start=1)}
+
+    with transaction.atomic():
+        # Serialize submissions by the same youth: two concurrent ones would
+        # otherwise both read no existing rows, and the insert skipped on
+        # conflict would still be counted in the demand deltas
+        YouthProfile.objects.select_for_update().filter(pk=youth.pk).first()
+
+        existing = {
+            job_id: (app_status, rank)
+            for job_id, app_status, rank in Application.objects.filter(
+                youth=youth,
+                job_id__in=job_ids
+            ).values_list('job_id', 'status', 'priority_rank')
+        }
+
+        job_keys = {
+            job_id: {'municipality_id': municipality_id, 'lottery_group_id': lottery_group_id}
+            for job_id, municipality_id, lottery_group_id in Job.objects.filter(
+                Q(status=Job.Status.PUBLISHED) | Q(id__in=list(existing)),
+                id__in=job_ids,
+            ).values_list('id', 'municipality_id', 'lottery_group_id')
+        }
+        unavailable = [str(job_id) for job_id in job_ids if job_id not in job_keys]
+        if unavailable:
+            raise ValidationError({'choices': f"Jobs not open for applications: {', '.join(unavailable)}"})
+
+        # No conflicts are possible while the profile is locked, so all of these are inserted
+        created = Application.objects.bulk_create(
+            [
+                Application(job_id=job_id, youth=youth, priority_rank=rank, **job_keys[job_id])
+                for job_id, rank in ranks.items()
+                if job_id not in existing
+            ],
+            ignore_conflicts=True,
+        )
+        log_applications_created(created)
+        Application.objects.filter(
+            youth=youth,
+            job_id__in=job_ids,
+            status=Application.Status.PENDING,
+        ).update(priority_rank=Case(
+            *[When(job_id=job_id, then=Value(rank)) for job_id, rank in ranks.items()],
+            output_field=IntegerField(),
+        ))
+
+        # Only PENDING applications are re-ranked; new ones start as PENDING
+        after = {}
+        for job_id, rank in ranks.items():
+            app_status, old_rank = existing.get(job_id, (Application.Status.PENDING, None))
+            after[job_id] = (app_status, rank if app_status == Application.Status.PENDING else old_rank)
+        apply_demand_deltas({
+            job_id: demand_delta(existing.get(job_id, (None, None)), after[job_id])
+            for job_id in ranks
+        })
+
+    applications = Application.objects.filter(
+        youth=youth,
+        job_id__in=job_ids
+    ).select_related(
+        'job', 'job__municipality', 'job__workplace', 'job__lottery_group', 'youth__user'
+    )
+    return sorted(applications, key=lambda app: ranks[app.job_id])
+
+
+def jobs_matching_youth(queryset, youth: YouthProfile):
+    """
+    Limit a job queryset to jobs whose required custom attributes the youth has.
+
+    A job matches when its custom_attributes are contained in the youth's
+    (jsonb <@), so jobs without requirements always match. List-valued
+    requirements match when the youth has every listed value.
+    """
+    return queryset.filter(custom_attributes__contained_by=youth.custom_attributes or {})
+
+
+def annotate_qualifying_youth(queryset):
+    """
+    Annotate jobs with `qualifying_youth`: youth in the job's municipality
+    whose custom attributes contain the job's required ones.
+
+    Runs as one correlated COUNT per job using the GIN index on
+    YouthProfile.custom_attributes (jsonb @>).
+    """
+    qualifying = YouthProfile.objects.filter(
+        municipality_id=OuterRef('municipality_id'),
+        custom_attributes__contains=OuterRef('custom_attributes'),
+    ).order_by().annotate(
+        total=Func('id', function='COUNT')
+    ).values('total')
+    return queryset.annotate(
+        qualifying_youth=Coalesce(Subquery(qualifying, output_field=IntegerField()), 0)
+    )
@@ -0,0 +1,121 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from apps.lottery.models import JobGroup
+from apps.organizations.models import Municipality, Workplace
+from .cache import invalidate_published_jobs
+from .demand import apply_demand_deltas, demand_delta, refresh_job_demand
+from .events import log_application_events
+from .models import Application, Job, JobDemand
+
+
+def _affects_published_listing(job: Job) -> bool:
+    """A job is visible to youth if it is, or was until this save, published."""
+    loaded_status = getattr(job, '_loaded_values', {}).get('status')
+    return Job.Status.PUBLISHED in (job.status, loaded_status)
+
+
+def _invalidate_after_commit(municipality_id):
+    if municipality_id:
+        transaction.on_commit(partial(invalidate_published_jobs, municipality_id))
+
+
+@receiver(post_save, sender=Job)
+@receiver(post_delete, sender=Job)
+def invalidate_published_jobs_on_job_change(sender, instance, **kwargs):
+    """Drop cached job pages when a published job changes or is removed."""
+    if _affects_published_listing(instance):
+        _invalidate_after_commit(instance.municipality_id)
+
+
+@receiver(post_save, sender=Workplace)
+@receiver(post_save, sender=JobGroup)
+def invalidate_published_jobs_on_related_change(sender, instance, **kwargs):
+    """Workplace and lottery group names are embedded in the cached job pages."""
+    _invalidate_after_commit(instance.municipality_id)
+
+
+@receiver(post_save, sender=Municipality)
+def invalidate_published_jobs_on_municipality_change(sender, instance, **kwargs):
+    _invalidate_after_commit(instance.id)
+
+
+@receiver(post_save, sender=Job)
+def create_job_demand(sender, instance, created, **kwargs):
+    if created:
+        JobDemand.objects.get_or_create(job=instance)
+
+
+# Registered last among the Job receivers: it resets _loaded_values
+@receiver(post_save, sender=Job)
+def sync_application_job_keys(sender, instance, created, **kwargs):
+    """Copy a changed municipality or lottery group onto the job's applications."""
+    loaded = getattr(instance, '_loaded_values', None)
+    keys = (instance.municipality_id, instance.lottery_group_id)
+    if not created and (loaded is None or (loaded.get('municipality_id'), loaded.get('lottery_group_id')) != keys):
+        Application.objects.filter(job=instance).exclude(
+            municipality_id=instance.municipality_id,
+            lottery_group_id=instance.lottery_group_id,
+        ).update(municipality_id=instance.municipality_id, lottery_group_id=instance.lottery_group_id)
+
+    # Later saves of the same instance compare against this state
+    instance._loaded_values = {
+        **(loaded or {}),
+        'municipality_id': instance.municipality_id,
+        'lottery_group_id': instance.lottery_group_id,
+        'status': instance.status,
+    }
+
+
+@receiver(pre_save, sender=Application)
+def remember_application_status(sender, instance, **kwargs):
+    """Keep the status the row had before this save; post_save receivers reset _loaded_values."""
+    instance._status_before_save = getattr(instance, '_loaded_values', {}).get('status')
+
+
+@receiver(post_save, sender=Application)
+def log_application_status_change(sender, instance, created, **kwargs):
+    """Log created applications (sampled, see LOG_SAMPLE_RATES) and status changes, once committed."""
+    previous = None if created else getattr(instance, '_status_before_save', None)
+    if not created and previous == instance.status:
+        return
+    log_application_events('application.created' if created else 'application.status_changed', [{
+        'id': instance.id,
+        'job_id': instance.job_id,
+        'youth_id': instance.youth_id,
+        'from_status': previous,
+        'to_status': instance.status,
+    }])
+
+
+@receiver(post_save, sender=Application)
+def update_job_demand_on_save(sender, instance, created, **kwargs):
+    """Adjust the job's demand counters by what this save changed."""
+    if not created and not hasattr(instance, '_loaded_values'):
+        # Saved without being loaded first, so the previous state is unknown
+        refresh_job_demand([instance.job_id])
+        return
+
+    loaded = getattr(instance, '_loaded_values', {})
+    before = (None, None) if created else (loaded.get('status'), loaded.get('priority_rank'))
+    after = (instance.status, instance.priority_rank)
+
+    job_id = instance.job_id
+    previous_job_id = loaded.get('job_id', job_id)
+    if previous_job_id != job_id:
+        apply_demand_deltas({previous_job_id: demand_delta(before, (None, None))})
+        before = (None, None)
+    apply_demand_deltas({job_id: demand_delta(before, after)})
+
+    # Later saves of the same instance compare against this state
+    instance._loaded_values = {
+        **loaded, 'job_id': job_id, 'status': instance.status, 'priority_rank': instance.priority_rank,
+    }
+
+
+@receiver(post_delete, sender=Application)
+def update_job_demand_on_delete(sender, instance, **kwargs):
+    apply_demand_deltas({instance.job_id: demand_delta((instance.status, instance.priority_rank), (None, None))})
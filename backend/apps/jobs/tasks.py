@@ -0,0 +1,49 @@
+from datetime import timedelta
+
+from celery import shared_task
+from django.conf import settings
+from django.utils import timezone
+
+from apps.lottery.models import Period
+from .cache import warm_published_jobs
+from .intake import drain_application_intake, is_queued_intake_enabled
+
+
+@shared_task
+def warm_published_jobs_cache():
+    """
+    Pre-build the published job pages for municipalities whose application
+    window opens soon, so the opening stampede is served from cache.
+
+    Scheduled by Celery beat every minute (see CELERY_BEAT_SCHEDULE).
+    """
+    now = timezone.now()
+    lead_time = timedelta(minutes=settings.PUBLISHED_JOBS_WARM_LEAD_MINUTES)
+
+    municipality_ids = set(
+        Period.objects.filter(
+            application_open__gt=now,
+            application_open__lte=now + lead_time,
+        ).values_list('municipality_id', flat=True)
+    )
+
+    warmed = 0
+    for municipality_id in municipality_ids:
+        warmed += warm_published_jobs(municipality_id)
+    if municipality_ids:
+        warmed += warm_published_jobs()
+
+    return {"municipalities": len(municipality_ids), "pages_warmed": warmed}
+
+
+@shared_task
+def drain_application_intake_queue():
+    """
+    Insert queued application submissions in batches.
+
+    Scheduled by Celery beat every few seconds; a no-op unless
+    APPLICATION_INTAKE_MODE is "queue".
+    """
+    if not is_queued_intake_enabled():
+        return {"batches": 0}
+    return drain_application_intake()
@@ -1,3 +1,219 @@
-from django.test import TestCase
+import datetime
 
-# Create your tests here.
+from django.test import TestCase, override_settings
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from apps.lottery.models import JobGroup, Period
+from apps.organizations.models import Municipality
+from apps.users.models import User, YouthProfile
+from .intake import drain_application_intake, get_intake_broker
+from .models import Application, Job
+from .services import submit_ranked_applications
+
+
+@override_settings(
+    APPLICATION_INTAKE_MODE='queue',
+    APPLICATION_INTAKE_BROKER='apps.jobs.intake.InMemoryBroker',
+)
+class QueuedApplicationIntakeTests(TestCase):
+    """Queued intake, run against the in-memory broker instead of Redis."""
+
+    def setUp(self):
+        self.broker = get_intake_broker()
+        self.broker.clear()
+
+        municipality = Municipality.objects.create(name='Testkommun', slug='testkommun')
+        self.job = Job.objects.create(
+            municipality=municipality,
+            title='Parkarbetare',
+            status=Job.Status.PUBLISHED,
+        )
+        self.draft_job = Job.objects.create(municipality=municipality, title='Utkast')
+
+        user = User.objects.create(email='youth@example.com', username='youth@example.com')
+        self.youth = YouthProfile.objects.create(
+            user=user,
+            municipality=municipality,
+            date_of_birth=datetime.date(2009, 5, 1),
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user)
+
+    def apply(self, job, **extra):
+        return self.client.post('/api/v1/applications/', {'job': str(job.id), **extra}, format='json')
+
+    def test_post_is_queued_and_returns_receipt(self):
+        response = self.apply(self.job, priority_rank=1)
+
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data['status'], 'queued')
+        self.assertTrue(response.data['receipt'])
+        self.assertEqual(len(self.broker), 1)
+        self.assertFalse(Application.objects.exists())
+
+    def test_drain_inserts_queued_applications(self):
+        self.apply(self.job, priority_rank=2)
+
+        stats = drain_application_intake()
+
+        application = Application.objects.get()
+        self.assertEqual(application.job, self.job)
+        self.assertEqual(application.youth, self.youth)
+        self.assertEqual(application.priority_rank, 2)
+        self.assertEqual(stats['written'], 1)
+        self.assertEqual(len(self.broker), 0)
+
+    def test_duplicate_submissions_are_deduplicated(self):
+        self.apply(self.job, priority_rank=1)
+        self.apply(self.job, priority_rank=3)
+        drain_application_intake()
+
+        # Replays of an already stored application are ignored
+        self.apply(self.job, priority_rank=5)
+        drain_application_intake()
+
+        application = Application.objects.get()
+        self.assertEqual(application.priority_rank, 3)
+
+    def test_entries_for_deleted_jobs_are_dropped(self):
+        self.apply(self.job)
+        self.job.delete()
+
+        stats = drain_application_intake()
+
+        self.assertEqual(stats['dropped'], 1)
+        self.assertFalse(Application.objects.exists())
+        self.assertEqual(len(self.broker), 0)
+
+    def test_unpublished_job_is_rejected_before_queueing(self):
+        response = self.apply(self.draft_job)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(len(self.broker), 0)
+
+    @override_settings(APPLICATION_INTAKE_MODE='sync')
+    def test_sync_mode_inserts_immediately(self):
+        response = self.apply(self.job)
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertTrue(Application.objects.filter(job=self.job, youth=self.youth).exists())
+
+
+class RankedApplicationTests(TestCase):
+    """Submitting and re-ranking the whole choice list at once."""
+
+    def setUp(self):
+        municipality = Municipality.objects.create(name='Testkommun', slug='testkommun')
+        self.first = Job.objects.create(municipality=municipality, title='Parkarbetare', status=Job.Status.PUBLISHED)
+        self.second = Job.objects.create(municipality=municipality, title='Kaféarbetare', status=Job.Status.PUBLISHED)
+        self.draft = Job.objects.create(municipality=municipality, title='Utkast')
+
+        user = User.objects.create(email='youth@example.com', username='youth@example.com')
+        self.youth = YouthProfile.objects.create(user=user, municipality=municipality)
+        self.client = APIClient()
+        self.client.force_authenticate(user)
+
+    def submit(self, *jobs):
+        return self.client.post(
+            '/api/v1/applications/ranked/', {'choices': [str(job.id) for job in jobs]}, format='json'
+        )
+
+    def ranks(self):
+        return dict(Application.objects.filter(youth=self.youth).values_list('job_id', 'priority_rank'))
+
+    def test_closed_job_already_applied_to_can_be_reranked(self):
+        self.submit(self.first, self.second)
+        self.first.status = Job.Status.ARCHIVED
+        self.first.save()
+
+        response = self.submit(self.second, self.first)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.ranks(), {self.second.id: 1, self.first.id: 2})
+
+    def test_unpublished_job_not_applied_to_is_rejected(self):
+        response = self.submit(self.first, self.draft)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Application.objects.exists())
+
+
+class ApplicationJobKeysTests(TestCase):
+    """Applications carry copies of their job's municipality and lottery group."""
+
+    def setUp(self):
+        self.municipality = Municipality.objects.create(name='Testkommun', slug='testkommun')
+        self.other_municipality = Municipality.objects.create(name='Grannkommun', slug='grannkommun')
+        period = Period.objects.create(
+            municipality=self.municipality,
+            name='Sommar',
+            start_date=datetime.date(2026, 6, 15),
+            end_date=datetime.date(2026, 8, 15),
+            application_open=datetime.datetime(2026, 1, 1, tzinfo=datetime.timezone.utc),
+            application_close=datetime.datetime(2026, 2, 1, tzinfo=datetime.timezone.utc),
+        )
+        self.group_a = JobGroup.objects.create(municipality=self.municipality, period=period, name='Grupp A')
+        self.group_b = JobGroup.objects.create(municipality=self.municipality, period=period, name='Grupp B')
+        self.job = Job.objects.create(
+            municipality=self.municipality,
+            lottery_group=self.group_a,
+            title='Parkarbetare',
+            status=Job.Status.PUBLISHED,
+        )
+
+        user = User.objects.create(email='youth@example.com', username='youth@example.com')
+        self.youth = YouthProfile.objects.create(user=user, municipality=self.municipality)
+        self.client = APIClient()
+        self.client.force_authenticate(user)
+
+    def keys(self):
+        return Application.objects.values_list('municipality_id', 'lottery_group_id').get()
+
+    def test_save_copies_job_keys(self):
+        Application.objects.create(job=self.job, youth=self.youth)
+
+        self.assertEqual(self.keys(), (self.municipality.id, self.group_a.id))
+
+    def test_job_changes_are_copied_to_applications(self):
+        Application.objects.create(job=self.job, youth=self.youth)
+        job = Job.objects.get(pk=self.job.pk)
+        job.municipality = self.other_municipality
+        job.lottery_group = self.group_b
+        job.save()
+
+        self.assertEqual(self.keys(), (self.other_municipality.id, self.group_b.id))
+
+    def test_reused_job_instance_moving_back_is_copied(self):
+        Application.objects.create(job=self.job, youth=self.youth)
+        job = Job.objects.get(pk=self.job.pk)
+        job.lottery_group = self.group_b
+        job.save()
+        job.lottery_group = self.group_a
+        job.save()
+
+        self.assertEqual(self.keys(), (self.municipality.id, self.group_a.id))
+
+    def test_ranked_submission_sets_job_keys(self):
+        submit_ranked_applications(self.youth, [self.job.id])
+
+        self.assertEqual(self.keys(), (self.municipality.id, self.group_a.id))
+
+    @override_settings(
+        APPLICATION_INTAKE_MODE='queue',
+        APPLICATION_INTAKE_BROKER='apps.jobs.intake.InMemoryBroker',
+    )
+    def test_queued_intake_sets_job_keys(self):
+        get_intake_broker().clear()
+        self.client.post('/api/v1/applications/', {'job': str(self.job.id)}, format='json')
+        drain_application_intake()
+
+        self.assertEqual(self.keys(), (self.municipality.id, self.group_a.id))
+
+    def test_group_delete_clears_lottery_group(self):
+        Application.objects.create(job=self.job, youth=self.youth)
+        self.group_a.delete()
+
+        self.assertEqual(self.keys(), (self.municipality.id, None))
+        self.job.refresh_from_db()
+        self.assertIsNone(self.job.lottery_group_id)
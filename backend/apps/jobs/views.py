@@ -1,8 +1,27 @@
-from rest_framework import viewsets, permissions
+import json
+import uuid
+
+from django.core.paginator import InvalidPage
+from rest_framework import viewsets, permissions, status
+from rest_framework.decorators import action
 from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
-from rest_framework.exceptions import ValidationError
-from .models import Job, Application
-from .serializers import JobSerializer, ApplicationSerializer
+from rest_framework.exceptions import NotFound, PermissionDenied, ValidationError
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+from apps.core.exports import get_export_format, iterate_values, streaming_export
+from apps.lottery.eligibility import eligible_jobs_for_youth
+from .cache import get_published_jobs_page
+from .intake import enqueue_application, is_queued_intake_enabled
+from .models import Job, Application, JobDemand
+from .serializers import (
+    JobSerializer,
+    JobDemandSerializer,
+    JobQualifyingYouthSerializer,
+    ApplicationSerializer,
+    RankedApplicationsSerializer,
+)
+from .services import annotate_qualifying_youth, jobs_matching_youth, submit_ranked_applications
 
 
 class JobViewSet(viewsets.ModelViewSet):
@@ -17,6 +36,17 @@ class JobViewSet(viewsets.ModelViewSet):
         user = self.request.user
         queryset = Job.objects.select_related('municipality', 'workplace')
 
+        # Optional filter on required custom attributes, e.g. ?attributes={"school": "Centralskolan"}
+        attributes = self.request.query_params.get('attributes')
+        if attributes:
+            try:
+                attributes = json.loads(attributes)
+            except ValueError:
+                attributes = None
+            if not isinstance(attributes, dict):
+                raise ValidationError({'attributes': 'Must be a JSON object.'})
+            queryset = queryset.filter(custom_attributes__contains=attributes)
+
         # Super Admin sees everything
         if user.role == 'SUPER_ADMIN':
             # Allow optional filtering by municipality
@@ -40,6 +70,45 @@ class JobViewSet(viewsets.ModelViewSet):
         # Other roles see nothing
         return Job.objects.none()
 
+    def list(self, request, *args, **kwargs):
+        """Youth listings are identical per municipality, so serve them from cache."""
+        if request.user.role == 'YOUTH' and 'attributes' not in request.query_params:
+            return self._cached_published_list(request)
+        return super().list(request, *args, **kwargs)
+
+    def _cached_published_list(self, request):
+        """Build the paginated response around a cached page of published jobs."""
+        municipality_id = request.query_params.get('municipality')
+        if municipality_id:
+            try:
+                municipality_id = uuid.UUID(municipality_id)
+            except ValueError:
+                raise ValidationError({'municipality': 'Must be a valid UUID.'})
+
+        try:
+            page_number = int(request.query_params.get('page', 1))
+            page_data = get_published_jobs_page(municipality_id, page_number)
+        except (ValueError, InvalidPage):
+            raise NotFound('Invalid page.')
+
+        # Same envelope as PageNumberPagination, but without touching the database
+        url = request.build_absolute_uri()
+        next_url = None
+        if page_number * api_settings.PAGE_SIZE < page_data['count']:
+            next_url = replace_query_param(url, 'page', page_number + 1)
+        previous_url = None
+        if page_number == 2:
+            previous_url = remove_query_param(url, 'page')
+        elif page_number > 2:
+            previous_url = replace_query_param(url, 'page', page_number - 1)
+
+        return Response({
+            'count': page_data['count'],
+            'next': next_url,
+            'previous': previous_url,
+            'results': page_data['results'],
+        })
+
     def perform_create(self, serializer):
         """Auto-assign municipality on job creation."""
         user = self.request.user
@@ -53,7 +122,67 @@ class JobViewSet(viewsets.ModelViewSet):
                 raise ValueError("Super Admin must specify a municipality")
         else:
             # Other admins auto-assign to their municipality
-            serializer.save(municipality=user.municipality)
+            serializer.save(municipality_id=user.municipality_id)
+
+    # GET /api/v1/jobs/demand/
+    # Applications per job and per spot, from the denormalized counters
+    @action(detail=False, methods=['get'])
+    def demand(self, request):
+        if request.user.role not in ['MUNICIPALITY_ADMIN', 'WORKPLACE_ADMIN', 'SUPER_ADMIN']:
+            raise PermissionDenied("Only admins can view job demand.")
+
+        queryset = JobDemand.objects.filter(
+            job__in=self.get_queryset()
+        ).select_related('job').order_by('-total_applications')
+        page = self.paginate_queryset(queryset)
+        serializer = JobDemandSerializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
+    # GET /api/v1/jobs/eligible/
+    # "Jobs I can apply to": published jobs whose age and grade limits the youth meets
+    @action(detail=False, methods=['get'])
+    def eligible(self, request):
+        user = request.user
+
+        if user.role != 'YOUTH':
+            raise ValidationError("Only youth have an eligible job feed.")
+
+        if not hasattr(user, 'youth_profile'):
+            raise ValidationError("You must complete your youth profile first.")
+
+        queryset = eligible_jobs_for_youth(self.get_queryset(), user.youth_profile)
+        page = self.paginate_queryset(queryset.select_related('lottery_group'))
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
+    # GET /api/v1/jobs/matching/
+    # Published jobs whose required custom attributes the youth satisfies
+    @action(detail=False, methods=['get'])
+    def matching(self, request):
+        user = request.user
+
+        if user.role != 'YOUTH':
+            raise ValidationError("Only youth have custom attributes to match.")
+
+        if not hasattr(user, 'youth_profile'):
+            raise ValidationError("You must complete your youth profile first.")
+
+        queryset = jobs_matching_youth(self.get_queryset(), user.youth_profile)
+        page = self.paginate_queryset(queryset.select_related('lottery_group'))
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
+    # GET /api/v1/jobs/qualifying-youth/
+    # Number of youth whose custom attributes satisfy each job
+    @action(detail=False, methods=['get'], url_path='qualifying-youth')
+    def qualifying_youth(self, request):
+        if request.user.role not in ['MUNICIPALITY_ADMIN', 'WORKPLACE_ADMIN', 'SUPER_ADMIN']:
+            raise PermissionDenied("Only admins can count qualifying youth.")
+
+        queryset = annotate_qualifying_youth(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        serializer = JobQualifyingYouthSerializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
 
 
 class ApplicationViewSet(viewsets.ModelViewSet):
@@ -77,7 +206,7 @@ class ApplicationViewSet(viewsets.ModelViewSet):
         # Municipality Admin sees applications for jobs in their municipality
         if user.role == 'MUNICIPALITY_ADMIN' and user.municipality:
             return Application.objects.filter(
-                job__municipality=user.municipality
+                municipality=user.municipality
             ).select_related('job', 'job__municipality', 'job__workplace', 'youth__user')
 
         # Super Admin sees all applications
@@ -88,6 +217,41 @@ class ApplicationViewSet(viewsets.ModelViewSet):
 
         return Application.objects.none()
 
+    def create(self, request, *args, **kwargs):
+        """
+        Create an application, or queue it when queued intake is enabled.
+
+        In queue mode only cheap checks run on the request thread; the insert
+        happens later in a batch, so the response is 202 with a receipt.
+        """
+        if not is_queued_intake_enabled():
+            return super().create(request, *args, **kwargs)
+
+        user = request.user
+
+        if user.role != 'YOUTH':
+            raise ValidationError("Only youth can apply to jobs.")
+
+        if not hasattr(user, 'youth_profile'):
+            raise ValidationError("You must complete your youth profile first.")
+
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        job = serializer.validated_data['job']
+
+        if job.status != Job.Status.PUBLISHED:
+            raise ValidationError("This job is not open for applications.")
+
+        receipt = enqueue_application(
+            user.youth_profile.id,
+            job.id,
+            serializer.validated_data.get('priority_rank')
+        )
+        return Response(
+            {"status": "queued", "receipt": receipt, "job": str(job.id)},
+            status=status.HTTP_202_ACCEPTED
+        )
+
     def perform_create(self, serializer):
         """Auto-assign the Youth Profile when creating an application."""
         user = self.request.user
@@ -103,4 +267,68 @@ class ApplicationViewSet(viewsets.ModelViewSet):
         if Application.objects.filter(job_id=job_id, youth=user.youth_profile).exists():
             raise ValidationError("You have already applied to this job.")
 
-        serializer.save(youth=user.youth_profile)
+        serializer.save(youth_id=user.youth_profile.id)
+
+    # POST /api/v1/applications/ranked/
+    # Submit (or reorder) the whole ranked choice list in one request
+    @action(detail=False, methods=['post'])
+    def ranked(self, request):
+        """
+        Apply to several jobs and set their priority ranks in one request.
+
+        Body: {"choices": ["<job_id>", ...]} ordered by preference.
+        Already existing applications are kept and re-ranked.
+        """
+        user = request.user
+
+        if user.role != 'YOUTH':
+            raise ValidationError("Only youth can apply to jobs.")
+
+        if not hasattr(user, 'youth_profile'):
+            raise ValidationError("You must complete your youth profile first.")
+
+        input_serializer = RankedApplicationsSerializer(data=request.data)
+        input_serializer.is_valid(raise_exception=True)
+
+        applications = submit_ranked_applications(
+            user.youth_profile,
+            input_serializer.validated_data['choices']
+        )
+        serializer = self.get_serializer(applications, many=True)
+        return Response(serializer.data)
+
+    # GET /api/v1/applications/export/?output=csv|ndjson
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        """
+        Stream all applications visible to the admin as CSV or NDJSON.
+
+        Optional filters: ?status=, ?job=, ?group= (lottery group).
+        """
+        if request.user.role not in ['MUNICIPALITY_ADMIN', 'SUPER_ADMIN']:
+            raise PermissionDenied("Only Municipality Admin or Super Admin can export applications.")
+
+        output = get_export_format(request)
+        queryset = self.get_queryset().order_by('job_id', 'priority_rank', 'created_at')
+
+        filters = {'status': request.query_params.get('status')}
+        for param, field in (('job', 'job_id'), ('group', 'lottery_group_id')):
+            value = request.query_params.get(param)
+            if value:
+                try:
+                    filters[field] = uuid.UUID(value)
+                except ValueError:
+                    raise ValidationError({param: 'Must be a valid UUID.'})
+        queryset = queryset.filter(**{k: v for k, v in filters.items() if v})
+
+        columns = [
+            'id', 'job_id', 'job_title', 'lottery_group', 'youth_email',
+            'youth_first_name', 'youth_last_name', 'youth_phone', 'youth_grade',
+            'status', 'priority_rank', 'created_at',
+        ]
+        rows = iterate_values(queryset, [
+            'id', 'job_id', 'job__title', 'job__lottery_group__name', 'youth__user__email',
+            'youth__user__first_name', 'youth__user__last_name', 'youth__phone_number', 'youth__grade',
+            'status', 'priority_rank', 'created_at',
+        ])
+        return streaming_export(columns, rows, 'applications', output)
@@ -0,0 +1,153 @@
+"""
+Municipality admin dashboard.
+
+Builds the whole overview (periods, groups, jobs, spots, applicants,
+application statuses and the latest lottery run per group) from a fixed
+number of grouped aggregate queries, independent of how many periods,
+groups or jobs the municipality has.
+
+Results are cached for DASHBOARD_CACHE_TTL seconds. Structural changes
+(periods, groups, jobs, lottery runs) invalidate the cache explicitly (see
+signals.py); application counts are allowed to lag by up to the TTL.
+"""
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Q, Sum
+
+from apps.core.cache import bump_cache_version, versioned_key
+from apps.jobs.models import Application, Job
+from .models import JobGroup, LotteryRun, Period
+
+
+def _namespace(municipality_id) -> str:
+    return f'dashboard:{municipality_id}'
+
+
+def _status_counts(rows, key: str) -> dict:
+    counts = defaultdict(lambda: {status: 0 for status in Application.Status.values})
+    for row in rows:
+        counts[row[key]][row['status']] = row['count']
+    return counts
+
+
+def build_municipality_dashboard(municipality_id) -> dict:
+    """Compute the dashboard straight from the database."""
+    periods = list(
+        Period.objects.filter(municipality_id=municipality_id).values(
+            'id', 'name', 'start_date', 'end_date', 'application_open', 'application_close'
+        )
+    )
+    groups = list(
+        JobGroup.objects.filter(municipality_id=municipality_id).values(
+            'id', 'name', 'period_id', 'min_age', 'max_age'
+        )
+    )
+
+    jobs = Job.objects.filter(municipality_id=municipality_id)
+    job_stats = {
+        row['lottery_group_id']: row
+        for row in jobs.values('lottery_group_id').annotate(
+            jobs=Count('id'),
+            published_jobs=Count('id', filter=Q(status=Job.Status.PUBLISHED)),
+            spots=Sum('total_spots', filter=Q(status=Job.Status.PUBLISHED)),
+        ).order_by()
+    }
+
+    applications = Application.objects.filter(municipality_id=municipality_id)
+    group_statuses = _status_counts(
+        applications.values('lottery_group_id', 'status').annotate(count=Count('id')).order_by(),
+        'lottery_group_id',
+    )
+    group_applicants = {
+        row['lottery_group_id']: row['applicants']
+        for row in applications.values('lottery_group_id').annotate(
+            applicants=Count('youth_id', distinct=True)
+        ).order_by()
+    }
+    period_applicants = {
+        row['lottery_group__period_id']: row['applicants']
+        for row in applications.filter(lottery_group__isnull=False).values(
+            'lottery_group__period_id'
+        ).annotate(
+            applicants=Count('youth_id', distinct=True)
+        ).order_by()
+    }
+
+    # Latest run per group (DISTINCT ON group_id)
+    latest_runs = {
+        row['group_id']: row
+        for row in LotteryRun.objects.filter(group__municipality_id=municipality_id).order_by(
+            'group_id', '-executed_at'
+        ).distinct('group_id').values(
+            'id', 'group_id', 'status', 'executed_at', 'completed_at',
+            'candidates_count', 'matched_count', 'unmatched_count',
+        )
+    }
+
+    empty_jobs = {'jobs': 0, 'published_jobs': 0, 'spots': 0}
+
+    def job_summary(group_id):
+        stats = job_stats.get(group_id, empty_jobs)
+        return {
+            'jobs': stats['jobs'],
+            'published_jobs': stats['published_jobs'],
+            'spots': stats['spots'] or 0,
+        }
+
+    groups_by_period = defaultdict(list)
+    for group in groups:
+        latest_run = latest_runs.get(group['id'])
+        if latest_run:
+            latest_run = {k: v for k, v in latest_run.items() if k != 'group_id'}
+        groups_by_period[group['period_id']].append({
+            **group,
+            **job_summary(group['id']),
+            'applicants': group_applicants.get(group['id'], 0),
+            'applications': dict(group_statuses[group['id']]),
+            'latest_run': latest_run,
+        })
+
+    period_summaries = []
+    for period in periods:
+        period_groups = groups_by_period.get(period['id'], [])
+        statuses = {status: 0 for status in Application.Status.values}
+        for group in period_groups:
+            for status, count in group['applications'].items():
+                statuses[status] += count
+        period_summaries.append({
+            **period,
+            'groups_count': len(period_groups),
+            'jobs': sum(group['jobs'] for group in period_groups),
+            'published_jobs': sum(group['published_jobs'] for group in period_groups),
+            'spots': sum(group['spots'] for group in period_groups),
+            'applicants': period_applicants.get(period['id'], 0),
+            'applications': statuses,
+            'groups': period_groups,
+        })
+
+    return {
+        'municipality': str(municipality_id),
+        'periods': period_summaries,
+        # Normal jobs outside the lottery
+        'direct_jobs': {
+            **job_summary(None),
+            'applicants': group_applicants.get(None, 0),
+            'applications': dict(group_statuses[None]),
+        },
+    }
+
+
+def get_municipality_dashboard(municipality_id) -> dict:
+    """Return the dashboard, from cache when possible."""
+    key = versioned_key(_namespace(municipality_id), 'overview')
+    dashboard = cache.get(key)
+    if dashboard is None:
+        dashboard = build_municipality_dashboard(municipality_id)
+        cache.set(key, dashboard, settings.DASHBOARD_CACHE_TTL)
+    return dashboard
+
+
+def invalidate_municipality_dashboard(municipality_id) -> None:
+    bump_cache_version(_namespace(municipality_id))
@@ -0,0 +1,125 @@
+"""
+Eligibility rules for jobs, shared by the youth job feed and the lottery.
+
+A youth is eligible for a job when:
+- Age (at the start of the job group's period) is within the group's
+  min_age/max_age. Only lottery jobs belong to a group, so normal jobs
+  have no age limits.
+- Grade is within the job's min_grade/max_grade.
+
+Missing data never excludes anyone: youth without a birth date or grade,
+and unknown grade codes, are treated as eligible.
+
+The rules exist in two forms that must stay in sync: SQL filters used to
+evaluate many rows at once, and ineligibility_reason() for explaining a
+single decision (audit reports, check_eligibility).
+"""
+from datetime import date
+
+from django.db.models import F, Func, IntegerField, Q, Value
+
+from apps.core.grades import grade_rank
+
+
+class AgeAt(Func):
+    """Age in whole years at a reference date (PostgreSQL AGE)."""
+    template = 'EXTRACT(YEAR FROM AGE(%(expressions)s))::integer'
+    output_field = IntegerField()
+
+    def __init__(self, reference_date, birth_date, **extra):
+        super().__init__(reference_date, birth_date, **extra)
+
+
+def calculate_age(birth_date: date, reference_date: date = None) -> int:
+    """Calculate age from birth date."""
+    if reference_date is None:
+        reference_date = date.today()
+    age = reference_date.year - birth_date.year
+    if (reference_date.month, reference_date.day) < (birth_date.month, birth_date.day):
+        age -= 1
+    return age
+
+
+def _years_before(reference_date: date, years: int) -> date:
+    try:
+        return reference_date.replace(year=reference_date.year - years)
+    except ValueError:
+        # Feb 29 in a non-leap target year
+        return reference_date.replace(year=reference_date.year - years, day=28)
+
+
+def birth_date_range(reference_date: date, min_age: int, max_age: int) -> tuple[date, date]:
+    """
+    Birth dates whose age at reference_date is within [min_age, max_age].
+
+    Returns:
+        Tuple of (born_after, born_on_or_before); the lower bound is exclusive
+    """
+    return _years_before(reference_date, max_age + 1), _years_before(reference_date, min_age)
+
+
+def ineligibility_reason(
+    birth_date: date | None,
+    grade: str | None,
+    job_min_grade: str | None,
+    job_max_grade: str | None,
+    group=None,
+) -> str | None:
+    """Explain why a youth is not eligible for a job, or None if eligible."""
+    if group is not None and birth_date:
+        age = calculate_age(birth_date, group.period.start_date)
+        if age < group.min_age:
+            return f"Too young (age {age}, min {group.min_age})"
+        if age > group.max_age:
+            return f"Too old (age {age}, max {group.max_age})"
+
+    youth_rank = grade_rank(grade)
+    if youth_rank is not None:
+        min_rank = grade_rank(job_min_grade)
+        max_rank = grade_rank(job_max_grade)
+        if (min_rank is not None and youth_rank < min_rank) or (max_rank is not None and youth_rank > max_rank):
+            return f"Grade {grade} not in range {job_min_grade}-{job_max_grade}"
+
+    return None
+
+
+def _grade_q(youth_rank, prefix: str = '') -> Q:
+    """Job grade bounds admit the given youth grade rank (value or expression)."""
+    return (
+        (Q(**{f'{prefix}min_grade_rank__isnull': True}) | Q(**{f'{prefix}min_grade_rank__lte': youth_rank}))
+        & (Q(**{f'{prefix}max_grade_rank__isnull': True}) | Q(**{f'{prefix}max_grade_rank__gte': youth_rank}))
+    )
+
+
+def eligible_jobs_for_youth(queryset, youth):
+    """Limit a Job queryset to jobs the youth is eligible for."""
+    youth_rank = grade_rank(youth.grade)
+    if youth_rank is not None:
+        queryset = queryset.filter(_grade_q(youth_rank))
+
+    if youth.date_of_birth:
+        queryset = queryset.annotate(
+            age_at_period_start=AgeAt(F('lottery_group__period__start_date'), Value(youth.date_of_birth))
+        ).filter(
+            Q(lottery_group__isnull=True)
+            | Q(age_at_period_start__gte=F('lottery_group__min_age'),
+                age_at_period_start__lte=F('lottery_group__max_age'))
+        )
+
+    return queryset
+
+
+def eligible_applications_q(group) -> Q:
+    """
+    Q matching applications (to jobs in `group`) whose youth is eligible.
+
+    Age bounds become a constant birth date range, so the check is a plain
+    range comparison on the youth's date_of_birth.
+    """
+    born_after, born_on_or_before = birth_date_range(group.period.start_date, group.min_age, group.max_age)
+    age_ok = Q(youth__date_of_birth__isnull=True) | Q(
+        youth__date_of_birth__gt=born_after,
+        youth__date_of_birth__lte=born_on_or_before,
+    )
+    grade_ok = Q(youth__grade_rank__isnull=True) | _grade_q(F('youth__grade_rank'), prefix='job__')
+    return age_ok & grade_ok
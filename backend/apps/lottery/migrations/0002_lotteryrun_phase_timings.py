@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 08:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lottery', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='lotteryrun',
+            name='phase_timings',
+            field=models.JSONField(blank=True, default=list),
+        ),
+    ]
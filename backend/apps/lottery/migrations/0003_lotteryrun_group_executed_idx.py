@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:41
+
+import django.contrib.postgres.operations
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    atomic = False
+
+    dependencies = [
+        ('lottery', '0002_lotteryrun_phase_timings'),
+    ]
+
+    operations = [
+        django.contrib.postgres.operations.AddIndexConcurrently(
+            model_name='lotteryrun',
+            index=models.Index(fields=['group', '-executed_at'], name='lottery_run_group_idx'),
+        ),
+    ]
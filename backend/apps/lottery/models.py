@@ -114,8 +114,15 @@ class LotteryRun(models.Model):
     # Store the full audit report as JSON
     audit_report = models.JSONField(default=dict, blank=True)
 
+    # Per-phase timings, row counts and memory samples (see services.py / profiling.py)
+    phase_timings = models.JSONField(default=list, blank=True)
+
     class Meta:
         ordering = ['-executed_at']
+        indexes = [
+            # Runs of a group, newest first (run history, dashboard's latest run)
+            models.Index(fields=['group', '-executed_at'], name='lottery_run_group_idx'),
+        ]
 
     def __str__(self):
         return f"Run {self.executed_at.strftime('%Y-%m-%d %H:%M')} ({self.group.name})"
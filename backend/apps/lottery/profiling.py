@@ -0,0 +1,102 @@
+"""
+Phase timings for lottery runs.
+
+run_lottery_for_group() wraps each phase (fetching, eligibility, the
+engine, the status updates, ...) in ``profiler.phase(name)``. A phase
+records its wall and CPU time, the number of rows it handled, and two
+memory samples:
+
+- ``rss_peak_kb``: the process's peak resident set size when the phase
+  ended (ru_maxrss, so it only ever grows). Size lottery workers from
+  the largest value seen.
+- ``alloc_peak_kb``: peak Python allocations during the phase, measured
+  with tracemalloc. Tracing slows allocation-heavy code noticeably, so it
+  only runs when LOTTERY_PROFILE_MEMORY is on.
+
+The phases are stored on ``LotteryRun.phase_timings``, each is logged
+as a ``lottery.phase`` event, and traced requests get a span per phase.
+"""
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+import structlog
+from django.conf import settings
+
+from apps.core.tracing import span
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+logger = structlog.get_logger(__name__)
+
+
+def _rss_peak_kb() -> int | None:
+    if resource is None:
+        return None
+    # Kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+class Phase:
+    """One timed phase. Set ``rows`` inside the ``with`` block."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.rows: int | None = None
+
+    def as_dict(self) -> dict:
+        return {key: value for key, value in vars(self).items() if not key.startswith('_')}
+
+
+class LotteryProfiler:
+    """Collects the phases of one lottery run."""
+
+    def __init__(self, group_id, engine_version: str, trace_memory: bool | None = None):
+        self.group_id = str(group_id)
+        self.engine_version = engine_version
+        self.trace_memory = settings.LOTTERY_PROFILE_MEMORY if trace_memory is None else trace_memory
+        self.phases: list[dict] = []
+
+    @contextmanager
+    def phase(self, name: str):
+        phase = Phase(name)
+        tracing = self.trace_memory and not tracemalloc.is_tracing()
+        if tracing:
+            tracemalloc.start()
+        elif self.trace_memory:
+            tracemalloc.reset_peak()
+        wall_started = time.perf_counter()
+        cpu_started = time.process_time()
+        failed = False
+        try:
+            with span(f'lottery.{name}'):
+                yield phase
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            phase.duration_ms = round((time.perf_counter() - wall_started) * 1000, 3)
+            phase.cpu_ms = round((time.process_time() - cpu_started) * 1000, 3)
+            phase.rss_peak_kb = _rss_peak_kb()
+            if self.trace_memory:
+                phase.alloc_peak_kb = round(tracemalloc.get_traced_memory()[1] / 1024)
+                if tracing:
+                    tracemalloc.stop()
+            if failed:
+                phase.failed = True
+            self.phases.append(phase.as_dict())
+            fields = phase.as_dict()
+            logger.info(
+                'lottery.phase',
+                group_id=self.group_id,
+                engine_version=self.engine_version,
+                phase=fields.pop('name'),
+                **fields,
+            )
+
+    @property
+    def total_ms(self) -> float:
+        return round(sum(phase['duration_ms'] for phase in self.phases), 3)
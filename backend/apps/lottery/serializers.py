@@ -28,6 +28,9 @@ class PeriodSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'municipality', 'municipality_name', 'created_at', 'updated_at']
 
     def get_groups_count(self, obj):
+        # Annotated by PeriodViewSet; fall back to a query for other callers
+        if hasattr(obj, 'groups_total'):
+            return obj.groups_total
         return obj.groups.count()
 
 
@@ -56,6 +59,9 @@ class JobGroupSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'municipality', 'municipality_name', 'created_at', 'updated_at']
 
     def get_jobs_count(self, obj):
+        # Annotated by JobGroupViewSet; fall back to a query for other callers
+        if hasattr(obj, 'jobs_total'):
+            return obj.jobs_total
         return obj.jobs.count()
 
 
@@ -81,9 +87,11 @@ class LotteryRunSerializer(serializers.ModelSerializer):
             'matched_count',
             'unmatched_count',
             'audit_report',
+            'phase_timings',
         ]
         read_only_fields = [
             'id', 'status', 'executed_at', 'completed_at', 'executed_by',
             'executed_by_email', 'seed', 'engine_version',
-            'candidates_count', 'matched_count', 'unmatched_count', 'audit_report'
+            'candidates_count', 'matched_count', 'unmatched_count', 'audit_report',
+            'phase_timings',
         ]
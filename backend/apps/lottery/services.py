@@ -7,85 +7,73 @@ and saving the results.
 
 CRITICAL: All lottery operations must be atomic and auditable.
 """
-from datetime import date
+import structlog
 from django.db import transaction
 from django.utils import timezone
+from apps.core.tracing import traced
+from apps.jobs.demand import refresh_job_demand
+from apps.jobs.events import log_application_events
 from apps.jobs.models import Application, Job
 from apps.lottery.models import JobGroup, LotteryRun
 from apps.users.models import YouthProfile
 from .algorithm.rsd import RSDMatchEngine
+from .eligibility import eligible_applications_q, ineligibility_reason
+from .profiling import LotteryProfiler
 
+logger = structlog.get_logger(__name__)
 
-# Grade ordering for comparison
-GRADE_ORDER = [
-    'YEAR_1', 'YEAR_2', 'YEAR_3', 'YEAR_4', 'YEAR_5',
-    'YEAR_6', 'YEAR_7', 'YEAR_8', 'YEAR_9',
-    'GYM_1', 'GYM_2', 'GYM_3', 'GYM_4'
-]
+# Applications whose eligibility is checked per query, looked up by primary key
+ELIGIBILITY_BATCH_SIZE = 2000
 
 
-def calculate_age(birth_date: date, reference_date: date = None) -> int:
-    """Calculate age from birth date."""
-    if reference_date is None:
-        reference_date = date.today()
-    age = reference_date.year - birth_date.year
-    if (reference_date.month, reference_date.day) < (birth_date.month, birth_date.day):
-        age -= 1
-    return age
-
+@traced()
+def check_eligibility(youth: YouthProfile, job: Job, group: JobGroup) -> tuple[bool, str]:
+    """
+    Check if a youth is eligible for a specific job.
 
-def is_grade_in_range(youth_grade: str, min_grade: str | None, max_grade: str | None) -> bool:
-    """Check if youth's grade is within the required range."""
-    if not youth_grade:
-        return True  # No grade set, allow by default
+    Single-object counterpart of the SQL filters in eligibility.py; age is
+    evaluated at the start of the group's period.
 
-    try:
-        youth_idx = GRADE_ORDER.index(youth_grade)
-    except ValueError:
-        return True  # Unknown grade, allow by default
+    Returns:
+        Tuple of (is_eligible, reason)
+    """
+    reason = ineligibility_reason(youth.date_of_birth, youth.grade, job.min_grade, job.max_grade, group)
+    if reason:
+        return False, reason
+    return True, "Eligible"
 
-    if min_grade:
-        try:
-            min_idx = GRADE_ORDER.index(min_grade)
-            if youth_idx < min_idx:
-                return False
-        except ValueError:
-            pass
 
-    if max_grade:
-        try:
-            max_idx = GRADE_ORDER.index(max_grade)
-            if youth_idx > max_idx:
-                return False
-        except ValueError:
-            pass
+def pending_group_applications(group: JobGroup):
+    """
+    The group's PENDING applications as dicts, grouped by youth in rank
+    order.
 
-    return True
+    Served by app_group_pending_idx alone, which holds them in this order,
+    so there is no join and no sort; eligibility is checked separately by
+    eligible_applications().
+    """
+    return Application.objects.filter(
+        lottery_group=group,
+        status='PENDING'
+    ).order_by('youth_id', 'priority_rank', 'created_at').values(
+        'id', 'youth_id', 'job_id', 'priority_rank'
+    )
 
 
-def check_eligibility(youth: YouthProfile, job: Job, group: JobGroup) -> tuple[bool, str]:
+def eligible_applications(group: JobGroup, application_ids):
     """
-    Check if a youth is eligible for a specific job.
+    Ids of the given applications (in `group`) whose youth is eligible
+    (age, grade requirements), evaluated in SQL.
 
-    Returns:
-        Tuple of (is_eligible, reason)
+    Looked up by primary key, so a batch of ELIGIBILITY_BATCH_SIZE ids only
+    reads its own youth profiles and jobs.
     """
-    # Check age requirements from JobGroup
-    if youth.user.date_of_birth:
-        age = calculate_age(youth.user.date_of_birth)
-        if age < group.min_age:
-            return False, f"Too young (age {age}, min {group.min_age})"
-        if age > group.max_age:
-            return False, f"Too old (age {age}, max {group.max_age})"
-
-    # Check grade requirements from Job
-    if job.min_grade or job.max_grade:
-        if not is_grade_in_range(youth.grade, job.min_grade, job.max_grade):
-            return False, f"Grade {youth.grade} not in range {job.min_grade}-{job.max_grade}"
-
-    return True, "Eligible"
+    return Application.objects.filter(
+        id__in=application_ids
+    ).filter(eligible_applications_q(group)).order_by().values_list('id', flat=True)
 
 
+@traced()
 def run_lottery_for_group(group_id: str, user_id: str) -> LotteryRun:
     """
     Execute the lottery for a specific job group.
@@ -98,6 +86,9 @@ def run_lottery_for_group(group_id: str, user_id: str) -> LotteryRun:
     5. Updates application statuses atomically
     6. Creates an audit record
 
+    Each phase is timed (see profiling.py); the timings are stored on the
+    run's phase_timings.
+
     Args:
         group_id: UUID of the JobGroup to run lottery for
         user_id: UUID of the user executing the lottery
@@ -109,62 +100,87 @@ def run_lottery_for_group(group_id: str, user_id: str) -> LotteryRun:
         JobGroup.DoesNotExist: If group_id is invalid
         ValueError: If there are no jobs or applications
     """
-    group = JobGroup.objects.select_related('municipality').get(id=group_id)
+    group = JobGroup.objects.select_related('municipality', 'period').get(id=group_id)
+    profiler = LotteryProfiler(group.id, RSDMatchEngine.ENGINE_VERSION)
 
     # 1. Fetch all published jobs in this group
-    jobs = Job.objects.filter(
-        lottery_group=group,
-        status='PUBLISHED'
-    )
-    jobs_by_id = {str(j.id): j for j in jobs}
-    job_data = [
-        {"id": str(j.id), "total_spots": j.total_spots}
-        for j in jobs
-    ]
+    with profiler.phase('fetch_jobs') as phase:
+        jobs = Job.objects.filter(
+            lottery_group=group,
+            status='PUBLISHED'
+        )
+        job_data = [
+            {"id": str(j.id), "total_spots": j.total_spots}
+            for j in jobs
+        ]
+        phase.rows = len(job_data)
 
     if not job_data:
         raise ValueError(f"No published jobs found in group '{group.name}'")
 
-    # 2. Fetch all PENDING applications for these jobs
-    # Group by Youth to form their ranked "choices" list
-    applications = Application.objects.filter(
-        job__lottery_group=group,
-        status='PENDING'
-    ).select_related('youth', 'youth__user', 'job').order_by('youth_id', 'priority_rank', 'created_at')
-
-    # 3. Filter by eligibility and build applicant data structure
+    # 2. Fetch all PENDING applications for these jobs, then evaluate
+    # eligibility (age, grade requirements) for them by key
+    with profiler.phase('fetch_applications') as phase:
+        applications = list(pending_group_applications(group))
+        phase.rows = len(applications)
+
+    with profiler.phase('check_eligibility') as phase:
+        application_ids = [app['id'] for app in applications]
+        eligible_ids = set()
+        for start in range(0, len(application_ids), ELIGIBILITY_BATCH_SIZE):
+            eligible_ids.update(
+                eligible_applications(group, application_ids[start:start + ELIGIBILITY_BATCH_SIZE])
+            )
+        phase.rows = len(application_ids)
+
+    # 3. Reject ineligible applications and build applicant data structure
     # Each youth has a list of job choices ordered by priority_rank
-    applicant_map: dict[str, list[tuple[int, str]]] = {}
-    ineligible_applications: list[dict] = []  # Track who was filtered out
-
-    for app in applications:
-        youth = app.youth
-        job = app.job
-        youth_id = str(app.youth_id)
-        job_id = str(app.job_id)
-
-        # Check eligibility for this specific job
-        is_eligible, reason = check_eligibility(youth, job, group)
-
-        if not is_eligible:
-            ineligible_applications.append({
-                "youth_id": youth_id,
-                "youth_email": youth.user.email,
-                "job_id": job_id,
-                "job_title": job.title,
-                "reason": reason,
-            })
-            # Mark application as REJECTED due to ineligibility
-            app.status = 'REJECTED'
-            app.save(update_fields=['status'])
-            continue
-
-        # Use priority_rank if set, otherwise use a high number (will be sorted by created_at)
-        rank = app.priority_rank if app.priority_rank is not None else 999
-
-        if youth_id not in applicant_map:
-            applicant_map[youth_id] = []
-        applicant_map[youth_id].append((rank, job_id))
+    with profiler.phase('build_applicants') as phase:
+        applicant_map: dict[str, list[tuple[int, str]]] = {}
+        ineligible_ids = []
+
+        for app in applications:
+            if app['id'] not in eligible_ids:
+                ineligible_ids.append(app['id'])
+                continue
+
+            youth_id = str(app['youth_id'])
+            job_id = str(app['job_id'])
+
+            # Use priority_rank if set, otherwise use a high number (will be sorted by created_at)
+            rank = app['priority_rank'] if app['priority_rank'] is not None else 999
+
+            if youth_id not in applicant_map:
+                applicant_map[youth_id] = []
+            applicant_map[youth_id].append((rank, job_id))
+        phase.rows = len(applications)
+
+    # Track who was filtered out, and mark them REJECTED due to ineligibility
+    ineligible_applications: list[dict] = []
+    if ineligible_ids:
+        with profiler.phase('reject_ineligible') as phase:
+            ineligible = Application.objects.filter(id__in=ineligible_ids).values(
+                'youth_id', 'youth__user__email', 'youth__date_of_birth', 'youth__grade',
+                'job_id', 'job__title', 'job__min_grade', 'job__max_grade',
+            )
+            for row in ineligible:
+                ineligible_applications.append({
+                    "youth_id": str(row['youth_id']),
+                    "youth_email": row['youth__user__email'],
+                    "job_id": str(row['job_id']),
+                    "job_title": row['job__title'],
+                    "reason": ineligibility_reason(
+                        row['youth__date_of_birth'], row['youth__grade'],
+                        row['job__min_grade'], row['job__max_grade'], group
+                    ),
+                })
+            phase.rows = Application.objects.filter(id__in=ineligible_ids).update(status='REJECTED')
+            refresh_job_demand(Job.objects.filter(lottery_group=group).values('id'))
+            ineligible_set = set(ineligible_ids)
+            log_application_events('application.status_changed', [
+                {**app, 'from_status': 'PENDING', 'to_status': 'REJECTED'}
+                for app in applications if app['id'] in ineligible_set
+            ])
 
     # Sort choices by rank for each applicant and extract just job IDs
     applicant_data = []
@@ -180,9 +196,11 @@ def run_lottery_for_group(group_id: str, user_id: str) -> LotteryRun:
     # 4. Generate seed and run the algorithm
     # Use timestamp-based seed for uniqueness, but store it for reproducibility
     seed = int(timezone.now().timestamp() * 1000) % (2**31 - 1)
-    engine = RSDMatchEngine(applicant_data, job_data, seed=seed)
-    result = engine.run()
-    audit_report = engine.get_audit_report(result)
+    with profiler.phase('match') as phase:
+        engine = RSDMatchEngine(applicant_data, job_data, seed=seed)
+        result = engine.run()
+        audit_report = engine.get_audit_report(result)
+        phase.rows = len(applicant_data)
 
     # Add eligibility filtering info to audit report
     audit_report["eligibility"] = {
@@ -192,46 +210,77 @@ def run_lottery_for_group(group_id: str, user_id: str) -> LotteryRun:
         "ineligible_details": ineligible_applications,
     }
 
+    run_fields = dict(
+        group=group,
+        executed_by_id=user_id,
+        seed=seed,
+        engine_version=engine.ENGINE_VERSION,
+        candidates_count=len(applicant_data),
+        matched_count=0,
+        unmatched_count=0,
+    )
+
     # 5. Save results atomically
-    with transaction.atomic():
-        # Update LotteryRun status to RUNNING
-        run_record = LotteryRun.objects.create(
-            group=group,
-            executed_by_id=user_id,
-            seed=seed,
-            engine_version=engine.ENGINE_VERSION,
-            status=LotteryRun.Status.RUNNING,
-            candidates_count=len(applicant_data),
-            matched_count=0,
-            unmatched_count=0,
-            audit_report={},
-        )
+    try:
+        with transaction.atomic():
+            # Update LotteryRun status to RUNNING
+            run_record = LotteryRun.objects.create(
+                **run_fields,
+                status=LotteryRun.Status.RUNNING,
+                audit_report={},
+            )
+
+            # Statuses before the updates below, for the status_changed events
+            previous = list(Application.objects.filter(
+                lottery_group=group,
+                youth_id__in=[*result.matches, *result.reserves],
+            ).values('id', 'youth_id', 'job_id', 'status'))
 
-        try:
             # A. Update matched applications to OFFERED
-            matched_count = 0
-            for youth_id, job_id in result.matches.items():
-                # Update the winning application
-                updated = Application.objects.filter(
-                    youth_id=youth_id,
-                    job_id=job_id
-                ).update(status='OFFERED')
-                matched_count += updated
-
-                # Reject other applications for this youth in this group
-                Application.objects.filter(
-                    youth_id=youth_id,
-                    job__lottery_group=group
-                ).exclude(job_id=job_id).update(status='REJECTED')
+            with profiler.phase('apply_matches') as phase:
+                matched_count = 0
+                for youth_id, job_id in result.matches.items():
+                    # Update the winning application
+                    updated = Application.objects.filter(
+                        youth_id=youth_id,
+                        job_id=job_id
+                    ).update(status='OFFERED')
+                    matched_count += updated
+
+                    # Reject other applications for this youth in this group
+                    Application.objects.filter(
+                        youth_id=youth_id,
+                        lottery_group=group
+                    ).exclude(job_id=job_id).update(status='REJECTED')
+                phase.rows = matched_count
 
             # B. Update reserve applications
-            reserve_count = 0
-            for youth_id in result.reserves:
-                updated = Application.objects.filter(
-                    youth_id=youth_id,
-                    job__lottery_group=group
-                ).update(status='RESERVE')
-                reserve_count += updated
+            with profiler.phase('apply_reserves') as phase:
+                reserve_count = 0
+                for youth_id in result.reserves:
+                    updated = Application.objects.filter(
+                        youth_id=youth_id,
+                        lottery_group=group
+                    ).update(status='RESERVE')
+                    reserve_count += updated
+                phase.rows = reserve_count
+
+            reserves = set(result.reserves)
+            changes = []
+            for app in previous:
+                youth_id = str(app['youth_id'])
+                if youth_id in reserves:
+                    new_status = 'RESERVE'
+                elif result.matches.get(youth_id) == str(app['job_id']):
+                    new_status = 'OFFERED'
+                else:
+                    new_status = 'REJECTED'
+                if new_status != app['status']:
+                    changes.append({**app, 'from_status': app['status'], 'to_status': new_status})
+            log_application_events('application.status_changed', changes)
+
+            with profiler.phase('refresh_demand'):
+                refresh_job_demand(Job.objects.filter(lottery_group=group).values('id'))
 
             # C. Update the run record with final stats
             run_record.status = LotteryRun.Status.COMPLETED
@@ -239,18 +288,38 @@ def run_lottery_for_group(group_id: str, user_id: str) -> LotteryRun:
             run_record.matched_count = len(result.matches)
             run_record.unmatched_count = len(result.reserves)
             run_record.audit_report = audit_report
+            run_record.phase_timings = profiler.phases
             run_record.save()
 
-        except Exception as e:
-            # Mark as failed if anything goes wrong
-            run_record.status = LotteryRun.Status.FAILED
-            run_record.audit_report = {"error": str(e)}
-            run_record.save()
-            raise
+    except Exception as e:
+        # The block above rolled back, its run record included, so the
+        # failure is recorded in a transaction of its own
+        run_record = LotteryRun.objects.create(
+            **run_fields,
+            status=LotteryRun.Status.FAILED,
+            audit_report={"error": str(e)},
+            phase_timings=profiler.phases,
+        )
+        logger.exception('lottery.run.failed', group_id=str(group.id), run_id=str(run_record.id), seed=seed)
+        raise
+
+    logger.info(
+        'lottery.run.completed',
+        group_id=str(group.id),
+        run_id=str(run_record.id),
+        seed=seed,
+        engine_version=run_record.engine_version,
+        candidates=run_record.candidates_count,
+        matched=run_record.matched_count,
+        reserves=run_record.unmatched_count,
+        ineligible=len(ineligible_applications),
+        total_ms=profiler.total_ms,
+    )
 
     return run_record
 
 
+@traced()
 def get_lottery_preview(group_id: str) -> dict:
     """
     Get a preview of what would happen if lottery runs.
@@ -270,7 +339,7 @@ def get_lottery_preview(group_id: str) -> dict:
 
     # Count unique applicants
     applications = Application.objects.filter(
-        job__lottery_group=group,
+        lottery_group=group,
         status='PENDING'
     )
     unique_applicants = applications.values('youth_id').distinct().count()
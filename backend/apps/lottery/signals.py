@@ -0,0 +1,24 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.jobs.models import Job
+from .dashboard import invalidate_municipality_dashboard
+from .models import JobGroup, LotteryRun, Period
+
+
+@receiver(post_save, sender=Period)
+@receiver(post_delete, sender=Period)
+@receiver(post_save, sender=JobGroup)
+@receiver(post_delete, sender=JobGroup)
+@receiver(post_save, sender=Job)
+@receiver(post_delete, sender=Job)
+def invalidate_dashboard_on_structure_change(sender, instance, **kwargs):
+    transaction.on_commit(partial(invalidate_municipality_dashboard, instance.municipality_id))
+
+
+@receiver(post_save, sender=LotteryRun)
+def invalidate_dashboard_on_lottery_run(sender, instance, **kwargs):
+    transaction.on_commit(partial(invalidate_municipality_dashboard, instance.group.municipality_id))
@@ -1,3 +1,109 @@
+from datetime import date, datetime, timezone
+
 from django.test import TestCase
 
-# Create your tests here.
+from apps.jobs.models import Application, Job
+from apps.organizations.models import Municipality
+from apps.users.models import User, YouthProfile
+from .eligibility import eligible_applications_q, eligible_jobs_for_youth, ineligibility_reason
+from .models import JobGroup, Period
+
+# Period starts around which the age limits are tested, including Feb 28/29
+PERIOD_STARTS = [date(2026, 6, 15), date(2026, 2, 28), date(2024, 2, 29)]
+
+# Births on both sides of the 16/17 limits at each period start, and Feb 29 births
+BIRTH_DATES = [
+    None,
+    date(2010, 6, 15), date(2010, 6, 16), date(2008, 6, 15), date(2008, 6, 16),
+    date(2008, 2, 29), date(2008, 2, 28), date(2010, 2, 28), date(2010, 3, 1),
+    date(2006, 2, 28), date(2006, 3, 1), date(2008, 3, 1),
+]
+
+# '' is the profile's "no grade" (the column is NOT NULL)
+YOUTH_GRADES = ['', 'YEAR_7', 'YEAR_9', 'GYM_3', 'UNKNOWN']
+
+# (min_grade, max_grade) of the jobs
+GRADE_RANGES = [
+    (None, None), ('YEAR_8', 'GYM_1'), ('YEAR_8', None), (None, 'GYM_2'), ('BOGUS', 'YEAR_8'), ('GYM_1', 'GYM_1'),
+]
+
+
+class EligibilityRulesAgreeTests(TestCase):
+    """The SQL eligibility filters and ineligibility_reason() must decide every case alike."""
+
+    @classmethod
+    def setUpTestData(cls):
+        municipality = Municipality.objects.create(name='Testkommun', slug='testkommun')
+        cls.groups = []
+        for index, start in enumerate(PERIOD_STARTS):
+            period = Period.objects.create(
+                municipality=municipality,
+                name=f'Period {index}',
+                start_date=start,
+                end_date=date(start.year, 8, 31),
+                application_open=datetime(start.year, 1, 1, tzinfo=timezone.utc),
+                application_close=datetime(start.year, 2, 1, tzinfo=timezone.utc),
+            )
+            cls.groups.append(JobGroup.objects.create(
+                municipality=municipality, period=period, name=f'Grupp {index}', min_age=16, max_age=17,
+            ))
+
+        jobs = [
+            Job.objects.create(
+                municipality=municipality,
+                lottery_group=group,
+                title=f'Jobb {min_grade}-{max_grade}',
+                min_grade=min_grade,
+                max_grade=max_grade,
+                status=Job.Status.PUBLISHED,
+            )
+            for group in [*cls.groups, None]
+            for min_grade, max_grade in GRADE_RANGES
+        ]
+
+        cls.youth = []
+        for birth_date in BIRTH_DATES:
+            for grade in YOUTH_GRADES:
+                email = f'youth-{birth_date}-{grade}@example.com'
+                user = User.objects.create(email=email, username=email, role=User.Roles.YOUTH)
+                cls.youth.append(YouthProfile.objects.create(
+                    user=user, municipality=municipality, date_of_birth=birth_date, grade=grade,
+                ))
+
+        Application.objects.bulk_create([
+            Application(job=job, youth=youth, municipality=municipality, lottery_group=job.lottery_group)
+            for job in jobs if job.lottery_group is not None
+            for youth in cls.youth
+        ])
+
+    def test_lottery_filter_matches_ineligibility_reason(self):
+        decisions = set()
+        for group in JobGroup.objects.select_related('period'):
+            applications = Application.objects.filter(lottery_group=group)
+            eligible = set(applications.filter(eligible_applications_q(group)).values_list('id', flat=True))
+            for application in applications.select_related('youth', 'job'):
+                youth, job = application.youth, application.job
+                reason = ineligibility_reason(youth.date_of_birth, youth.grade, job.min_grade, job.max_grade, group)
+                with self.subTest(
+                    period_start=group.period.start_date, birth_date=youth.date_of_birth,
+                    grade=youth.grade, job_grades=(job.min_grade, job.max_grade),
+                ):
+                    self.assertEqual(application.id in eligible, reason is None, reason)
+                decisions.add(reason is None)
+        # Both outcomes are exercised
+        self.assertEqual(decisions, {True, False})
+
+    def test_job_feed_matches_ineligibility_reason(self):
+        jobs = list(Job.objects.select_related('lottery_group__period'))
+        for youth in self.youth:
+            eligible = set(eligible_jobs_for_youth(Job.objects.all(), youth).values_list('id', flat=True))
+            for job in jobs:
+                reason = ineligibility_reason(
+                    youth.date_of_birth, youth.grade, job.min_grade, job.max_grade, job.lottery_group,
+                )
+                with self.subTest(
+                    birth_date=youth.date_of_birth, grade=youth.grade,
+                    job_grades=(job.min_grade, job.max_grade),
+                    period_start=job.lottery_group.period.start_date if job.lottery_group else None,
+                ):
+                    self.assertEqual(job.id in eligible, reason is None, reason)
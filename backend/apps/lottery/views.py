@@ -1,6 +1,12 @@
+import uuid
+
+from django.db.models import Count
 from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from apps.core.exports import get_export_format, iterate_values, streaming_export
+from apps.jobs.models import Application
+from .dashboard import get_municipality_dashboard
 from .models import Period, JobGroup, LotteryRun
 from .serializers import PeriodSerializer, JobGroupSerializer, LotteryRunSerializer
 from .services import run_lottery_for_group, get_lottery_preview
@@ -14,18 +20,22 @@ class PeriodViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         """Return periods based on user role."""
         user = self.request.user
+        # Explicit ordering: Meta.ordering is not applied to aggregated querysets
+        queryset = Period.objects.select_related('municipality').annotate(
+            groups_total=Count('groups')
+        ).order_by('start_date')
 
         # Super Admin sees all
         if user.role == 'SUPER_ADMIN':
-            return Period.objects.all()
+            return queryset
 
         # Municipality Admin sees their own municipality's periods
         if user.role == 'MUNICIPALITY_ADMIN' and user.municipality:
-            return Period.objects.filter(municipality=user.municipality)
+            return queryset.filter(municipality=user.municipality)
 
         # Workplace Admin sees their municipality's periods
         if user.role == 'WORKPLACE_ADMIN' and user.workplace:
-            return Period.objects.filter(municipality=user.workplace.municipality)
+            return queryset.filter(municipality_id=user.workplace.municipality_id)
 
         return Period.objects.none()
 
@@ -36,7 +46,41 @@ class PeriodViewSet(viewsets.ModelViewSet):
             # Super Admin must specify municipality in request
             serializer.save()
         elif user.municipality:
-            serializer.save(municipality=user.municipality)
+            serializer.save(municipality_id=user.municipality_id)
+
+    # GET /api/v1/periods/dashboard/
+    @action(detail=False, methods=['get'])
+    def dashboard(self, request):
+        """
+        Overview for the municipality admin: per-period and per-group counts
+        of jobs, spots, applicants and application statuses, plus the latest
+        lottery run per group. Super Admin must pass ?municipality=<id>.
+        """
+        user = request.user
+
+        if user.role == 'SUPER_ADMIN':
+            municipality_id = request.query_params.get('municipality')
+            if not municipality_id:
+                return Response(
+                    {"error": "Super Admin must specify a municipality"},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            try:
+                municipality_id = uuid.UUID(municipality_id)
+            except ValueError:
+                return Response(
+                    {"municipality": "Must be a valid UUID."},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+        elif user.role == 'MUNICIPALITY_ADMIN' and user.municipality:
+            municipality_id = user.municipality_id
+        else:
+            return Response(
+                {"error": "Only Municipality Admin or Super Admin can view the dashboard"},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        return Response(get_municipality_dashboard(municipality_id))
 
 
 class JobGroupViewSet(viewsets.ModelViewSet):
@@ -47,7 +91,10 @@ class JobGroupViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         """Return job groups based on user role."""
         user = self.request.user
-        queryset = JobGroup.objects.select_related('period', 'municipality')
+        # Explicit ordering: Meta.ordering is not applied to aggregated querysets
+        queryset = JobGroup.objects.select_related('period', 'municipality').annotate(
+            jobs_total=Count('jobs')
+        ).order_by('name')
 
         # Super Admin sees all
         if user.role == 'SUPER_ADMIN':
@@ -67,7 +114,7 @@ class JobGroupViewSet(viewsets.ModelViewSet):
 
         # Workplace Admin sees their municipality's groups
         if user.role == 'WORKPLACE_ADMIN' and user.workplace:
-            queryset = queryset.filter(municipality=user.workplace.municipality)
+            queryset = queryset.filter(municipality_id=user.workplace.municipality_id)
             period_id = self.request.query_params.get('period')
             if period_id:
                 queryset = queryset.filter(period_id=period_id)
@@ -81,7 +128,7 @@ class JobGroupViewSet(viewsets.ModelViewSet):
         if user.role == 'SUPER_ADMIN':
             serializer.save()
         elif user.municipality:
-            serializer.save(municipality=user.municipality)
+            serializer.save(municipality_id=user.municipality_id)
 
     @action(detail=True, methods=['get'])
     def preview(self, request, pk=None):
@@ -178,3 +225,57 @@ class LotteryRunViewSet(viewsets.ReadOnlyModelViewSet):
             return queryset
 
         return LotteryRun.objects.none()
+
+    # GET /api/v1/lottery-runs/{id}/export/?output=csv|ndjson
+    @action(detail=True, methods=['get'])
+    def export(self, request, pk=None):
+        """
+        Stream the per-application outcome of a lottery run as CSV or NDJSON.
+
+        Outcomes come from the run's audit report, so they describe this run
+        even if application statuses have changed since.
+        """
+        run = self.get_object()
+        output = get_export_format(request)
+
+        report = run.audit_report or {}
+        matches = report.get('matches', {})
+        reserves = set(report.get('reserves', []))
+        ineligible = {
+            (item['youth_id'], item['job_id']): item['reason']
+            for item in report.get('eligibility', {}).get('ineligible_details', [])
+        }
+
+        def outcome(youth_id, job_id):
+            if (youth_id, job_id) in ineligible:
+                return 'INELIGIBLE', ineligible[(youth_id, job_id)]
+            if matches.get(youth_id) == job_id:
+                return 'MATCHED', ''
+            if youth_id in matches:
+                return 'MATCHED_ELSEWHERE', ''
+            if youth_id in reserves:
+                return 'RESERVE', ''
+            return 'NOT_IN_RUN', ''
+
+        applications = Application.objects.filter(
+            lottery_group_id=run.group_id
+        ).order_by('youth_id', 'priority_rank')
+        values = iterate_values(applications, [
+            'id', 'youth_id', 'youth__user__email', 'youth__user__first_name',
+            'youth__user__last_name', 'job_id', 'job__title', 'priority_rank', 'status',
+        ])
+
+        def rows():
+            for app_id, youth_id, email, first_name, last_name, job_id, job_title, rank, app_status in values:
+                run_outcome, reason = outcome(str(youth_id), str(job_id))
+                yield (
+                    app_id, youth_id, email, first_name, last_name, job_id, job_title,
+                    rank, run_outcome, reason, app_status,
+                )
+
+        columns = [
+            'application_id', 'youth_id', 'youth_email', 'youth_first_name',
+            'youth_last_name', 'job_id', 'job_title', 'priority_rank',
+            'outcome', 'reason', 'current_status',
+        ]
+        return streaming_export(columns, rows(), f'lottery-run-{run.id}', output)
@@ -0,0 +1,172 @@
+"""
+Validation of youth custom attributes against a municipality's schema.
+
+Municipality.custom_fields_schema is a list of field definitions as saved
+by the municipality settings page:
+
+    [{"key": "school", "label": "Skola", "type": "single_select",
+      "options": ["Centralskolan", "Norrskolan"], "required": true}, ...]
+
+Older schemas may use "name" instead of "key", a comma separated string
+for "options", or the original mapping form {"school": {"type": "select",
+"options": [...]}}; all are accepted.
+
+Each schema is compiled once into a CustomFieldsValidator and kept in
+process memory, keyed by municipality and the version of its cache
+namespace. Saving a municipality bumps that version (see signals.py), so
+every process recompiles on its next use.
+"""
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from apps.core.cache import bump_cache_version, get_cache_version
+from .models import Municipality
+
+TEXT = 'text'
+SINGLE_SELECT = 'single_select'
+MULTI_SELECT = 'multi_select'
+
+# Legacy type names
+TYPE_ALIASES = {'select': SINGLE_SELECT, 'multiselect': MULTI_SELECT}
+
+# Compiled validators kept per process
+MAX_COMPILED_SCHEMAS = 256
+
+
+@dataclass(frozen=True)
+class CustomField:
+    key: str
+    label: str
+    type: str
+    options: tuple[str, ...]
+    required: bool
+
+    def as_dict(self) -> dict:
+        return {
+            'key': self.key,
+            # The youth profile page reads "name"
+            'name': self.key,
+            'label': self.label,
+            'type': self.type,
+            'options': list(self.options),
+            'required': self.required,
+        }
+
+
+def _parse_options(options) -> tuple[str, ...]:
+    if isinstance(options, str):
+        options = options.split(',')
+    return tuple(str(option).strip() for option in options or () if str(option).strip())
+
+
+def _parse_fields(schema) -> list[CustomField]:
+    if isinstance(schema, dict):
+        schema = [{'key': key, **(spec if isinstance(spec, dict) else {})} for key, spec in schema.items()]
+
+    fields = []
+    for spec in schema or ():
+        if not isinstance(spec, dict):
+            continue
+        key = spec.get('key') or spec.get('name')
+        if not key:
+            continue
+        field_type = spec.get('type') or TEXT
+        field_type = TYPE_ALIASES.get(field_type, field_type)
+        fields.append(CustomField(
+            key=str(key),
+            label=str(spec.get('label') or key),
+            type=field_type if field_type in (TEXT, SINGLE_SELECT, MULTI_SELECT) else TEXT,
+            options=_parse_options(spec.get('options')),
+            required=bool(spec.get('required', False)),
+        ))
+    return fields
+
+
+class CustomFieldsValidator:
+    """A municipality schema compiled into per-field checks."""
+
+    def __init__(self, schema):
+        self.fields = _parse_fields(schema)
+        self._by_key = {field.key: field for field in self.fields}
+        self._options = {field.key: frozenset(field.options) for field in self.fields}
+        self._required = [field.key for field in self.fields if field.required]
+
+    def validate(self, attributes) -> dict[str, str]:
+        """Return {key: message} for every problem; empty if the attributes are valid."""
+        if not isinstance(attributes, dict):
+            return {'custom_attributes': 'Must be an object.'}
+
+        errors = {}
+        for key, value in attributes.items():
+            field = self._by_key.get(key)
+            if field is None:
+                errors[key] = 'Unknown field.'
+            elif field.type == MULTI_SELECT:
+                if not isinstance(value, list) or not all(isinstance(v, str) for v in value):
+                    errors[key] = 'Must be a list of options.'
+                else:
+                    invalid = [v for v in value if v not in self._options[key]]
+                    if invalid:
+                        errors[key] = f"Invalid options: {', '.join(invalid)}."
+            elif not isinstance(value, str):
+                errors[key] = 'Must be a string.'
+            elif field.type == SINGLE_SELECT and value and value not in self._options[key]:
+                errors[key] = f'Invalid option: {value}.'
+
+        for key in self._required:
+            if key not in errors and attributes.get(key) in (None, '', []):
+                errors[key] = 'This field is required.'
+        return errors
+
+    def as_list(self) -> list[dict]:
+        """Normalized schema, for clients."""
+        return [field.as_dict() for field in self.fields]
+
+
+_compiled: OrderedDict[tuple[str, int], CustomFieldsValidator] = OrderedDict()
+_compiled_lock = threading.Lock()
+
+
+def _namespace(municipality_id) -> str:
+    return f'custom-fields:{municipality_id}'
+
+
+def get_custom_fields_validator(municipality_id) -> CustomFieldsValidator:
+    """Return the compiled validator for a municipality's current schema."""
+    cache_key = (str(municipality_id), get_cache_version(_namespace(municipality_id)))
+    with _compiled_lock:
+        validator = _compiled.get(cache_key)
+        if validator is not None:
+            _compiled.move_to_end(cache_key)
+            return validator
+
+    # Read after the version, so a concurrent change can only cause a needless recompile
+    schema = Municipality.objects.filter(pk=municipality_id).values_list(
+        'custom_fields_schema', flat=True
+    ).first()
+    validator = CustomFieldsValidator(schema)
+
+    with _compiled_lock:
+        _compiled[cache_key] = validator
+        while len(_compiled) > MAX_COMPILED_SCHEMAS:
+            _compiled.popitem(last=False)
+    return validator
+
+
+def invalidate_custom_fields_validator(municipality_id) -> None:
+    bump_cache_version(_namespace(municipality_id))
+
+
+def invalid_profile_rows(municipality_id, rows):
+    """
+    Validate (profile_id, user_id, email, custom_attributes) rows in bulk.
+
+    Yields (profile_id, user_id, email, errors) for the invalid ones only,
+    with errors formatted as "key: message; ...".
+    """
+    validator = get_custom_fields_validator(municipality_id)
+    for profile_id, user_id, email, attributes in rows:
+        errors = validator.validate(attributes or {})
+        if errors:
+            yield profile_id, user_id, email, '; '.join(f'{key}: {message}' for key, message in errors.items())
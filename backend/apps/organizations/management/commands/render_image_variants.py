@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from apps.organizations.models import Municipality, Workplace
+from apps.organizations.tasks import generate_image_variants
+
+
+class Command(BaseCommand):
+    help = "Render missing WebP/AVIF image derivatives (e.g. for images uploaded before they existed)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true', help="Re-render every image, not just missing ones.")
+        parser.add_argument('--queue', action='store_true', help="Queue Celery tasks instead of rendering inline.")
+
+    def handle(self, *args, **options):
+        rendered = 0
+        for model in (Municipality, Workplace):
+            for instance in model.objects.all().iterator():
+                for field_name in model.image_variant_widths:
+                    name = getattr(instance, field_name).name
+                    entry = instance.image_variants.get(field_name) or {}
+                    if not name or (entry.get('source') == name and not options['all']):
+                        continue
+                    if options['queue']:
+                        generate_image_variants.delay(model._meta.label, instance.pk, field_name)
+                    else:
+                        generate_image_variants(model._meta.label, instance.pk, field_name)
+                    rendered += 1
+        action = "Queued" if options['queue'] else "Rendered"
+        self.stdout.write(self.style.SUCCESS(f"{action} variants for {rendered} images."))
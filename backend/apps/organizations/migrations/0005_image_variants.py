@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-19 07:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('organizations', '0004_workplace_logo_workplace_promo_image_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='municipality',
+            name='image_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+        migrations.AddField(
+            model_name='workplace',
+            name='image_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
@@ -57,6 +57,16 @@ class Municipality(models.Model):
     # Example: { "school": { "type": "select", "options": ["School A", "School B"] } }
     custom_fields_schema = models.JSONField(default=dict, blank=True)
 
+    # Resized WebP/AVIF derivatives per image field, written by a background task
+    # (see apps/core/images.py)
+    image_variants = models.JSONField(default=dict, blank=True, editable=False)
+
+    # Widths rendered for each image field
+    image_variant_widths = {
+        'logo': (96, 200, 400),
+        'hero_image': (640, 1280, 1920),
+    }
+
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -108,6 +118,16 @@ class Workplace(models.Model):
     contact_email = models.EmailField(blank=True, default='')
     contact_phone = models.CharField(max_length=20, blank=True, default='')
 
+    # Resized WebP/AVIF derivatives per image field, written by a background task
+    # (see apps/core/images.py)
+    image_variants = models.JSONField(default=dict, blank=True, editable=False)
+
+    # Widths rendered for each image field
+    image_variant_widths = {
+        'logo': (96, 200, 400),
+        'promo_image': (400, 800, 1200),
+    }
+
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
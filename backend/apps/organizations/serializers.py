@@ -1,29 +1,42 @@
 from rest_framework import serializers
+
+from apps.core.images import srcset
 from .models import Municipality, Workplace
 
 
 class MunicipalitySerializer(serializers.ModelSerializer):
     logo_url = serializers.SerializerMethodField()
     hero_image_url = serializers.SerializerMethodField()
+    # {"avif": "<url> 96w, ...", "webp": "..."}, null until the variants are rendered
+    logo_srcset = serializers.SerializerMethodField()
+    hero_image_srcset = serializers.SerializerMethodField()
 
     class Meta:
         model = Municipality
         fields = [
-            'id', 'name', 'slug', 'logo', 'logo_url', 'hero_image',
-            'hero_image_url', 'description', 'custom_fields_schema',
+            'id', 'name', 'slug', 'logo', 'logo_url', 'logo_srcset', 'hero_image',
+            'hero_image_url', 'hero_image_srcset', 'description', 'custom_fields_schema',
             'created_at', 'updated_at'
         ]
-        read_only_fields = ['id', 'created_at', 'updated_at', 'logo_url', 'hero_image_url']
+        read_only_fields = [
+            'id', 'created_at', 'updated_at', 'logo_url', 'hero_image_url', 'logo_srcset', 'hero_image_srcset',
+        ]
 
     def _build_absolute_url(self, file_field):
         """Build absolute URL for a file field."""
         if not file_field:
             return None
+        return self._absolute_url(file_field.url)
+
+    def _absolute_url(self, url):
         request = self.context.get('request')
         if request:
-            return request.build_absolute_uri(file_field.url)
+            return request.build_absolute_uri(url)
         # Fallback: construct URL manually for cases without request context
-        return f"http://localhost:8000{file_field.url}"
+        return f"http://localhost:8000{url}"
+
+    def _srcset(self, obj, field_name):
+        return srcset(obj.image_variants.get(field_name), getattr(obj, field_name).storage, self._absolute_url)
 
     def get_logo_url(self, obj):
         return self._build_absolute_url(obj.logo)
@@ -31,34 +44,58 @@ class MunicipalitySerializer(serializers.ModelSerializer):
     def get_hero_image_url(self, obj):
         return self._build_absolute_url(obj.hero_image)
 
+    def get_logo_srcset(self, obj):
+        return self._srcset(obj, 'logo')
+
+    def get_hero_image_srcset(self, obj):
+        return self._srcset(obj, 'hero_image')
+
 
 class WorkplaceSerializer(serializers.ModelSerializer):
     municipality_name = serializers.CharField(source='municipality.name', read_only=True)
     logo_url = serializers.SerializerMethodField()
     promo_image_url = serializers.SerializerMethodField()
+    # {"avif": "<url> 96w, ...", "webp": "..."}, null until the variants are rendered
+    logo_srcset = serializers.SerializerMethodField()
+    promo_image_srcset = serializers.SerializerMethodField()
 
     class Meta:
         model = Workplace
         fields = [
             'id', 'name', 'municipality', 'municipality_name',
-            'logo', 'logo_url', 'promo_image', 'promo_image_url',
+            'logo', 'logo_url', 'logo_srcset', 'promo_image', 'promo_image_url', 'promo_image_srcset',
             'description', 'address', 'contact_email', 'contact_phone',
             'created_at', 'updated_at'
         ]
-        read_only_fields = ['id', 'created_at', 'updated_at', 'municipality_name', 'logo_url', 'promo_image_url']
+        read_only_fields = [
+            'id', 'created_at', 'updated_at', 'municipality_name', 'logo_url', 'promo_image_url',
+            'logo_srcset', 'promo_image_srcset',
+        ]
 
     def _build_absolute_url(self, file_field):
         """Build absolute URL for a file field."""
         if not file_field:
             return None
+        return self._absolute_url(file_field.url)
+
+    def _absolute_url(self, url):
         request = self.context.get('request')
         if request:
-            return request.build_absolute_uri(file_field.url)
+            return request.build_absolute_uri(url)
         # Fallback: construct URL manually for cases without request context
-        return f"http://localhost:8000{file_field.url}"
+        return f"http://localhost:8000{url}"
+
+    def _srcset(self, obj, field_name):
+        return srcset(obj.image_variants.get(field_name), getattr(obj, field_name).storage, self._absolute_url)
 
     def get_logo_url(self, obj):
         return self._build_absolute_url(obj.logo)
 
     def get_promo_image_url(self, obj):
         return self._build_absolute_url(obj.promo_image)
+
+    def get_logo_srcset(self, obj):
+        return self._srcset(obj, 'logo')
+
+    def get_promo_image_srcset(self, obj):
+        return self._srcset(obj, 'promo_image')
@@ -0,0 +1,41 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_save, pre_save
+from django.dispatch import receiver
+
+from .custom_fields import invalidate_custom_fields_validator
+from .models import Municipality, Workplace
+from .tasks import generate_image_variants
+
+
+@receiver(post_save, sender=Municipality)
+def invalidate_custom_fields_on_save(sender, instance, **kwargs):
+    """Recompile the custom fields validator after the schema may have changed (e.g. my-config PATCH)."""
+    transaction.on_commit(partial(invalidate_custom_fields_validator, instance.id))
+
+
+@receiver(pre_save, sender=Municipality)
+@receiver(pre_save, sender=Workplace)
+def detect_image_uploads(sender, instance, **kwargs):
+    """Note image fields holding a new upload; the file is written during save()."""
+    instance._uploaded_images = {
+        field_name for field_name in sender.image_variant_widths
+        if getattr(instance, field_name) and not getattr(instance, field_name)._committed
+    }
+
+
+@receiver(post_save, sender=Municipality)
+@receiver(post_save, sender=Workplace)
+def queue_image_variants(sender, instance, **kwargs):
+    """Render derivatives for new uploads, and drop them for removed or replaced images."""
+    uploaded = getattr(instance, '_uploaded_images', set())
+    for field_name in sender.image_variant_widths:
+        name = getattr(instance, field_name).name or None
+        entry = instance.image_variants.get(field_name)
+        if field_name in uploaded or (entry or {}).get('source') != name:
+            transaction.on_commit(
+                partial(generate_image_variants.delay, sender._meta.label, instance.pk, field_name),
+                # A broker outage must not fail the upload itself
+                robust=True,
+            )
@@ -0,0 +1,36 @@
+from celery import shared_task
+from django.apps import apps
+from django.db import transaction
+
+from apps.core.images import render_variants
+
+
+@shared_task
+def generate_image_variants(model_label: str, pk, field_name: str):
+    """
+    Render the WebP/AVIF derivatives of one image field and record them in
+    the instance's image_variants. Queued after an upload (see signals.py).
+    """
+    model = apps.get_model(model_label)
+    instance = model.objects.filter(pk=pk).first()
+    if instance is None:
+        return None
+
+    file_field = getattr(instance, field_name)
+    # Rendering can take seconds (AVIF), so do it before taking the row lock
+    entry = render_variants(file_field, model.image_variant_widths[field_name]) if file_field else None
+
+    with transaction.atomic():
+        locked = model.objects.select_for_update().filter(pk=pk).first()
+        if locked is None or (getattr(locked, field_name).name or None) != (file_field.name or None):
+            # Deleted, or the image changed again meanwhile; its own task handles it
+            return None
+        variants = dict(locked.image_variants)
+        if entry is None:
+            variants.pop(field_name, None)
+        else:
+            variants[field_name] = entry
+        # update(): no post_save, so this does not queue another render
+        model.objects.filter(pk=pk).update(image_variants=variants)
+
+    return len(entry['variants']) if entry else 0
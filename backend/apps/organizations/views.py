@@ -2,6 +2,11 @@ from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
+
+from apps.core.exports import get_export_format, iterate_values, streaming_export
+from apps.users.models import YouthProfile
+from apps.users.views import _parse_municipality_id
+from .custom_fields import invalid_profile_rows
 from .models import Municipality, Workplace
 from .serializers import MunicipalitySerializer, WorkplaceSerializer
 
@@ -22,7 +27,8 @@ class MunicipalityViewSet(viewsets.ModelViewSet):
         PATCH: Update municipality settings (custom_fields_schema, etc.)
         """
         user = request.user
-        muni = getattr(user, 'municipality', None)
+        # Load the full row: the request user only carries the municipality id
+        muni = Municipality.objects.filter(pk=getattr(user, 'municipality_id', None)).first()
 
         if not muni:
             return Response(
@@ -47,6 +53,42 @@ class MunicipalityViewSet(viewsets.ModelViewSet):
 
         return Response(status=status.HTTP_405_METHOD_NOT_ALLOWED)
 
+    # GET /api/v1/municipalities/validate-profiles/?output=csv|ndjson
+    @action(detail=False, methods=['get'], url_path='validate-profiles')
+    def validate_profiles(self, request):
+        """
+        Check every youth profile's custom_attributes against the current
+        custom fields schema (e.g. after changing it) and stream the invalid
+        ones. Super Admin must pass ?municipality=<id>.
+        """
+        user = request.user
+
+        if user.role == 'SUPER_ADMIN':
+            municipality_id = request.query_params.get('municipality')
+            if not municipality_id:
+                return Response(
+                    {"error": "Super Admin must specify a municipality"},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            municipality_id = _parse_municipality_id(municipality_id)
+            if municipality_id is None:
+                return Response({'municipality': 'Must be a valid UUID.'}, status=status.HTTP_400_BAD_REQUEST)
+        elif user.role == 'MUNICIPALITY_ADMIN' and user.municipality_id:
+            municipality_id = user.municipality_id
+        else:
+            return Response(
+                {"error": "Only Municipality Admin or Super Admin can validate profiles"},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        output = get_export_format(request)
+        rows = iterate_values(
+            YouthProfile.objects.filter(municipality_id=municipality_id).order_by('created_at'),
+            ['id', 'user_id', 'user__email', 'custom_attributes'],
+        )
+        columns = ['profile_id', 'user_id', 'email', 'errors']
+        return streaming_export(columns, invalid_profile_rows(municipality_id, rows), 'invalid-profiles', output)
+
 
 class WorkplaceViewSet(viewsets.ModelViewSet):
     serializer_class = WorkplaceSerializer
@@ -8,8 +8,12 @@ from .models import User, YouthProfile, GuardianProfile
 class UserAdmin(BaseUserAdmin):
     list_display = ('email', 'first_name', 'last_name', 'role', 'municipality', 'is_active')
     list_filter = ('role', 'is_active', 'is_staff', 'municipality')
+    # icontains on these uses the user_*_trgm indexes
     search_fields = ('email', 'first_name', 'last_name')
     ordering = ('email',)
+    list_select_related = ('municipality',)
+    # Skip the unfiltered COUNT(*) over all users on every search
+    show_full_result_count = False
 
     fieldsets = (
         (None, {'fields': ('email', 'password')}),
@@ -33,6 +37,8 @@ class YouthProfileAdmin(admin.ModelAdmin):
     list_filter = ('has_protected_identity', 'grade')
     search_fields = ('user__email', 'user__first_name', 'user__last_name')
     raw_id_fields = ('user',)
+    list_select_related = ('user',)
+    show_full_result_count = False
 
 
 @admin.register(GuardianProfile)
@@ -0,0 +1,221 @@
+"""
+Stateless JWT authentication.
+
+simplejwt's JWTAuthentication loads the User row on every request, and the
+views then lazily load the user's municipality, workplace and youth
+profile. StatelessJWTAuthentication instead builds a ClaimsUser from the
+validated token plus a small cached snapshot of the fields the views read,
+so authenticated requests make no auth queries while the snapshot is warm.
+
+Snapshots live for AUTH_USER_CACHE_TTL seconds and are dropped whenever the
+user, their youth profile or their workplace changes (see signals.py).
+
+Tokens are revoked per user by storing User.tokens_valid_after: access and
+refresh tokens issued up to then are rejected. The timestamp is part of the
+snapshot, so the cache is only a read-through and losing it never
+re-validates a revoked token. Tokens carry their issue time in milliseconds
+(ISSUED_MS_CLAIM), so a login right after a password change is accepted.
+Password changes and deactivation revoke automatically; role or
+organization changes only need the snapshot refreshed, since the snapshot
+(not the claims) is what the views read.
+"""
+from functools import partial
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+from django.utils.functional import cached_property
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+
+from apps.core.logs import bind_user_context
+from apps.organizations.models import Municipality, Workplace
+from .models import YouthProfile
+
+User = get_user_model()
+
+# Issue time in epoch milliseconds; the standard iat claim only has seconds
+ISSUED_MS_CLAIM = 'iat_ms'
+
+
+def _snapshot_key(user_id) -> str:
+    return f'auth:user:{user_id}'
+
+
+def _epoch_ms(value) -> int | None:
+    return int(value.timestamp() * 1000) if value else None
+
+
+def build_user_snapshot(user_id) -> dict | None:
+    """Load the fields a ClaimsUser exposes, or None if the user does not exist."""
+    user = User.objects.select_related('workplace', 'youth_profile').filter(pk=user_id).first()
+    if user is None:
+        return None
+
+    profile = getattr(user, 'youth_profile', None)
+    return {
+        'email': user.email,
+        'first_name': user.first_name,
+        'last_name': user.last_name,
+        'role': user.role,
+        'is_active': user.is_active,
+        'is_staff': user.is_staff,
+        'is_superuser': user.is_superuser,
+        'municipality_id': user.municipality_id,
+        'workplace_id': user.workplace_id,
+        'workplace_municipality_id': user.workplace.municipality_id if user.workplace else None,
+        'tokens_valid_after_ms': _epoch_ms(user.tokens_valid_after),
+        'youth_profile': {
+            'id': profile.id,
+            'municipality_id': profile.municipality_id,
+            'date_of_birth': profile.date_of_birth,
+            'grade': profile.grade,
+            'custom_attributes': profile.custom_attributes,
+        } if profile else None,
+    }
+
+
+def get_user_snapshot(user_id) -> dict | None:
+    """The cached snapshot, loaded from the database on a miss."""
+    key = _snapshot_key(user_id)
+    snapshot = cache.get(key)
+    if snapshot is None:
+        snapshot = build_user_snapshot(user_id)
+        if snapshot is not None:
+            cache.set(key, snapshot, settings.AUTH_USER_CACHE_TTL)
+    return snapshot
+
+
+def invalidate_user_snapshot(user_id) -> None:
+    cache.delete(_snapshot_key(user_id))
+
+
+def invalidate_user_snapshots(user_ids) -> None:
+    cache.delete_many([_snapshot_key(user_id) for user_id in user_ids])
+
+
+def revoke_user_tokens(user_id):
+    """
+    Reject every token issued to the user up to now.
+
+    Written in the caller's transaction; the cached snapshot is dropped
+    once it commits. Returns the new tokens_valid_after.
+    """
+    valid_after = timezone.now()
+    User.objects.filter(pk=user_id).update(tokens_valid_after=valid_after)
+    transaction.on_commit(partial(invalidate_user_snapshot, user_id))
+    return valid_after
+
+
+def issued_ms(token) -> int:
+    """When the token was issued, in epoch milliseconds."""
+    # Tokens without the claim only have whole seconds: assume the start of
+    # that second, so they are rejected if revoked within it
+    return token.get(ISSUED_MS_CLAIM) or token.get('iat', 0) * 1000
+
+
+def is_token_revoked(token, valid_after_ms: int | None) -> bool:
+    return valid_after_ms is not None and issued_ms(token) <= valid_after_ms
+
+
+def check_token_not_revoked(token) -> None:
+    """Raise AuthenticationFailed if the token was issued before the user's revocation."""
+    snapshot = get_user_snapshot(token.get(api_settings.USER_ID_CLAIM))
+    if snapshot is not None and is_token_revoked(token, snapshot['tokens_valid_after_ms']):
+        raise AuthenticationFailed(_('Token has been revoked'), code='token_revoked')
+
+
+def _persisted(model, **fields):
+    """Model instance carrying only the given fields, treated as already saved."""
+    instance = model(**fields)
+    instance._state.adding = False
+    instance._state.db = 'default'
+    return instance
+
+
+class ClaimsUser(TokenUser):
+    """
+    Request user backed by the token and a cached snapshot instead of a User row.
+
+    Exposes the attributes the views use (role, municipality, workplace,
+    youth_profile, ...). Related objects are partial instances carrying
+    only their primary key and the foreign keys the views filter on; load
+    the real row when more is needed.
+    """
+
+    def __init__(self, token, snapshot: dict):
+        super().__init__(token)
+        self._snapshot = snapshot
+
+    def __getattr__(self, name):
+        # Only reached for attributes not defined on the class
+        if name == 'youth_profile':
+            raise AttributeError(name)
+        snapshot = self.__dict__.get('_snapshot')
+        if snapshot is not None and name in snapshot:
+            return snapshot[name]
+        # Fall back to custom token claims
+        return super().__getattr__(name)
+
+    @cached_property
+    def is_staff(self) -> bool:
+        return self._snapshot['is_staff']
+
+    @cached_property
+    def is_superuser(self) -> bool:
+        return self._snapshot['is_superuser']
+
+    @property
+    def is_active(self) -> bool:
+        return self._snapshot['is_active']
+
+    @cached_property
+    def municipality(self):
+        municipality_id = self._snapshot['municipality_id']
+        return _persisted(Municipality, id=municipality_id) if municipality_id else None
+
+    @cached_property
+    def workplace(self):
+        workplace_id = self._snapshot['workplace_id']
+        if not workplace_id:
+            return None
+        return _persisted(
+            Workplace, id=workplace_id, municipality_id=self._snapshot['workplace_municipality_id']
+        )
+
+    @cached_property
+    def youth_profile(self):
+        profile = self._snapshot['youth_profile']
+        if profile is None:
+            # Same contract as the reverse one-to-one: hasattr() is False
+            raise AttributeError('youth_profile')
+        return _persisted(YouthProfile, user_id=self.id, **profile)
+
+
+class StatelessJWTAuthentication(JWTAuthentication):
+    """JWT authentication that resolves the user from cache instead of the database."""
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_('Token contained no recognizable user identification'))
+
+        snapshot = get_user_snapshot(user_id)
+        if snapshot is None:
+            raise AuthenticationFailed(_('User not found'), code='user_not_found')
+
+        if is_token_revoked(validated_token, snapshot['tokens_valid_after_ms']):
+            raise AuthenticationFailed(_('Token has been revoked'), code='token_revoked')
+
+        if not snapshot['is_active']:
+            raise AuthenticationFailed(_('User is inactive'), code='user_inactive')
+
+        user = ClaimsUser(validated_token, snapshot)
+        bind_user_context(user)
+        return user
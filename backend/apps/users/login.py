@@ -0,0 +1,200 @@
+"""
+Async login with password hashing offloaded to a bounded pool.
+
+PBKDF2 is deliberately slow, so during a login storm (an application
+window opening) synchronous logins tie up every worker. The async login
+view awaits the hash in a small thread pool instead: hashlib releases the
+GIL while hashing, so the threads hash in parallel while the event loop
+keeps serving other requests.
+
+The pool admits at most LOGIN_HASH_WORKERS running plus
+LOGIN_HASH_MAX_QUEUE waiting hashes. Beyond that, logins are refused
+straight away with 429 and a Retry-After estimated from the backlog, rather
+than piling up until clients time out.
+
+Serve the app through ASGI (config/asgi.py) to benefit; under WSGI the view
+still works but each login holds its worker.
+"""
+import asyncio
+import json
+import logging
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import check_password, make_password
+from django.http import JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
+from rest_framework import serializers
+
+from .token_serializers import CustomTokenObtainPairSerializer
+
+logger = logging.getLogger(__name__)
+
+User = get_user_model()
+
+
+class PoolSaturated(Exception):
+    """Raised when the pool's queue is full."""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"Hashing pool saturated, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+class BoundedHashPool:
+    """Thread pool with a hard limit on waiting work and simple queueing metrics."""
+
+    def __init__(self, workers: int, max_queue: int):
+        self.workers = workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='login-hash')
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._metrics = {
+            'submitted': 0,
+            'completed': 0,
+            'rejected': 0,
+            'max_pending': 0,
+            'wait_seconds': 0.0,
+            'run_seconds': 0.0,
+        }
+
+    def _retry_after(self) -> int:
+        completed = self._metrics['completed']
+        avg_run = self._metrics['run_seconds'] / completed if completed else 0.5
+        return max(1, math.ceil(self._pending / self.workers * avg_run))
+
+    def _timed(self, queued_at: float, fn, args):
+        started = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            finished = time.perf_counter()
+            with self._lock:
+                self._metrics['wait_seconds'] += started - queued_at
+                self._metrics['run_seconds'] += finished - started
+
+    async def run(self, fn, *args):
+        """
+        Run fn(*args) in the pool and await its result.
+
+        Raises:
+            PoolSaturated: If the running and queued work is already at the limit
+        """
+        with self._lock:
+            if self._pending >= self.workers + self.max_queue:
+                self._metrics['rejected'] += 1
+                raise PoolSaturated(self._retry_after())
+            self._pending += 1
+            self._metrics['submitted'] += 1
+            self._metrics['max_pending'] = max(self._metrics['max_pending'], self._pending)
+
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(self._executor, self._timed, time.perf_counter(), fn, args)
+        finally:
+            with self._lock:
+                self._pending -= 1
+                self._metrics['completed'] += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            completed = self._metrics['completed']
+            return {
+                'workers': self.workers,
+                'max_queue': self.max_queue,
+                'pending': self._pending,
+                'running': min(self._pending, self.workers),
+                'queued': max(0, self._pending - self.workers),
+                **self._metrics,
+                'avg_wait_seconds': self._metrics['wait_seconds'] / completed if completed else 0.0,
+                'avg_run_seconds': self._metrics['run_seconds'] / completed if completed else 0.0,
+            }
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_hash_pool() -> BoundedHashPool:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = BoundedHashPool(settings.LOGIN_HASH_WORKERS, settings.LOGIN_HASH_MAX_QUEUE)
+        return _pool
+
+
+def _verify_password(raw_password: str, encoded: str) -> tuple[bool, bool]:
+    """Return (is_correct, must_update) without saving anything."""
+    must_update = []
+    is_correct = check_password(raw_password, encoded, setter=lambda raw: must_update.append(True))
+    return is_correct, bool(must_update)
+
+
+class AsyncLoginSerializer(serializers.Serializer):
+    email = serializers.CharField()
+    # Hashed as given, whitespace included
+    password = serializers.CharField(trim_whitespace=False)
+
+
+def _error(message: str, status: int) -> JsonResponse:
+    # Same shape as the synchronous login's validation errors
+    return JsonResponse({'non_field_errors': [message]}, status=status)
+
+
+@csrf_exempt
+@require_POST
+async def async_login(request):
+    """
+    POST /api/v1/auth/login/async/
+
+    Same request and response as /api/v1/auth/login/ ({"email", "password"}
+    in, {"refresh", "access"} out), or 429 with Retry-After when the hashing
+    pool is saturated.
+    """
+    try:
+        payload = json.loads(request.body or b'{}')
+    except ValueError:
+        return _error('Invalid JSON body.', 400)
+    if not isinstance(payload, dict):
+        return _error('Invalid JSON body.', 400)
+
+    # Only strings may reach the hasher
+    serializer = AsyncLoginSerializer(data=payload)
+    if not serializer.is_valid():
+        return JsonResponse(serializer.errors, status=400)
+    email = serializer.validated_data['email']
+    password = serializer.validated_data['password']
+
+    pool = get_hash_pool()
+    user = await User.objects.filter(email=email).afirst()
+
+    try:
+        if user is None:
+            # Hash anyway so unknown emails take as long as wrong passwords
+            await pool.run(make_password, password)
+            return _error('Invalid credentials.', 400)
+
+        is_correct, must_update = await pool.run(_verify_password, password, user.password)
+        if is_correct and must_update:
+            new_hash = await pool.run(make_password, password)
+            # Queryset update: same password, so this must not trigger token revocation
+            await User.objects.filter(pk=user.pk).aupdate(password=new_hash)
+    except PoolSaturated as e:
+        logger.warning("Login rejected: %s", e)
+        response = _error('Too many login attempts right now, please retry shortly.', 429)
+        response['Retry-After'] = str(e.retry_after)
+        return response
+
+    if not is_correct:
+        return _error('Invalid credentials.', 400)
+    if not user.is_active:
+        return _error('User account is disabled.', 400)
+
+    refresh = CustomTokenObtainPairSerializer.get_token(user)
+    return JsonResponse({'refresh': str(refresh), 'access': str(refresh.access_token)})
@@ -0,0 +1,52 @@
+import csv
+import uuid
+from collections import Counter
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.organizations.models import Municipality
+from apps.users.roster import REPORT_COLUMNS, ROSTER_FORMATS, import_roster, read_roster
+
+
+class Command(BaseCommand):
+    help = "Import a CSV/NDJSON youth roster into a municipality and write a per-row report."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="Roster file (.csv, or .ndjson/.jsonl)")
+        parser.add_argument('--municipality', required=True, help="Municipality id or slug.")
+        parser.add_argument('--input', choices=ROSTER_FORMATS, help="File format. Default: from the extension.")
+        parser.add_argument('--report', help="Write the CSV report here. Default: stdout.")
+        parser.add_argument(
+            '--processes',
+            type=int,
+            help="Password hashing processes (0 hashes inline). Default: ROSTER_HASH_PROCESSES.",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            lookup = {'pk': uuid.UUID(options['municipality'])}
+        except ValueError:
+            lookup = {'slug': options['municipality']}
+        municipality = Municipality.objects.filter(**lookup).first()
+        if municipality is None:
+            raise CommandError(f"Municipality {options['municipality']!r} not found.")
+
+        input_format = options['input'] or (
+            'ndjson' if options['path'].lower().endswith(('.ndjson', '.jsonl')) else 'csv'
+        )
+
+        statuses = Counter()
+        report_file = open(options['report'], 'w', newline='') if options['report'] else None
+        try:
+            writer = csv.writer(report_file or self.stdout)
+            writer.writerow(REPORT_COLUMNS)
+            with open(options['path'], 'rb') as roster:
+                for report_row in import_roster(read_roster(roster, input_format), municipality.id, options['processes']):
+                    statuses[report_row[2]] += 1
+                    writer.writerow(report_row)
+        finally:
+            if report_file:
+                report_file.close()
+
+        summary = ', '.join(f"{count} {status}" for status, count in sorted(statuses.items())) or 'no rows'
+        self.stderr.write(self.style.SUCCESS(f"Imported roster into {municipality.name}: {summary}."))
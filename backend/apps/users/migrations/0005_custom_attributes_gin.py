@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-19 07:22
+
+import django.contrib.postgres.indexes
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('organizations', '0004_workplace_logo_workplace_promo_image_and_more'),
+        ('users', '0004_add_grade_choices'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='youthprofile',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['custom_attributes'], name='youth_custom_attrs_gin', opclasses=['jsonb_path_ops']),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 07:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0005_custom_attributes_gin'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='youthprofile',
+            name='grade_rank',
+            field=models.GeneratedField(db_persist=True, expression=models.Case(models.When(grade='YEAR_1', then=models.Value(0)), models.When(grade='YEAR_2', then=models.Value(1)), models.When(grade='YEAR_3', then=models.Value(2)), models.When(grade='YEAR_4', then=models.Value(3)), models.When(grade='YEAR_5', then=models.Value(4)), models.When(grade='YEAR_6', then=models.Value(5)), models.When(grade='YEAR_7', then=models.Value(6)), models.When(grade='YEAR_8', then=models.Value(7)), models.When(grade='YEAR_9', then=models.Value(8)), models.When(grade='GYM_1', then=models.Value(9)), models.When(grade='GYM_2', then=models.Value(10)), models.When(grade='GYM_3', then=models.Value(11)), models.When(grade='GYM_4', then=models.Value(12)), default=None, output_field=models.PositiveSmallIntegerField()), output_field=models.PositiveSmallIntegerField(null=True)),
+        ),
+    ]
@@ -1,8 +1,12 @@
 import uuid
 from django.contrib.auth.models import AbstractUser
+from django.contrib.postgres.indexes import GinIndex, OpClass
 from django.db import models
+from django.db.models.functions import Cast, Upper
 from django.utils.translation import gettext_lazy as _
 
+from apps.core.grades import grade_rank_expression
+
 
 class User(AbstractUser):
     """
@@ -39,12 +43,32 @@ class User(AbstractUser):
         related_name='admins'
     )
 
+    # Tokens issued up to this moment are rejected (password change,
+    # deactivation); see apps/users/authentication.py
+    tokens_valid_after = models.DateTimeField(null=True, blank=True, editable=False)
+
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = ['username', 'first_name', 'last_name']
 
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            # Trigram indexes on UPPER(col::text), the exact expression icontains
+            # compiles to, so admin search and the search endpoint avoid seq scans
+            GinIndex(OpClass(Upper(Cast('email', models.TextField())), name='gin_trgm_ops'), name='user_email_trgm'),
+            GinIndex(OpClass(Upper(Cast('first_name', models.TextField())), name='gin_trgm_ops'), name='user_first_name_trgm'),
+            GinIndex(OpClass(Upper(Cast('last_name', models.TextField())), name='gin_trgm_ops'), name='user_last_name_trgm'),
+        ]
+
     def __str__(self):
         return self.email
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the persisted values so signal handlers can tell what changed
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
 
 class YouthProfile(models.Model):
     """Youth applicant profile with specific fields for the lottery system."""
@@ -99,6 +123,12 @@ class YouthProfile(models.Model):
         blank=True,
         default=''
     )
+    # Position of grade in school order, for eligibility filtering in SQL
+    grade_rank = models.GeneratedField(
+        expression=grade_rank_expression('grade'),
+        output_field=models.PositiveSmallIntegerField(null=True),
+        db_persist=True,
+    )
 
     # Ghost Protocol / Protected Identity
     has_protected_identity = models.BooleanField(default=False)
@@ -116,6 +146,12 @@ class YouthProfile(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # Containment (@>) queries when matching youth against job requirements
+            GinIndex(fields=['custom_attributes'], opclasses=['jsonb_path_ops'], name='youth_custom_attrs_gin'),
+        ]
+
     def __str__(self):
         return f"Youth: {self.user.email}"
 
@@ -0,0 +1,232 @@
+"""
+Bulk youth roster import.
+
+Municipalities onboard whole school rosters (tens of thousands of youth) as
+CSV or NDJSON. Rows are read and validated one at a time, then written in
+chunks of ROSTER_CHUNK_SIZE: one bulk insert for users and one for youth
+profiles per chunk, each chunk in its own transaction.
+
+Rows with a password (checked against AUTH_PASSWORD_VALIDATORS) get it
+hashed in a process pool, since hashing is what dominates the import. The
+pool's processes come from a fork server, never from forking the web
+worker: its log and trace threads may hold locks at fork time. Rows
+without a password get an unusable one and an invite token, which the
+youth redeems through /api/v1/users/accept-invite/.
+
+import_roster() yields one report row per input row (REPORT_COLUMNS):
+invalid rows as soon as they are read, valid rows once their chunk has
+been committed.
+"""
+import csv
+import io
+import json
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import IO, Iterable, Iterator
+
+import django
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.tokens import default_token_generator
+from django.db import IntegrityError, transaction
+from django.utils.encoding import force_bytes
+from django.utils.http import urlsafe_base64_encode
+
+from apps.organizations.custom_fields import get_custom_fields_validator
+from .models import YouthProfile
+from .serializers import RosterRowSerializer
+
+User = get_user_model()
+
+ROSTER_CHUNK_SIZE = 1000
+
+ROSTER_FORMATS = ('csv', 'ndjson')
+
+REPORT_COLUMNS = ['row', 'email', 'status', 'errors', 'invite_uid', 'invite_token']
+
+
+def _csv_rows(text: IO[str]) -> Iterator[tuple[dict | None, str | None]]:
+    for row in csv.DictReader(text):
+        # Empty cells mean "not given"
+        row = {key: value for key, value in row.items() if key and value not in ('', None)}
+        if 'custom_attributes' in row:
+            try:
+                row['custom_attributes'] = json.loads(row['custom_attributes'])
+            except ValueError:
+                yield None, 'custom_attributes: Not valid JSON.'
+                continue
+        yield row, None
+
+
+def _ndjson_rows(text: IO[str]) -> Iterator[tuple[dict | None, str | None]]:
+    for line in text:
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            yield None, 'Not valid JSON.'
+            continue
+        if not isinstance(row, dict):
+            yield None, 'Not a JSON object.'
+            continue
+        yield row, None
+
+
+def read_roster(stream: IO[bytes], input_format: str) -> Iterator[tuple[int, dict | None, str | None]]:
+    """
+    Yield (row_number, row, parse_error) for each row of an uploaded roster.
+
+    Exactly one of row and parse_error is set. A file that cannot be read
+    any further (bad encoding, broken CSV quoting) ends with an error row.
+    """
+    text = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+    rows = _csv_rows(text) if input_format == 'csv' else _ndjson_rows(text)
+    row_number = 0
+    try:
+        for row, parse_error in rows:
+            row_number += 1
+            yield row_number, row, parse_error
+    except (csv.Error, UnicodeDecodeError) as e:
+        yield row_number + 1, None, f'File unreadable from here on: {e}'
+
+
+def _format_errors(errors) -> str:
+    return '; '.join(f"{field}: {' '.join(str(m) for m in messages)}" for field, messages in errors.items())
+
+
+def _hash_passwords(executor, processes: int, passwords: list[str]) -> list[str]:
+    if executor is None:
+        return [make_password(password) for password in passwords]
+    # A few batches per process keeps IPC overhead low and the load balanced
+    chunksize = max(1, len(passwords) // (processes * 4))
+    return list(executor.map(make_password, passwords, chunksize=chunksize))
+
+
+def _write_chunk(rows: list[tuple[int, dict]], municipality_id, executor, processes: int) -> Iterator[list]:
+    """Insert one chunk and yield its report rows."""
+    emails = [data['email'] for _, data in rows]
+    taken = set(User.objects.filter(email__in=emails).values_list('email', flat=True))
+
+    new_rows = []
+    for row_number, data in rows:
+        if data['email'] in taken:
+            yield [row_number, data['email'], 'error', 'email: A user with this email already exists.', '', '']
+        else:
+            new_rows.append((row_number, data))
+    if not new_rows:
+        return
+
+    with_password = [data['password'] for _, data in new_rows if data.get('password')]
+    hashes = iter(_hash_passwords(executor, processes, with_password))
+
+    users, profiles = [], []
+    for _, data in new_rows:
+        user = User(
+            email=data['email'],
+            username=data['email'],
+            first_name=data['first_name'],
+            last_name=data['last_name'],
+            role=User.Roles.YOUTH,
+            municipality_id=municipality_id,
+        )
+        if data.get('password'):
+            user.password = next(hashes)
+        else:
+            user.set_unusable_password()
+        users.append(user)
+        profiles.append(YouthProfile(
+            user=user,
+            municipality_id=municipality_id,
+            date_of_birth=data.get('date_of_birth'),
+            grade=data.get('grade', ''),
+            gender=data.get('gender', ''),
+            phone_number=data.get('phone_number', ''),
+            personal_number=data.get('personal_number', ''),
+            custom_attributes=data.get('custom_attributes') or {},
+        ))
+
+    try:
+        with transaction.atomic():
+            User.objects.bulk_create(users)
+            YouthProfile.objects.bulk_create(profiles)
+    except IntegrityError as e:
+        # Most likely an email registered concurrently; the whole chunk was rolled back
+        for row_number, data in new_rows:
+            yield [row_number, data['email'], 'error', f'Chunk rolled back: {e}', '', '']
+        return
+
+    for (row_number, data), user in zip(new_rows, users):
+        if data.get('password'):
+            yield [row_number, user.email, 'created', '', '', '']
+        else:
+            yield [
+                row_number, user.email, 'invited', '',
+                urlsafe_base64_encode(force_bytes(user.pk)),
+                default_token_generator.make_token(user),
+            ]
+
+
+def import_roster(
+    rows: Iterable[tuple[int, dict | None, str | None]],
+    municipality_id,
+    processes: int | None = None,
+) -> Iterator[list]:
+    """
+    Validate and insert roster rows, yielding a report row for each.
+
+    Args:
+        rows: (row_number, row, parse_error) tuples, as from read_roster()
+        municipality_id: Municipality the youth belong to
+        processes: Password hashing processes (ROSTER_HASH_PROCESSES by default, 0 hashes inline)
+    """
+    if processes is None:
+        processes = settings.ROSTER_HASH_PROCESSES
+    # Started lazily: invite-only rosters never need it
+    executor = None
+    custom_fields = get_custom_fields_validator(municipality_id)
+    seen_emails = set()
+    chunk: list[tuple[int, dict]] = []
+
+    try:
+        for row_number, row, parse_error in rows:
+            if parse_error:
+                yield [row_number, '', 'error', parse_error, '', '']
+                continue
+
+            serializer = RosterRowSerializer(data=row)
+            if not serializer.is_valid():
+                yield [row_number, row.get('email', ''), 'error', _format_errors(serializer.errors), '', '']
+                continue
+
+            data = serializer.validated_data
+            attribute_errors = custom_fields.validate(data.get('custom_attributes') or {})
+            if attribute_errors:
+                errors = '; '.join(f'custom_attributes.{key}: {message}' for key, message in attribute_errors.items())
+                yield [row_number, data['email'], 'error', errors, '', '']
+                continue
+
+            if data['email'] in seen_emails:
+                yield [row_number, data['email'], 'error', 'email: Duplicate of an earlier row.', '', '']
+                continue
+            seen_emails.add(data['email'])
+
+            if data.get('password') and executor is None and processes > 0:
+                # Workers need configured settings for the password hashers
+                executor = ProcessPoolExecutor(
+                    max_workers=processes,
+                    mp_context=multiprocessing.get_context('forkserver'),
+                    initializer=django.setup,
+                )
+
+            chunk.append((row_number, data))
+            if len(chunk) >= ROSTER_CHUNK_SIZE:
+                yield from _write_chunk(chunk, municipality_id, executor, processes)
+                chunk = []
+
+        if chunk:
+            yield from _write_chunk(chunk, municipality_id, executor, processes)
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
@@ -0,0 +1,42 @@
+"""
+Fuzzy user search backed by the pg_trgm indexes on User.
+
+Each search word must match one of email, first name or last name, either
+as a substring (LIKE, like the admin's icontains) or by trigram word
+similarity, which tolerates typos. Both conditions are on UPPER(col::text)
+so they use the user_*_trgm GIN indexes. Results are ranked by how well the
+words match.
+"""
+from django.contrib.postgres.search import TrigramWordSimilarity
+from django.db.models import F, Q, TextField, Value
+from django.db.models.functions import Cast, Greatest, Upper
+
+SEARCH_FIELDS = ('email', 'first_name', 'last_name')
+
+# Shortest search accepted; shorter words have too few trigrams to be selective
+MIN_SEARCH_LENGTH = 2
+
+
+def search_users(queryset, term: str):
+    """Filter a User queryset to matches for `term`, best match first (annotated search_rank)."""
+    words = term.upper().split()
+    queryset = queryset.annotate(**{
+        f'search_{field}': Upper(Cast(field, TextField())) for field in SEARCH_FIELDS
+    })
+
+    rank = None
+    for word in words:
+        matches = Q()
+        for field in SEARCH_FIELDS:
+            matches |= Q(**{f'search_{field}__contains': word})
+            matches |= Q(**{f'search_{field}__trigram_word_similar': word})
+        queryset = queryset.filter(matches)
+
+        word_rank = Greatest(*[
+            TrigramWordSimilarity(Value(word), F(f'search_{field}')) for field in SEARCH_FIELDS
+        ])
+        rank = word_rank if rank is None else rank + word_rank
+
+    if rank is None:
+        return queryset.none()
+    return queryset.annotate(search_rank=rank).order_by('-search_rank', 'last_name', 'first_name')
@@ -1,6 +1,9 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
 from django.contrib.auth.hashers import make_password
+from django.contrib.auth.password_validation import validate_password
+from django.core.exceptions import ValidationError as DjangoValidationError
+from apps.organizations.custom_fields import get_custom_fields_validator
 from .models import YouthProfile, GuardianProfile
 
 User = get_user_model()
@@ -21,6 +24,14 @@ class UserSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ['role', 'municipality', 'workplace']  # Security: Users can't change their own role
 
+    # Relations read by the method fields below; keep in sync with them
+    select_related_fields = ('municipality', 'workplace', 'youth_profile__municipality')
+
+    @classmethod
+    def setup_eager_loading(cls, queryset):
+        """Load everything this serializer reads in the same query as the users."""
+        return queryset.select_related(*cls.select_related_fields)
+
     def get_municipality_name(self, obj):
         if obj.municipality:
             return obj.municipality.name
@@ -202,9 +213,9 @@ class YouthProfileSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'user', 'created_at', 'updated_at']
 
     def get_municipality_custom_fields(self, obj):
-        """Return the custom fields schema from the youth's municipality."""
-        if obj.municipality and obj.municipality.custom_fields_schema:
-            return obj.municipality.custom_fields_schema
+        """Return the (normalized) custom fields schema from the youth's municipality."""
+        if obj.municipality_id:
+            return get_custom_fields_validator(obj.municipality_id).as_list()
         return []
 
 
@@ -227,6 +238,20 @@ class YouthProfileUpdateSerializer(serializers.ModelSerializer):
             'custom_attributes',
         ]
 
+    def validate(self, attrs):
+        """Check custom_attributes against the (new or current) municipality's schema."""
+        custom_attributes = attrs.get('custom_attributes')
+        if custom_attributes is not None:
+            if 'municipality' in attrs:
+                municipality_id = attrs['municipality'].pk if attrs['municipality'] else None
+            else:
+                municipality_id = self.instance.municipality_id if self.instance else None
+            if municipality_id:
+                errors = get_custom_fields_validator(municipality_id).validate(custom_attributes)
+                if errors:
+                    raise serializers.ValidationError({'custom_attributes': errors})
+        return attrs
+
     def update(self, instance, validated_data):
         # Extract user fields
         first_name = validated_data.pop('first_name', None)
@@ -242,3 +267,36 @@ class YouthProfileUpdateSerializer(serializers.ModelSerializer):
 
         # Update profile fields
         return super().update(instance, validated_data)
+
+
+class RosterRowSerializer(serializers.Serializer):
+    """One youth in a roster import (see roster.py)."""
+    email = serializers.EmailField(max_length=254)
+    first_name = serializers.CharField(max_length=150)
+    last_name = serializers.CharField(max_length=150)
+    # Empty means "send an invite" instead of setting a password
+    password = serializers.CharField(required=False, allow_blank=True, write_only=True)
+    date_of_birth = serializers.DateField(required=False, allow_null=True)
+    grade = serializers.ChoiceField(choices=YouthProfile.Grade.choices, required=False, allow_blank=True)
+    gender = serializers.ChoiceField(choices=YouthProfile.Gender.choices, required=False, allow_blank=True)
+    phone_number = serializers.CharField(max_length=20, required=False, allow_blank=True)
+    personal_number = serializers.CharField(max_length=12, required=False, allow_blank=True)
+    custom_attributes = serializers.DictField(required=False)
+
+    def validate(self, attrs):
+        # Same AUTH_PASSWORD_VALIDATORS as accept-invite, against the row's own names
+        password = attrs.get('password')
+        if password:
+            user = User(email=attrs['email'], first_name=attrs['first_name'], last_name=attrs['last_name'])
+            try:
+                validate_password(password, user)
+            except DjangoValidationError as e:
+                raise serializers.ValidationError({'password': e.messages})
+        return attrs
+
+
+class AcceptInviteSerializer(serializers.Serializer):
+    """Set the password of an invited (roster-imported) user."""
+    uid = serializers.CharField()
+    token = serializers.CharField()
+    password = serializers.CharField(write_only=True)
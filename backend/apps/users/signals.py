@@ -0,0 +1,56 @@
+from functools import partial
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.organizations.models import Workplace
+from .authentication import invalidate_user_snapshot, invalidate_user_snapshots, revoke_user_tokens
+from .models import YouthProfile
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=User)
+def refresh_auth_state_on_user_save(sender, instance, created, **kwargs):
+    """Revoke tokens on password change or deactivation, otherwise just drop the cached snapshot."""
+    if created:
+        # Later saves of the same instance compare against this state
+        instance._loaded_values = {'password': instance.password, 'is_active': instance.is_active}
+        return
+
+    loaded = getattr(instance, '_loaded_values', {})
+    password_changed = 'password' in loaded and loaded['password'] != instance.password
+    deactivated = loaded.get('is_active', instance.is_active) and not instance.is_active
+
+    if password_changed or deactivated:
+        # Keep the instance current, or its next save() would write the old value back
+        instance.tokens_valid_after = revoke_user_tokens(instance.pk)
+    else:
+        transaction.on_commit(partial(invalidate_user_snapshot, instance.pk))
+
+    # Later saves of the same instance compare against this state
+    instance._loaded_values = {**loaded, 'password': instance.password, 'is_active': instance.is_active}
+
+
+@receiver(post_delete, sender=User)
+def drop_auth_snapshot_on_user_delete(sender, instance, **kwargs):
+    transaction.on_commit(partial(invalidate_user_snapshot, instance.pk))
+
+
+@receiver(post_save, sender=YouthProfile)
+@receiver(post_delete, sender=YouthProfile)
+def drop_auth_snapshot_on_profile_change(sender, instance, **kwargs):
+    """Grade, birth date and custom attributes are part of the snapshot."""
+    transaction.on_commit(partial(invalidate_user_snapshot, instance.user_id))
+
+
+@receiver(post_save, sender=Workplace)
+def drop_auth_snapshots_on_workplace_change(sender, instance, created, **kwargs):
+    """Workplace admins' snapshots embed the workplace's municipality."""
+    if created:
+        return
+    admin_ids = list(instance.admins.values_list('id', flat=True))
+    if admin_ids:
+        transaction.on_commit(partial(invalidate_user_snapshots, admin_ids))
@@ -1,3 +1,108 @@
+import time
+
+from django.core.cache import cache
 from django.test import TestCase
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from apps.organizations.models import Municipality, Workplace
+from .models import User, YouthProfile
+from .token_serializers import CustomTokenObtainPairSerializer
+
+
+class UserListQueryCountTests(TestCase):
+    """The users list must not issue per-row queries for related objects."""
+
+    def setUp(self):
+        self.municipality = Municipality.objects.create(name='Testkommun', slug='testkommun')
+        self.workplace = Workplace.objects.create(name='Parkförvaltningen', municipality=self.municipality)
+
+        self.admin = User.objects.create(
+            email='admin@example.com',
+            username='admin@example.com',
+            role=User.Roles.SUPER_ADMIN,
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def create_users(self, count):
+        for i in range(count):
+            youth = User.objects.create(
+                email=f'youth{i}@example.com',
+                username=f'youth{i}@example.com',
+                role=User.Roles.YOUTH,
+                municipality=self.municipality,
+            )
+            YouthProfile.objects.create(user=youth, municipality=self.municipality, grade='GYM_1')
+            User.objects.create(
+                email=f'workplace{i}@example.com',
+                username=f'workplace{i}@example.com',
+                role=User.Roles.WORKPLACE_ADMIN,
+                municipality=self.municipality,
+                workplace=self.workplace,
+            )
+
+    def test_list_query_count_is_constant(self):
+        # 19 users, all on the first page
+        self.create_users(9)
+
+        # One COUNT for the paginator, one SELECT with all relations joined
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/v1/users/')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['count'], 19)
+
+        rows = {row['email']: row for row in response.data['results']}
+        self.assertEqual(rows['youth0@example.com']['youth_profile']['municipality_name'], 'Testkommun')
+        self.assertEqual(rows['workplace0@example.com']['workplace_name'], 'Parkförvaltningen')
+        self.assertEqual(rows['workplace0@example.com']['municipality_name'], 'Testkommun')
+
+    def test_me_query_count(self):
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/v1/users/me/')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['email'], 'admin@example.com')
+
+
+class TokenRevocationTests(TestCase):
+    """Password changes revoke earlier tokens, durably and to the millisecond."""
+
+    def setUp(self):
+        self.user = User.objects.create(email='youth@example.com', username='youth@example.com')
+        self.client = APIClient()
+
+    def get_me(self, refresh):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+        return self.client.get('/api/v1/users/me/')
+
+    def change_password(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.set_password('a new password')
+            self.user.save()
+
+    def test_revocation_survives_losing_the_cache(self):
+        old = CustomTokenObtainPairSerializer.get_token(self.user)
+        self.assertEqual(self.get_me(old).status_code, status.HTTP_200_OK)
+
+        self.change_password()
+        cache.clear()
+
+        self.assertEqual(self.get_me(old).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_token_issued_right_after_the_change_is_accepted(self):
+        self.change_password()
+        # Well within the same second, but past the revocation's millisecond
+        time.sleep(0.002)
+        new = CustomTokenObtainPairSerializer.get_token(self.user)
+
+        self.assertEqual(self.get_me(new).status_code, status.HTTP_200_OK)
+
+    def test_revoked_refresh_token_cannot_be_refreshed(self):
+        old = CustomTokenObtainPairSerializer.get_token(self.user)
+        self.change_password()
+
+        response = self.client.post('/api/v1/auth/refresh/', {'refresh': str(old)}, format='json')
 
-# Create your tests here.
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
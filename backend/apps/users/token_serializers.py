@@ -1,7 +1,11 @@
-from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+import time
+
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
 
+from .authentication import ISSUED_MS_CLAIM, check_token_not_revoked
+
 User = get_user_model()
 
 
@@ -44,12 +48,23 @@ class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
     @classmethod
     def get_token(cls, user):
         token = super().get_token(user)
+        # Sub-second issue time, so tokens revoked earlier in the same second are told apart
+        token[ISSUED_MS_CLAIM] = int(time.time() * 1000)
 
         # Add custom claims (The Role!)
         token['role'] = user.role
         token['email'] = user.email
         token['first_name'] = user.first_name
         token['last_name'] = user.last_name
-        token['municipality'] = str(user.municipality.id) if user.municipality else None
+        token['municipality'] = str(user.municipality_id) if user.municipality_id else None
+        token['workplace'] = str(user.workplace_id) if user.workplace_id else None
 
         return token
+
+
+class CustomTokenRefreshSerializer(TokenRefreshSerializer):
+    """Refuse to refresh tokens that were revoked (password change, deactivation)."""
+
+    def validate(self, attrs):
+        check_token_not_revoked(self.token_class(attrs['refresh']))
+        return super().validate(attrs)
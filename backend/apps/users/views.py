@@ -1,31 +1,65 @@
+import uuid
+
 from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from rest_framework_simplejwt.views import TokenObtainPairView
+from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 from django.contrib.auth import get_user_model
+from django.db.models import Q
+from django.contrib.auth.password_validation import validate_password
+from django.contrib.auth.tokens import default_token_generator
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.utils.encoding import force_str
+from django.utils.http import urlsafe_base64_decode
+
+from apps.core.exports import get_export_format, iterate_values, streaming_export
 
 from .models import YouthProfile
+from .roster import REPORT_COLUMNS, ROSTER_FORMATS, import_roster, read_roster
+from .search import MIN_SEARCH_LENGTH, search_users
 from .serializers import (
+    AcceptInviteSerializer,
     UserSerializer,
     YouthProfileSerializer,
     YouthProfileUpdateSerializer,
     UserCreateSerializer,
     UserUpdateSerializer,
 )
-from .token_serializers import CustomTokenObtainPairSerializer
+from .token_serializers import CustomTokenObtainPairSerializer, CustomTokenRefreshSerializer
 
 User = get_user_model()
 
 
+def _parse_municipality_id(value):
+    """The ?municipality= value as a UUID, or None if it is not one."""
+    try:
+        return uuid.UUID(value)
+    except ValueError:
+        return None
+
+
 class CustomTokenObtainPairView(TokenObtainPairView):
     """Custom JWT login view that includes role in token."""
     serializer_class = CustomTokenObtainPairSerializer
 
 
+class CustomTokenRefreshView(TokenRefreshView):
+    """JWT refresh view that honours token revocation."""
+    serializer_class = CustomTokenRefreshSerializer
+
+
 class UserViewSet(viewsets.ModelViewSet):
-    queryset = User.objects.select_related('municipality').all()
+    queryset = User.objects.all()
     permission_classes = [permissions.IsAuthenticated]  # Fortress: Only logged-in users
 
+    def get_queryset(self):
+        """Eager-load whatever the action's serializer declares it reads."""
+        queryset = super().get_queryset()
+        serializer_class = self.get_serializer_class()
+        if hasattr(serializer_class, 'setup_eager_loading'):
+            queryset = serializer_class.setup_eager_loading(queryset)
+        return queryset
+
     def get_serializer_class(self):
         """Dynamic serializer selection based on action."""
         if self.action == 'create':
@@ -38,7 +72,8 @@ class UserViewSet(viewsets.ModelViewSet):
     # Critical for the Frontend to know "Who am I?" on page load
     @action(detail=False, methods=['get'])
     def me(self, request):
-        serializer = self.get_serializer(request.user)
+        # request.user is token-backed; serialize the full row
+        serializer = self.get_serializer(self.get_queryset().get(pk=request.user.pk))
         return Response(serializer.data)
 
     # GET/PATCH /api/v1/users/my-profile/
@@ -56,7 +91,7 @@ class UserViewSet(viewsets.ModelViewSet):
             )
 
         # Get or create YouthProfile
-        profile, created = YouthProfile.objects.get_or_create(user=user)
+        profile, created = YouthProfile.objects.get_or_create(user_id=user.pk)
 
         if request.method == 'GET':
             serializer = YouthProfileSerializer(profile)
@@ -69,3 +104,158 @@ class UserViewSet(viewsets.ModelViewSet):
             # Return full profile data after update
             return Response(YouthProfileSerializer(profile).data)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    # GET /api/v1/users/search/?q=<text>&role=<role>&municipality=<id>
+    @action(detail=False, methods=['get'])
+    def search(self, request):
+        """
+        Ranked fuzzy search on email and name. Municipality Admin only sees
+        users of their own municipality; Super Admin may filter by ?municipality.
+        """
+        user = request.user
+
+        if user.role == 'SUPER_ADMIN':
+            municipality_id = request.query_params.get('municipality')
+            if municipality_id:
+                municipality_id = _parse_municipality_id(municipality_id)
+                if municipality_id is None:
+                    return Response({'municipality': 'Must be a valid UUID.'}, status=status.HTTP_400_BAD_REQUEST)
+        elif user.role == 'MUNICIPALITY_ADMIN' and user.municipality_id:
+            municipality_id = user.municipality_id
+        else:
+            return Response(
+                {'detail': 'Only Municipality Admin or Super Admin can search users.'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        term = request.query_params.get('q', '').strip()
+        if len(term) < MIN_SEARCH_LENGTH:
+            return Response(
+                {'q': f'Enter at least {MIN_SEARCH_LENGTH} characters.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        queryset = UserSerializer.setup_eager_loading(User.objects.all())
+        if municipality_id:
+            queryset = queryset.filter(
+                Q(municipality_id=municipality_id) | Q(youth_profile__municipality_id=municipality_id)
+            )
+        role = request.query_params.get('role')
+        if role:
+            if role not in User.Roles.values:
+                return Response(
+                    {'role': f"Must be one of: {', '.join(User.Roles.values)}"},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            queryset = queryset.filter(role=role)
+
+        page = self.paginate_queryset(search_users(queryset, term))
+        serializer = UserSerializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
+    # GET /api/v1/users/export-youth/?output=csv|ndjson
+    @action(detail=False, methods=['get'], url_path='export-youth')
+    def export_youth(self, request):
+        """Stream the youth list (own municipality for Municipality Admin) as CSV or NDJSON."""
+        user = request.user
+
+        if user.role == 'SUPER_ADMIN':
+            profiles = YouthProfile.objects.all()
+            municipality_id = request.query_params.get('municipality')
+            if municipality_id:
+                municipality_id = _parse_municipality_id(municipality_id)
+                if municipality_id is None:
+                    return Response({'municipality': 'Must be a valid UUID.'}, status=status.HTTP_400_BAD_REQUEST)
+                profiles = profiles.filter(municipality_id=municipality_id)
+        elif user.role == 'MUNICIPALITY_ADMIN' and user.municipality:
+            profiles = YouthProfile.objects.filter(municipality_id=user.municipality_id)
+        else:
+            return Response(
+                {'detail': 'Only Municipality Admin or Super Admin can export youth.'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        output = get_export_format(request)
+        columns = [
+            'user_id', 'email', 'first_name', 'last_name', 'phone_number', 'gender',
+            'date_of_birth', 'grade', 'municipality', 'custom_attributes', 'created_at',
+        ]
+        rows = iterate_values(profiles.order_by('created_at'), [
+            'user_id', 'user__email', 'user__first_name', 'user__last_name', 'phone_number', 'gender',
+            'date_of_birth', 'grade', 'municipality__name', 'custom_attributes', 'created_at',
+        ])
+        return streaming_export(columns, rows, 'youth', output)
+
+    # POST /api/v1/users/import-roster/?output=csv|ndjson (multipart "file")
+    @action(detail=False, methods=['post'], url_path='import-roster')
+    def import_roster(self, request):
+        """
+        Create youth accounts from a CSV or NDJSON roster and stream back a
+        per-row report (created / invited / error). Municipality Admin imports
+        into their own municipality; Super Admin must pass ?municipality=<id>.
+        """
+        user = request.user
+
+        if user.role == 'SUPER_ADMIN':
+            municipality_id = request.query_params.get('municipality')
+            if not municipality_id:
+                return Response(
+                    {'detail': 'Super Admin must specify a municipality.'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            municipality_id = _parse_municipality_id(municipality_id)
+            if municipality_id is None:
+                return Response({'municipality': 'Must be a valid UUID.'}, status=status.HTTP_400_BAD_REQUEST)
+        elif user.role == 'MUNICIPALITY_ADMIN' and user.municipality_id:
+            municipality_id = user.municipality_id
+        else:
+            return Response(
+                {'detail': 'Only Municipality Admin or Super Admin can import rosters.'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response({'detail': 'Upload the roster as "file".'}, status=status.HTTP_400_BAD_REQUEST)
+
+        # Format from ?input=, else from the file extension
+        input_format = request.query_params.get('input') or (
+            'ndjson' if upload.name.lower().endswith(('.ndjson', '.jsonl')) else 'csv'
+        )
+        if input_format not in ROSTER_FORMATS:
+            return Response(
+                {'input': f"Must be one of: {', '.join(ROSTER_FORMATS)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        output = get_export_format(request)
+        report = import_roster(read_roster(upload, input_format), municipality_id)
+        return streaming_export(REPORT_COLUMNS, report, 'roster-report', output)
+
+    # POST /api/v1/users/accept-invite/
+    # For youth imported without a password (see import-roster)
+    @action(detail=False, methods=['post'], url_path='accept-invite',
+            permission_classes=[permissions.AllowAny], authentication_classes=[])
+    def accept_invite(self, request):
+        """Set a password using the invite uid/token from a roster import."""
+        serializer = AcceptInviteSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        try:
+            user_id = force_str(urlsafe_base64_decode(serializer.validated_data['uid']))
+            invited = User.objects.get(pk=user_id)
+        except (ValueError, DjangoValidationError, User.DoesNotExist):
+            invited = None
+
+        if invited is None or not default_token_generator.check_token(invited, serializer.validated_data['token']):
+            return Response({'detail': 'Invalid or expired invite.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        password = serializer.validated_data['password']
+        try:
+            validate_password(password, invited)
+        except DjangoValidationError as e:
+            return Response({'password': e.messages}, status=status.HTTP_400_BAD_REQUEST)
+
+        invited.set_password(password)
+        invited.save(update_fields=['password'])
+        return Response({'detail': 'Password set. You can now log in.'})
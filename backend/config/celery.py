@@ -0,0 +1,27 @@
+"""
+Celery application for Feriearbete Platform.
+
+Workers and beat are started with:
+    celery -A config worker
+    celery -A config beat
+"""
+import os
+
+from celery import Celery
+from celery.signals import setup_logging
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+
+app = Celery('config')
+app.config_from_object('django.conf:settings', namespace='CELERY')
+app.autodiscover_tasks()
+
+
+@setup_logging.connect
+def use_django_logging(**kwargs):
+    """Keep Django's LOGGING (structlog JSON through the queue handler) instead of Celery's root handlers."""
+    from logging.config import dictConfig
+
+    from django.conf import settings
+
+    dictConfig(settings.LOGGING)
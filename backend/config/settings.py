@@ -36,6 +36,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
 
     # Third-party apps
     'rest_framework',
@@ -44,6 +45,7 @@ INSTALLED_APPS = [
     'django_extensions',
 
     # Local apps
+    'apps.core',
     'apps.users',
     'apps.organizations',
     'apps.jobs',
@@ -61,6 +63,12 @@ AUTHENTICATION_BACKENDS = [
 ]
 
 MIDDLEWARE = [
+    # Outermost, so latency covers the whole stack (apps/core/metrics.py)
+    'apps.core.metrics.MetricsMiddleware',
+    # Request id and user context for every log event (apps/core/logs.py)
+    'apps.core.logs.RequestLogMiddleware',
+    # Span trees of sampled requests (apps/core/tracing.py)
+    'apps.core.tracing.TracingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'corsheaders.middleware.CorsMiddleware',  # CORS - must be before CommonMiddleware
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -137,6 +145,65 @@ STATIC_ROOT = BASE_DIR / 'staticfiles'
 MEDIA_URL = 'media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Media storage (apps/core/storage.py): 'local' (MEDIA_ROOT) or 's3' (MinIO / S3 bucket)
+MEDIA_STORAGE = os.getenv('MEDIA_STORAGE', 'local')
+
+STORAGES = {
+    'default': {'BACKEND': 'apps.core.storage.LocalMultipartStorage'},
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+}
+
+if MEDIA_STORAGE == 's3':
+    STORAGES['default'] = {
+        'BACKEND': 'apps.core.storage.S3MultipartStorage',
+        'OPTIONS': {
+            'bucket_name': os.getenv('S3_BUCKET_NAME', 'feriearbete-media'),
+            'endpoint_url': os.getenv('S3_ENDPOINT_URL') or None,
+            'access_key': os.getenv('S3_ACCESS_KEY'),
+            'secret_key': os.getenv('S3_SECRET_KEY'),
+            'region_name': os.getenv('S3_REGION_NAME') or None,
+            # Public bucket behind a CDN: plain URLs. Otherwise downloads are presigned.
+            'custom_domain': os.getenv('S3_CUSTOM_DOMAIN') or None,
+            'querystring_auth': not os.getenv('S3_CUSTOM_DOMAIN'),
+            'querystring_expire': int(os.getenv('S3_PRESIGNED_URL_TTL', 3600)),
+            # Unsigned, cacheable URLs for image derivatives (needs public read on derivatives/*)
+            'public_derivatives': os.getenv('S3_PUBLIC_DERIVATIVES', 'True').lower() == 'true',
+            'file_overwrite': False,
+        },
+    }
+
+# Chunked uploads (apps/core/uploads.py): part size clients must use (every
+# part but the last), the largest accepted file, and how long an upload may take
+UPLOAD_PART_SIZE = int(os.getenv('UPLOAD_PART_SIZE', 8 * 1024 * 1024))
+UPLOAD_MAX_SIZE = int(os.getenv('UPLOAD_MAX_SIZE', 200 * 1024 * 1024))
+UPLOAD_SESSION_MAX_AGE = int(os.getenv('UPLOAD_SESSION_MAX_AGE', 24 * 60 * 60))
+
+
+# Cache (Redis)
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.getenv('CACHE_URL', 'redis://localhost:6380/1'),
+        'KEY_PREFIX': 'feriearbete',
+    }
+}
+
+# Published job listing cache (youth job browsing)
+PUBLISHED_JOBS_CACHE_TTL = int(os.getenv('PUBLISHED_JOBS_CACHE_TTL', '300'))  # seconds
+PUBLISHED_JOBS_WARM_PAGES = 5  # pages pre-built per municipality
+PUBLISHED_JOBS_WARM_LEAD_MINUTES = 10  # how long before application_open to warm
+
+# Municipality admin dashboard cache (application counts may lag this long)
+DASHBOARD_CACHE_TTL = int(os.getenv('DASHBOARD_CACHE_TTL', '30'))  # seconds
+
+# Application intake: 'sync' inserts on the request thread, 'queue' answers
+# 202 and lets a Celery beat task insert queued submissions in batches
+APPLICATION_INTAKE_MODE = os.getenv('APPLICATION_INTAKE_MODE', 'sync')
+APPLICATION_INTAKE_BROKER = 'apps.jobs.intake.RedisStreamBroker'
+APPLICATION_INTAKE_REDIS_URL = os.getenv('APPLICATION_INTAKE_REDIS_URL', 'redis://localhost:6380/2')
+APPLICATION_INTAKE_BATCH_SIZE = 500
+APPLICATION_INTAKE_RECLAIM_MS = 60_000  # re-deliver entries unacknowledged this long
+
 
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
@@ -148,7 +215,8 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.IsAuthenticated',
     ],
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        # Token-backed request user, no per-request User query (apps/users/authentication.py)
+        'apps.users.authentication.StatelessJWTAuthentication',
         'rest_framework.authentication.SessionAuthentication',
     ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
@@ -164,6 +232,24 @@ SIMPLE_JWT = {
     'AUTH_HEADER_TYPES': ('Bearer',),
 }
 
+# Seconds a request user's snapshot (role, municipality, workplace, profile) stays cached
+AUTH_USER_CACHE_TTL = int(os.getenv('AUTH_USER_CACHE_TTL', 60))
+
+# Async login (apps/users/login.py): threads hashing passwords, and how many
+# logins may wait for one before new ones get 429
+LOGIN_HASH_WORKERS = int(os.getenv('LOGIN_HASH_WORKERS', os.cpu_count() or 4))
+LOGIN_HASH_MAX_QUEUE = int(os.getenv('LOGIN_HASH_MAX_QUEUE', 200))
+
+# Processes hashing passwords during roster imports (apps/users/roster.py)
+ROSTER_HASH_PROCESSES = int(os.getenv('ROSTER_HASH_PROCESSES', max(1, (os.cpu_count() or 2) - 1)))
+
+# Trace Python allocations per lottery phase (apps/lottery/profiling.py); slows runs down
+LOTTERY_PROFILE_MEMORY = os.getenv('LOTTERY_PROFILE_MEMORY', 'False').lower() == 'true'
+
+# Prometheus scrape endpoint (/metrics): bearer token required; the endpoint is closed while it is empty.
+# Set PROMETHEUS_MULTIPROC_DIR in the environment to aggregate across workers.
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+
 
 # CORS Settings (for Next.js frontend)
 CORS_ALLOWED_ORIGINS = os.getenv(
@@ -173,6 +259,9 @@ CORS_ALLOWED_ORIGINS = os.getenv(
 
 CORS_ALLOW_CREDENTIALS = True
 
+# Let the frontend read the async login's backoff hint
+CORS_EXPOSE_HEADERS = ['Retry-After']
+
 
 # Celery Configuration
 CELERY_BROKER_URL = os.getenv('CELERY_BROKER_URL', 'redis://localhost:6380/0')
@@ -182,37 +271,68 @@ CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = TIME_ZONE
 CELERY_BEAT_SCHEDULER = 'django_celery_beat.schedulers:DatabaseScheduler'
+CELERY_BEAT_SCHEDULE = {
+    'warm-published-jobs-cache': {
+        'task': 'apps.jobs.tasks.warm_published_jobs_cache',
+        'schedule': 60.0,
+    },
+    'drain-application-intake': {
+        'task': 'apps.jobs.tasks.drain_application_intake_queue',
+        'schedule': 2.0,
+    },
+}
 
 
-# Logging configuration
+# Logging configuration: structured JSON (apps/core/logs.py), formatted and
+# written by a background thread so request threads only enqueue records.
+# LOG_FORMAT=console renders readable lines for development instead.
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,
     'formatters': {
-        'verbose': {
-            'format': '{levelname} {asctime} {module} {message}',
-            'style': '{',
-        },
-        'simple': {
-            'format': '{levelname} {message}',
-            'style': '{',
+        'structured': {
+            '()': 'apps.core.logs.json_formatter',
+            'renderer': os.getenv('LOG_FORMAT', 'json'),
         },
     },
     'handlers': {
-        'console': {
-            'class': 'logging.StreamHandler',
-            'formatter': 'simple',
+        'queue': {
+            'class': 'apps.core.logs.QueueHandler',
+            'formatter': 'structured',
         },
     },
     'root': {
-        'handlers': ['console'],
+        'handlers': ['queue'],
         'level': 'INFO',
     },
     'loggers': {
         'django': {
-            'handlers': ['console'],
+            'handlers': ['queue'],
             'level': os.getenv('DJANGO_LOG_LEVEL', 'INFO'),
             'propagate': False,
         },
+        # request.finished is logged by RequestLogMiddleware instead
+        'django.server': {
+            'level': 'WARNING',
+        },
     },
 }
+
+# Fraction of high-volume events to keep; errors and slow requests are always kept
+LOG_SAMPLE_RATES = {
+    'request.finished': float(os.getenv('LOG_REQUEST_SAMPLE_RATE', 1.0)),
+    'application.created': float(os.getenv('LOG_APPLICATION_SAMPLE_RATE', 1.0)),
+}
+LOG_SLOW_REQUEST_MS = int(os.getenv('LOG_SLOW_REQUEST_MS', 1000))
+
+
+# Request tracing (apps/core/tracing.py). TRACE_SAMPLE_RATE is the share of
+# requests traced (0 disables); with TRACE_ALLOW_FORCE, "X-Trace: 1" traces a request.
+TRACE_SAMPLE_RATE = float(os.getenv('TRACE_SAMPLE_RATE', 0))
+TRACE_ALLOW_FORCE = os.getenv('TRACE_ALLOW_FORCE', str(DEBUG)).lower() == 'true'
+TRACE_EXPORTER = os.getenv('TRACE_EXPORTER', 'file')  # file | http
+TRACE_FILE = os.getenv('TRACE_FILE', str(BASE_DIR / 'traces.jsonl'))
+TRACE_COLLECTOR_URL = os.getenv('TRACE_COLLECTOR_URL', 'http://localhost:4318/traces')
+TRACE_MAX_SPANS = int(os.getenv('TRACE_MAX_SPANS', 5000))
+# A statement run this many times in one request is reported as a likely N+1
+TRACE_N_PLUS_ONE_THRESHOLD = int(os.getenv('TRACE_N_PLUS_ONE_THRESHOLD', 5))
@@ -5,7 +5,9 @@ The API structure follows the Central Hub pattern:
 - /admin/ - Django admin interface
 - /api/v1/ - REST API endpoints
 - /api/v1/health/ - Health check endpoint
+- /metrics - Prometheus metrics
 - /api/v1/auth/ - JWT authentication endpoints
+- /api/v1/uploads/ - Resumable chunked uploads
 - /api-auth/ - DRF browsable API authentication
 """
 from django.conf import settings
@@ -14,21 +16,28 @@ from django.contrib import admin
 from django.http import JsonResponse
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from rest_framework_simplejwt.views import TokenRefreshView
 
-from apps.users.views import UserViewSet, CustomTokenObtainPairView
+from apps.core.metrics import has_metrics_token, metrics_view
+from apps.core.uploads import (
+    UploadCompleteView, UploadDetailView, UploadListView, UploadPartView, media_redirect,
+)
+from apps.users.login import async_login, get_hash_pool
+from apps.users.views import UserViewSet, CustomTokenObtainPairView, CustomTokenRefreshView
 from apps.organizations.views import MunicipalityViewSet, WorkplaceViewSet
 from apps.jobs.views import JobViewSet, ApplicationViewSet
 from apps.lottery.views import PeriodViewSet, JobGroupViewSet, LotteryRunViewSet
 
 
 def health_check(request):
-    """Simple health check endpoint for monitoring."""
-    return JsonResponse({
+    """Simple health check endpoint for monitoring; login pool stats need the METRICS_TOKEN."""
+    data = {
         'status': 'healthy',
         'service': 'feriearbete-api',
         'version': '0.1.0',
-    })
+    }
+    if has_metrics_token(request):
+        data['login_pool'] = get_hash_pool().stats()
+    return JsonResponse(data)
 
 
 # The Central Router
@@ -48,15 +57,27 @@ urlpatterns = [
     # API Version 1
     path('api/v1/', include(router.urls)),
     path('api/v1/health/', health_check, name='health-check'),
+    path('metrics', metrics_view, name='metrics'),
 
     # JWT Auth endpoints
     path('api/v1/auth/login/', CustomTokenObtainPairView.as_view(), name='token_obtain_pair'),
-    path('api/v1/auth/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
+    # Login storms: hashing in a bounded pool, 429 + Retry-After when saturated
+    path('api/v1/auth/login/async/', async_login, name='token_obtain_pair_async'),
+    path('api/v1/auth/refresh/', CustomTokenRefreshView.as_view(), name='token_refresh'),
+
+    # Resumable chunked uploads (apps/core/uploads.py)
+    path('api/v1/uploads/', UploadListView.as_view(), name='upload-list'),
+    path('api/v1/uploads/<str:token>/', UploadDetailView.as_view(), name='upload-detail'),
+    path('api/v1/uploads/<str:token>/parts/<int:part_number>/', UploadPartView.as_view(), name='upload-part'),
+    path('api/v1/uploads/<str:token>/complete/', UploadCompleteView.as_view(), name='upload-complete'),
 
     # DRF browsable API auth (for testing)
     path('api-auth/', include('rest_framework.urls')),
 ]
 
-# Serve media files in development
-if settings.DEBUG:
+# Object storage: send /media/ links to the file's (presigned) URL
+if settings.MEDIA_STORAGE == 's3':
+    urlpatterns += [path(f'{settings.MEDIA_URL}<path:name>', media_redirect, name='media-redirect')]
+# Serve local media files in development
+elif settings.DEBUG:
     urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)